@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Throughput of a cheap analytic objective, evaluated per candidate or in
+batches.
+
+Usage: python benchmarks/batch_throughput.py [--budget N] [--batch-size K]
+"""
+import argparse
+import time
+
+import hpman
+import nevergrad as ng
+import numpy as np
+
+from hpnevergrad import batch, driver, hpng
+
+hpm = hpman.HyperParameterManager("_")
+
+
+def train():
+    lr = hpm.get_value("lr")
+    bs = hpm.get_value("bs")
+    architecture = hpm.get_value("architecture")
+    return (lr - 0.2) ** 2 + (bs - 4) ** 2 + np.where(architecture == "conv", 0, 10)
+
+
+def make_optimizer(budget, num_workers):
+    parametrization = ng.p.Instrumentation(
+        lr=ng.p.Log(init=1e-3, lower=1e-3, upper=1.0),
+        bs=ng.p.Scalar(init=1, lower=1, upper=12),
+        architecture=ng.p.Choice(["conv", "fc"]),
+    )
+    return ng.optimizers.registry["RandomSearch"](
+        parametrization=parametrization, budget=budget, num_workers=num_workers
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--budget", default=2000, type=int)
+    parser.add_argument("--batch-size", default=256, type=int)
+    args = parser.parse_args()
+    objective_function = hpng.get_objective_function(train, hpm)
+
+    start = time.perf_counter()
+    driver.minimize(make_optimizer(args.budget, 1), objective_function)
+    per_call = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batch.minimize_batched(
+        make_optimizer(args.budget, args.batch_size), objective_function
+    )
+    batched = time.perf_counter() - start
+
+    for name, elapsed in [("per call", per_call), ("batched", batched)]:
+        print("%-8s %.1f s, %.0f candidates/s" % (name, elapsed, args.budget / elapsed))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+"""
+Overhead and scaling benchmarks of hpnevergrad, runnable offline.
+
+Every measurement is the median of several repeats, in seconds, so lower is
+always better. Results are saved as JSON, by default to
+`benchmarks/results/<commit>.json`, and can be compared with those of another
+commit.
+
+Usage: python benchmarks/suite.py [--quick] [--output PATH] [--compare PATH]
+"""
+import argparse
+import concurrent.futures
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import warnings
+
+import hpman
+import nevergrad as ng
+
+from hpnevergrad import driver, hpng, index
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+HPNG = os.path.join(BASE_DIR, "bin", "hpng")
+
+
+def median_time(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def write_sources(directory, num_hps, num_files):
+    """
+    Write `num_files` modules declaring `num_hps` hyperparameters in total.
+
+    :return: The file names.
+    """
+    paths = []
+    for i in range(num_files):
+        path = os.path.join(directory, "source_%d.py" % i)
+        with open(path, "w") as f:
+            f.write("from hpman.m import _\n\n\ndef train():\n")
+            for j in range(i, num_hps, num_files):
+                f.write("    _('hp_%d', 0.5, range=[0.0, 1.0])\n" % j)
+            f.write("    return 0.0\n")
+        paths.append(path)
+    return paths
+
+
+def bench_parametrization(results, repeat):
+    with tempfile.TemporaryDirectory() as directory:
+        for num_hps in [10, 100, 1000]:
+            for num_files in [1, 10]:
+                paths = write_sources(directory, num_hps, num_files)
+
+                def parse():
+                    hp_mgr = hpman.HyperParameterManager("_")
+                    for path in paths:
+                        hp_mgr.parse_file(path)
+                    return hp_mgr
+
+                key = "hps=%d,files=%d" % (num_hps, num_files)
+                results["parametrization.parse[%s]" % key] = median_time(parse, repeat)
+                hp_mgr = parse()
+
+                def build():
+                    hpng._parametrizations.clear()
+                    hpng.get_parametrization(hp_mgr)
+
+                results["parametrization.build[%s]" % key] = median_time(build, repeat)
+                results["parametrization.memoized[%s]" % key] = median_time(
+                    lambda: hpng.get_parametrization(hp_mgr), repeat
+                )
+                results["parametrization.index_cold[%s]" % key] = median_time(
+                    lambda: index.SourceIndex().update(directory), repeat
+                )
+                source_index = index.SourceIndex()
+                source_index.update(directory)
+                results["parametrization.index_warm[%s]" % key] = median_time(
+                    lambda: source_index.update(directory), repeat
+                )
+                for path in paths:
+                    os.remove(path)
+
+
+def bench_wrapper(results, repeat):
+    hp_mgr = hpman.HyperParameterManager("_")
+    hp_mgr("lr", 0.1)
+    calls = 10000
+
+    def train(**kwargs):
+        return 0.0
+
+    def read_train():
+        return hp_mgr.get_value("lr")
+
+    for name, fn in [
+        ("direct_call", train),
+        ("objective_function_call", hpng.get_objective_function(train, hp_mgr)),
+        ("objective_function_read", hpng.get_objective_function(read_train, hp_mgr)),
+    ]:
+
+        def call():
+            for _ in range(calls):
+                fn(lr=0.2)
+
+        results["wrapper.%s" % name] = median_time(call, repeat) / calls
+
+
+def bench_cli(results, repeat):
+    with tempfile.TemporaryDirectory() as directory:
+        write_sources(directory, 10, 1)
+
+        def run(*args):
+            subprocess.run(
+                [sys.executable, HPNG] + list(args),
+                cwd=directory,
+                check=True,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+            )
+
+        results["cli.help"] = median_time(lambda: run("--help"), repeat)
+        results["cli.budget_1"] = median_time(
+            lambda: run("source_0.py:train", "--budget", "1"), repeat
+        )
+
+
+def noop(x):
+    return x**2
+
+
+def sleep(x):
+    time.sleep(0.005)
+    return x**2
+
+
+def bench_trials(results, repeat, budget):
+    num_workers = 4
+    modes = [
+        ("sequential", None),
+        ("thread", concurrent.futures.ThreadPoolExecutor),
+        ("process", concurrent.futures.ProcessPoolExecutor),
+    ]
+    for mode, executor_type in modes:
+        for objective_function in [noop, sleep]:
+
+            def search():
+                parametrization = ng.p.Instrumentation(x=ng.p.Scalar(init=0.0))
+                parametrization.random_state.seed(0)
+                optimizer = ng.optimizers.registry["RandomSearch"](
+                    parametrization=parametrization,
+                    budget=budget,
+                    num_workers=1 if executor_type is None else num_workers,
+                )
+                if executor_type is None:
+                    driver.minimize(optimizer, objective_function)
+                    return
+                with executor_type(max_workers=num_workers) as executor:
+                    driver.minimize(optimizer, objective_function, executor)
+
+            key = "trial.%s[%s]" % (mode, objective_function.__name__)
+            results[key] = median_time(search, repeat) / budget
+
+
+def git_commit():
+    try:
+        return (
+            subprocess.check_output(
+                ["git", "rev-parse", "--short", "HEAD"],
+                cwd=BASE_DIR,
+                stderr=subprocess.DEVNULL,
+            )
+            .decode()
+            .strip()
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(results, baseline, threshold):
+    """
+    Print the ratio of each result to its baseline.
+
+    :return: The names of the results slower than `threshold` times their
+        baseline.
+    """
+    regressions = []
+    print("%-50s %12s %12s %8s" % ("benchmark", "baseline", "current", "ratio"))
+    for name, value in sorted(results.items()):
+        if name not in baseline:
+            continue
+        ratio = value / baseline[name] if baseline[name] > 0 else float("inf")
+        flag = ""
+        if ratio > threshold:
+            regressions.append(name)
+            flag = "  <- regression"
+        print(
+            "%-50s %12.3g %12.3g %7.2fx%s" % (name, baseline[name], value, ratio, flag)
+        )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--quick", action="store_true", help="fewer repeats and a smaller budget"
+    )
+    parser.add_argument("--output", help="file the results are saved to")
+    parser.add_argument("--compare", help="results of a previous run to compare to")
+    parser.add_argument(
+        "--threshold",
+        default=1.5,
+        type=float,
+        help="ratio to the baseline above which a result is a regression",
+    )
+    args = parser.parse_args()
+    # e.g. bounds of the synthetic hyperparameters being close
+    warnings.simplefilter("ignore")
+    repeat = 3 if args.quick else 7
+    budget = 50 if args.quick else 200
+
+    results = {}  # type: dict
+    for name, bench in [
+        ("parametrization", lambda: bench_parametrization(results, repeat)),
+        ("wrapper", lambda: bench_wrapper(results, repeat)),
+        ("cli", lambda: bench_cli(results, repeat)),
+        ("trials", lambda: bench_trials(results, repeat, budget)),
+    ]:
+        print("running %s benchmarks" % name, file=sys.stderr)
+        bench()
+
+    commit = git_commit()
+    output = args.output or os.path.join(
+        BASE_DIR, "benchmarks", "results", commit + ".json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(
+            {
+                "commit": commit,
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "quick": args.quick,
+                "results": results,
+            },
+            f,
+            indent=2,
+            sort_keys=True,
+        )
+    print("results saved to %s" % output, file=sys.stderr)
+
+    if args.compare is None:
+        for name, value in sorted(results.items()):
+            print("%-50s %12.3g" % (name, value))
+        return
+    with open(args.compare) as f:
+        baseline = json.load(f)["results"]
+    if compare(results, baseline, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Startup latency of isolated trials, with and without warm workers.
+
+Usage: python benchmarks/trial_startup.py [--trials N] [module.py:obj]
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+from hpnevergrad import hpng, runner
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+
+
+def measure(objective_function, kwargs, trials):
+    latencies = []
+    for _ in range(trials):
+        start = time.perf_counter()
+        objective_function(**kwargs)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        dest="module",
+        nargs="?",
+        default=os.path.join(BASE_DIR, "examples/01-hpng-cli/src.py:train"),
+    )
+    parser.add_argument("--trials", default=20, type=int)
+    args = parser.parse_args()
+
+    path, obj = hpng.split_module(args.module)
+    os.chdir(os.path.dirname(path))
+    sys.path.insert(0, os.getcwd())
+    module = os.path.basename(path)
+    kwargs = {"lr": 0.1, "bs": 4, "architecture": "conv"}
+
+    results = {
+        "isolated": measure(runner.IsolatedObjective(module, obj), kwargs, args.trials)
+    }
+    start = time.perf_counter()
+    with runner.WarmPool(module, obj) as pool:
+        warmup = time.perf_counter() - start
+        results["warm"] = measure(pool, kwargs, args.trials)
+
+    print("warm pool startup: %.1f ms" % (warmup * 1e3))
+    for name, latencies in results.items():
+        print(
+            "%-8s trial latency: median %.1f ms, mean %.1f ms"
+            % (
+                name,
+                statistics.median(latencies) * 1e3,
+                statistics.mean(latencies) * 1e3,
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
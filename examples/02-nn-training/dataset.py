@@ -1,12 +1,23 @@
+import warnings
+
 from torchvision.datasets import MNIST
 import torch
-import functools
 import numpy as np
 
+from hpnevergrad import resources
+
 
-@functools.lru_cache(maxsize=2)
-def get_mnist_dataset(train):
-    return MNIST("/data", train=train, download=True)
+@resources.fixture
+def get_mnist_arrays(dataset_type):
+    """
+    Built once per search and memory-mapped by every trial process, instead
+    of being loaded again by each trial.
+    """
+    mnist = MNIST("/data", train=dataset_type == "train", download=True)
+    return {
+        "data": mnist.data.numpy().reshape(-1, 1, 28, 28),
+        "labels": mnist.targets.numpy(),
+    }
 
 
 def get_data_and_labels(dataset_type):
@@ -18,13 +29,11 @@ def get_data_and_labels(dataset_type):
             'labels': Y,
         }
     """
-    mnist = get_mnist_dataset(dataset_type == "train")  # False for test dataet
-
-    X = mnist.data
-    Y = mnist.targets
-
-    X = X.reshape(-1, 1, 28, 28)
-    return {"data": X, "labels": Y}
+    arrays = get_mnist_arrays(dataset_type)
+    with warnings.catch_warnings():
+        # the tensors share the read-only memory of the arrays without a copy
+        warnings.simplefilter("ignore", UserWarning)
+        return {k: torch.from_numpy(v) for k, v in arrays.items()}
 
 
 def iter_dataset_batch(rng, dct, batch_size, loop=False, cuda=False):
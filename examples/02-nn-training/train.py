@@ -11,7 +11,7 @@ from tqdm import tqdm
 
 import hpargparse
 import torch
-from hpnevergrad import hpng
+from hpnevergrad import hpng, scheduler
 from torch import optim
 
 BASE_DIR = os.path.dirname(os.path.realpath(__file__))
@@ -26,12 +26,18 @@ def run():
     print("-" * 10 + " Hyperparameters " + "-" * 10)
     print(yaml.dump(_.get_values()))
 
-    optimizer_cls = {
-        "adam": optim.Adam,
-        "sgd": functools.partial(optim.SGD, momentum=0.9),
-    }[
-        _("optimizer", "adam")  # <-- hyperparameter
-    ]
+    optimizer_name = _(
+        "optimizer", "adam", choices=["adam", "sgd"]
+    )  # <-- hyperparameter
+    optimizer_cls = optim.Adam
+    if optimizer_name == "sgd":
+        # only searched when sgd is chosen
+        optimizer_cls = functools.partial(
+            optim.SGD,
+            momentum=_(
+                "momentum", 0.9, range=[0.5, 0.99], active_if={"optimizer": "sgd"}
+            ),  # <-- hyperparameter
+        )
 
     import model
 
@@ -99,10 +105,13 @@ def run():
             )
         )
 
-        # Save the model. We intentionally not saving the model here for
-        # tidiness of the example
-        # torch.save(net, "model.pt")
-        return float(metrics["misclassify"])
+        # let an early stopping scheduler stop unpromising trials
+        scheduler.report(float(metrics["misclassify"]), epoch + 1)
+
+    # Save the model. We intentionally not saving the model here for
+    # tidiness of the example
+    # torch.save(net, "model.pt")
+    return float(metrics["misclassify"])
 
 
 if __name__ == "__main__":
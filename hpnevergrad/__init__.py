@@ -1,3 +1,31 @@
-from hpnevergrad import hpng
+import importlib
 
 from .pkginfo import __version__
+
+__all__ = [
+    "aio",
+    "batch",
+    "cache",
+    "distributed",
+    "driver",
+    "history",
+    "hpng",
+    "index",
+    "journal",
+    "profiling",
+    "progress",
+    "racing",
+    "resources",
+    "runner",
+    "scheduler",
+    "surrogate",
+    "warmstart",
+]
+
+
+def __getattr__(name):
+    # submodules are imported on first access: most of them import nevergrad,
+    # which takes seconds and is useless to e.g. a process evaluating trials.
+    if name in __all__:
+        return importlib.import_module("." + name, __name__)
+    raise AttributeError("module %r has no attribute %r" % (__name__, name))
@@ -0,0 +1,24 @@
+import importlib
+import types
+from typing import Optional
+
+
+class LazyModule(object):
+    """
+    Stand-in for a module that is only imported on first attribute access.
+
+    Used for heavy dependencies such as nevergrad, which the command line
+    tool's argument parsing and the processes evaluating trials never need.
+    """
+
+    def __init__(self, name: str):
+        """
+        :param name: Absolute name of the module.
+        """
+        self._name = name
+        self._module = None  # type: Optional[types.ModuleType]
+
+    def __getattr__(self, attr):
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return getattr(self._module, attr)
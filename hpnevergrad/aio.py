@@ -0,0 +1,80 @@
+import asyncio
+import concurrent.futures
+import functools
+from typing import Callable, Iterable, Optional
+
+import nevergrad as ng
+
+from hpnevergrad.cache import EvaluationCache
+from hpnevergrad.driver import Trial, _Search
+
+
+async def minimize(
+    optimizer: ng.optimizers.base.Optimizer,
+    objective_function: Callable,
+    executor: Optional[concurrent.futures.Executor] = None,
+    callbacks: Iterable[Callable[[Trial], None]] = (),
+    cache: Optional[EvaluationCache] = None,
+    penalty: Optional[float] = None,
+    timeout: Optional[float] = None,
+    max_time: Optional[float] = None,
+) -> ng.p.Parameter:
+    """
+    Asynchronous counterpart of `hpnevergrad.driver.minimize`.
+
+    Up to `optimizer.num_workers` trials are kept in flight, and each result is
+    told to the optimizer as soon as its trial completes, in any order, before
+    a new candidate is asked; a slow trial never holds back the others.
+
+    Trials running longer than `timeout`, and all running trials once
+    `max_time` has passed, are cancelled as by `driver.minimize`; the task of
+    an `async def` objective function is cancelled with them.
+
+    :param optimizer: The nevergrad optimizer; its budget must be set.
+    :param objective_function: Function evaluated on the candidates' kwargs,
+        either an `async def` function awaited in the event loop, or a regular
+        function run in `executor`.
+    :param executor: Pool running a regular objective function, the default
+        executor of the event loop if None.
+    :param callbacks: Functions called with each finished `Trial`.
+    :param cache: Losses of already evaluated hyperparameters.
+    :param penalty: Loss told to the optimizer for a trial whose objective
+        function raised or timed out. If None, such a trial stops the search.
+    :param timeout: Seconds after which a trial times out.
+    :param max_time: Seconds after which the search stops.
+    :return: The recommendation of the optimizer.
+    """
+    loop = asyncio.get_running_loop()
+    search = _Search(
+        optimizer, objective_function, callbacks, cache, penalty, timeout, max_time
+    )
+    running = {}  # type: dict
+    try:
+        while search.can_ask() or running:
+            while search.can_ask() and len(running) < optimizer.num_workers:
+                trial = search.ask()
+                if search.reject(trial) or search.lookup(trial):
+                    continue
+                args, kwargs = trial.candidate.args, trial.kwargs
+                if asyncio.iscoroutinefunction(objective_function):
+                    task = asyncio.ensure_future(objective_function(*args, **kwargs))
+                else:
+                    task = loop.run_in_executor(
+                        executor, functools.partial(objective_function, *args, **kwargs)
+                    )
+                running[task] = trial
+            if not running:
+                continue
+            done, _ = await asyncio.wait(
+                running,
+                timeout=search.wait_timeout(running.values()),
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            for task in done:
+                search.evaluate(running.pop(task), task)
+            search.expire(running)
+    finally:
+        for task in running:
+            task.cancel()
+        await asyncio.gather(*running, return_exceptions=True)
+    return search.recommend()
@@ -0,0 +1,116 @@
+from typing import Callable, Iterable, List, Optional
+
+import nevergrad as ng
+import numpy as np
+
+from hpnevergrad import hpng
+from hpnevergrad.cache import EvaluationCache
+from hpnevergrad.driver import Trial, _as_loss, _Search
+
+
+def _stack(parameter: ng.p.Parameter, values: list) -> np.ndarray:
+    """
+    Stack the values of one hyperparameter across candidates.
+
+    :param parameter: The parameter the values were drawn from.
+    :param values: Its values, one per candidate.
+    :return: An array of `len(values)` rows: floats for `Scalar` and `Log`,
+        ints if they are cast to integers, one row per candidate's array for
+        `Array`, and the chosen values for `Choice`, as objects if they are
+        not scalars of a common type.
+    """
+    if isinstance(parameter, ng.p.Array):
+        # Scalar and Log are 0-d arrays
+        return np.stack([np.asarray(v) for v in values])
+    column = np.array(values)
+    if column.dtype == object or column.shape != (len(values),):
+        column = np.empty(len(values), dtype=object)
+        column[:] = values
+    return column
+
+
+def stack_kwargs(parametrization: ng.p.Instrumentation, kwargs: List[dict]) -> dict:
+    """
+    Stack the kwargs of several candidates into one column per
+    hyperparameter.
+
+    :param parametrization: Parametrization of the candidates.
+    :param kwargs: The kwargs of the candidates.
+    :return: Dict of hyperparameter name to `_stack`ed values; inactive
+        hyperparameters of a conditional space take their default value.
+    """
+    parameters = hpng.all_parameters(parametrization[1])
+    return {
+        name: _stack(
+            parameter,
+            [k[name] if name in k else hpng.get_value(name, parameter) for k in kwargs],
+        )
+        for name, parameter in parameters.items()
+    }
+
+
+def minimize_batched(
+    optimizer: ng.optimizers.base.Optimizer,
+    objective_function: Callable[..., np.ndarray],
+    batch_size: Optional[int] = None,
+    callbacks: Iterable[Callable[[Trial], None]] = (),
+    cache: Optional[EvaluationCache] = None,
+    penalty: Optional[float] = None,
+) -> ng.p.Parameter:
+    """
+    Minimize a vectorized objective function, evaluated once per batch of
+    candidates.
+
+    Each batch asks `batch_size` candidates, stacks their kwargs into columns
+    with `stack_kwargs`, calls the objective function once with the columns
+    as kwargs, and tells each candidate its loss. This removes the overhead of
+    a Python call per candidate for cheap analytic or surrogate objectives. A
+    train function reading hyperparameters from hpman can be vectorized with
+    `hpng.get_objective_function`, which binds the columns instead of scalars.
+
+    :param optimizer: The nevergrad optimizer; its budget must be set. Create
+        it with `num_workers=batch_size`, as the candidates of a batch are
+        asked before any of them is told.
+    :param objective_function: Function of the columns returning an array of
+        one loss per candidate, or of one row of losses per candidate for
+        several objectives.
+    :param batch_size: Number of candidates per batch, `optimizer.num_workers`
+        if None.
+    :param callbacks: Functions called with each finished `Trial`.
+    :param cache: Losses of already evaluated hyperparameters; cached
+        candidates are told without being part of the batch.
+    :param penalty: Loss told to every candidate of a batch whose objective
+        function raised. If None, a failed batch stops the search.
+    :return: The recommendation of the optimizer.
+    """
+    if batch_size is None:
+        batch_size = optimizer.num_workers
+    search = _Search(optimizer, objective_function, callbacks, cache, penalty)
+    while search.can_ask():
+        trials = []  # type: List[Trial]
+        while search.can_ask() and len(trials) < batch_size:
+            trial = search.ask()
+            if not (search.reject(trial) or search.lookup(trial)):
+                trials.append(trial)
+        if not trials:
+            continue
+        columns = stack_kwargs(optimizer.parametrization, [t.kwargs for t in trials])
+        try:
+            losses = np.asarray(objective_function(**columns), dtype=float)
+            if losses.ndim not in (1, 2) or len(losses) != len(trials):
+                raise ValueError(
+                    "Expected %d losses, got an array of shape %s"
+                    % (len(trials), losses.shape)
+                )
+        except Exception:
+            for trial in trials:
+                search.tell(trial, search.penalty, "failed")
+            if search.penalty is None:
+                raise
+            continue
+        for trial, loss in zip(trials, losses):
+            loss = _as_loss(loss)
+            if search.cache is not None:
+                search.cache.put(trial.kwargs, loss)
+            search.tell(trial, loss)
+    return search.recommend()
@@ -0,0 +1,131 @@
+import collections
+import functools
+import hashlib
+import json
+import sqlite3
+import threading
+from typing import Callable, Optional
+
+from hpnevergrad import hpng
+
+
+def get_key(kwargs: dict) -> str:
+    """
+    Canonical hash of the hyperparameters of a trial.
+
+    :param kwargs: Resolved hyperparameters, i.e. the kwargs of a candidate
+        after integer casting and choice resolution.
+    :return: Hex digest, independent of the order of the kwargs.
+    """
+    s = json.dumps(kwargs, sort_keys=True, default=hpng.to_json)
+    return hashlib.sha1(s.encode("utf-8")).hexdigest()
+
+
+class EvaluationCache(object):
+    """
+    Losses of the evaluated hyperparameters.
+
+    Losses are kept in an in-memory LRU, backed by an optional SQLite file
+    shared between searches. The cache is thread safe.
+    """
+
+    maxsize = None  # type: int
+    """Maximum number of losses kept in memory."""
+
+    path = None  # type: Optional[str]
+    """SQLite file the losses are stored to."""
+
+    hits = None  # type: int
+    """Number of lookups that found a loss."""
+
+    misses = None  # type: int
+    """Number of lookups that did not find a loss."""
+
+    def __init__(self, maxsize: int = 1024, path: Optional[str] = None):
+        """
+        :param maxsize: Maximum number of losses kept in memory.
+        :param path: SQLite file the losses are stored to, if any.
+        """
+        self.maxsize = maxsize
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._memory = collections.OrderedDict()  # type: collections.OrderedDict
+        self._lock = threading.Lock()
+        self._db = None
+        if path is not None:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS losses (key TEXT PRIMARY KEY, loss TEXT)"
+            )
+            self._db.commit()
+
+    def _remember(self, key, loss):
+        self._memory[key] = loss
+        self._memory.move_to_end(key)
+        if len(self._memory) > self.maxsize:
+            self._memory.popitem(last=False)
+
+    def get(self, kwargs: dict) -> Optional[float]:
+        """
+        :param kwargs: Resolved hyperparameters of a trial.
+        :return: The cached loss, or None.
+        """
+        key = get_key(kwargs)
+        with self._lock:
+            loss = self._memory.get(key)
+            if loss is None and self._db is not None:
+                row = self._db.execute(
+                    "SELECT loss FROM losses WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    loss = json.loads(row[0])
+            if loss is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._remember(key, loss)
+            return loss
+
+    def put(self, kwargs: dict, loss: float):
+        """
+        :param kwargs: Resolved hyperparameters of a trial.
+        :param loss: Loss of the trial.
+        """
+        key = get_key(kwargs)
+        with self._lock:
+            self._remember(key, loss)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO losses VALUES (?, ?)",
+                    (key, json.dumps(loss, default=hpng.to_json)),
+                )
+                self._db.commit()
+
+    def wrap(self, objective_function: Callable[..., float]) -> Callable[..., float]:
+        """
+        Memoize an objective function called with keyword arguments.
+
+        :param objective_function: The objective function.
+        """
+
+        @functools.wraps(objective_function)
+        def cached_objective_function(**kwargs):
+            loss = self.get(kwargs)
+            if loss is None:
+                loss = objective_function(**kwargs)
+                self.put(kwargs, loss)
+            return loss
+
+        return cached_objective_function
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
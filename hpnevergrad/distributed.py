@@ -0,0 +1,317 @@
+import concurrent.futures
+import itertools
+import os
+import threading
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client, Listener
+from typing import Callable, Iterable, Optional, Tuple, cast
+
+import nevergrad as ng
+
+from hpnevergrad.cache import EvaluationCache
+from hpnevergrad.driver import Trial, _Search
+from hpnevergrad.runner import TrialError, _evaluate
+
+
+def parse_address(address: str) -> Tuple[str, int]:
+    """
+    :param address: A string of `host:port`.
+    :return: The address as expected by `multiprocessing.connection`.
+    """
+    host, sep, port = address.rpartition(":")
+    if not sep:
+        raise ValueError("Address must be host:port, got %r" % address)
+    return host or "127.0.0.1", int(port)
+
+
+class Coordinator(object):
+    """
+    Owner of the optimizer of a search evaluated by remote workers.
+
+    Workers connect over TCP with `work`, and repeatedly ask a candidate and
+    tell its loss; all asks and tells go through the coordinator, so the
+    optimizer sees the same sequence as with a local driver, while the
+    number of trials evaluated in parallel grows with the workers. The
+    trial of a worker which disconnects is handed to another worker once,
+    then counts as failed. Once `max_time` has passed, the running trials
+    are cancelled and the search ends without waiting for their workers.
+
+    Messages are pickled, so anyone holding the key can run code in the
+    coordinator and its workers: the key is random unless given, and should
+    only be shared with the workers, on trusted networks.
+    """
+
+    address = None  # type: Tuple[str, int]
+    """Address the coordinator listens on."""
+
+    authkey = None  # type: bytes
+    """Key workers authenticate with."""
+
+    max_retries = 1
+    """Times the trial of a disconnected worker is handed to another one."""
+
+    def __init__(
+        self,
+        optimizer: ng.optimizers.base.Optimizer,
+        address: Tuple[str, int] = ("127.0.0.1", 0),
+        authkey: Optional[bytes] = None,
+        callbacks: Iterable[Callable[[Trial], None]] = (),
+        cache: Optional[EvaluationCache] = None,
+        penalty: Optional[float] = None,
+        max_time: Optional[float] = None,
+    ):
+        """
+        :param optimizer: The nevergrad optimizer; its budget must be set,
+            and its `num_workers` should be the number of worker slots.
+        :param address: Host and port to listen on; port 0 picks a free one.
+        :param authkey: Key workers authenticate with; random if None, see
+            `authkey`.
+        :param callbacks: Functions called with each finished `Trial`.
+        :param cache: Losses of already evaluated hyperparameters; a cached
+            loss is told without handing the candidate to a worker.
+        :param penalty: Loss told to the optimizer for a failed trial. If
+            None, a failed trial stops the search.
+        :param max_time: Seconds after which the search stops.
+        """
+        self.optimizer = optimizer
+        self.authkey = os.urandom(32) if authkey is None else authkey
+        self._search = _Search(
+            optimizer, None, callbacks, cache, penalty, max_time=max_time
+        )
+        self._listener = Listener(address, backlog=64, authkey=self.authkey)
+        self.address = cast(Tuple[str, int], self._listener.address)
+        self._condition = threading.Condition()
+        self._ids = itertools.count()
+        self._running = {}  # type: dict
+        self._requeued = []  # type: list
+        self._retries = {}  # type: dict
+        self._error = None  # type: Optional[BaseException]
+        self._closed = False
+        self._timer = None
+        if max_time is not None:
+            self._timer = threading.Timer(max_time, self._expire)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _finished(self) -> bool:
+        return self._error is not None or (
+            not self._search.can_ask() and not self._requeued and not self._running
+        )
+
+    def _expire(self):
+        """
+        Cancel the running and requeued trials at the deadline of the search.
+        """
+        with self._condition:
+            trials = list(self._running.values())
+            trials.extend(trial for trial, _ in self._requeued)
+            self._running.clear()
+            self._retries.clear()
+            self._requeued = []
+            for trial in trials:
+                self._search.tell(trial, None, "cancelled")
+            self._notify()
+
+    def _wake(self):
+        # unblock the accept of `serve`
+        try:
+            Client(self.address, authkey=self.authkey).close()
+        except OSError:
+            pass
+
+    def _next_trial(self) -> Tuple[Optional[int], Optional[Trial]]:
+        """
+        :return: The id and the next trial to evaluate, or Nones if the
+            search is over.
+        """
+        with self._condition:
+            while True:
+                if self._finished():
+                    return None, None
+                retries = 0
+                if self._requeued:
+                    trial, retries = self._requeued.pop()
+                elif self._search.can_ask():
+                    trial = self._search.ask()
+                    if self._search.reject(trial) or self._search.lookup(trial):
+                        continue
+                else:
+                    # wait for the running trials, which may be requeued
+                    self._condition.wait()
+                    continue
+                trial_id = next(self._ids)
+                self._running[trial_id] = trial
+                self._retries[trial_id] = retries
+                return trial_id, trial
+
+    def _tell(self, trial_id: int, status: str, result):
+        """
+        Tell the result of a running trial; the condition must be held.
+        """
+        if trial_id not in self._running:
+            # cancelled at the deadline
+            return
+        trial = self._running.pop(trial_id)
+        self._retries.pop(trial_id)
+        future = concurrent.futures.Future()  # type: concurrent.futures.Future
+        if status == "ok":
+            future.set_result(result)
+        else:
+            future.set_exception(TrialError(result))
+        if self._error is None:
+            try:
+                self._search.evaluate(trial, future)
+            except Exception as e:
+                self._error = e
+        if self._search.stopped:
+            # a callback stopped the search
+            self._expire()
+
+    def _notify(self):
+        self._condition.notify_all()
+        if self._finished():
+            threading.Thread(target=self._wake, daemon=True).start()
+
+    def _handle(self, conn):
+        trial_id = None
+        try:
+            while True:
+                message = conn.recv()
+                if message[0] == "tell":
+                    _, told_id, status, result = message
+                    if told_id == trial_id:
+                        trial_id = None
+                        with self._condition:
+                            self._tell(told_id, status, result)
+                            self._notify()
+                    continue
+                trial_id, trial = self._next_trial()
+                if trial is None:
+                    conn.send(("done", None))
+                    break
+                conn.send(("trial", trial_id, trial.kwargs))
+        except (EOFError, OSError):
+            pass
+        finally:
+            conn.close()
+            if trial_id is not None:
+                self._abandon(trial_id)
+
+    def _abandon(self, trial_id: int):
+        """
+        Requeue the trial of a disconnected worker, or fail it if it was
+        already retried.
+        """
+        with self._condition:
+            if trial_id not in self._running:
+                return
+            retries = self._retries[trial_id]
+            if retries < self.max_retries:
+                trial = self._running.pop(trial_id)
+                self._retries.pop(trial_id)
+                self._requeued.append((trial, retries + 1))
+            else:
+                self._tell(trial_id, "error", "Worker disconnected")
+            self._notify()
+
+    def serve(self) -> ng.p.Parameter:
+        """
+        Serve the workers until the budget is exhausted or the deadline
+        passed.
+
+        :return: The recommendation of the optimizer.
+        :raise: The error of the first failed trial if there is no penalty.
+        """
+        handlers = []
+        while True:
+            with self._condition:
+                if self._finished():
+                    break
+            try:
+                conn = self._listener.accept()
+            except (OSError, EOFError, AuthenticationError):
+                # e.g. a client with a wrong authkey
+                continue
+            with self._condition:
+                if self._finished():
+                    conn.close()
+                    break
+            thread = threading.Thread(target=self._handle, args=(conn,), daemon=True)
+            thread.start()
+            handlers.append(thread)
+        self.close()
+        if self._error is None and not self._search.past_deadline():
+            # let the idle workers know the search is over
+            for thread in handlers:
+                thread.join()
+        if self._error is not None:
+            raise self._error
+        return self._search.recommend()
+
+    def close(self):
+        if not self._closed:
+            self._closed = True
+            if self._timer is not None:
+                self._timer.cancel()
+            self._listener.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def work(
+    address: Tuple[str, int],
+    objective_function: Callable[..., float],
+    authkey: bytes,
+    num_workers: int = 1,
+) -> int:
+    """
+    Evaluate the trials of a `Coordinator` until its search is over; a
+    connection closed by the coordinator, e.g. at its deadline, ends the
+    search as well.
+
+    :param address: Host and port of the coordinator.
+    :param objective_function: Function evaluated on the candidates' kwargs,
+        e.g. a `hpng.ModuleObjective`.
+    :param authkey: Key of the coordinator.
+    :param num_workers: Number of trials evaluated in parallel, each in a
+        thread with its own connection.
+    :return: Number of trials evaluated.
+    """
+    counts = []
+    errors = []
+
+    def slot():
+        count = 0
+        try:
+            with Client(address, authkey=authkey) as conn:
+                while True:
+                    try:
+                        conn.send(("ask",))
+                        message = conn.recv()
+                    except (EOFError, ConnectionError):
+                        break
+                    if message[0] == "done":
+                        break
+                    _, trial_id, kwargs = message
+                    status, result = _evaluate(objective_function, kwargs)
+                    try:
+                        conn.send(("tell", trial_id, status, result))
+                    except ConnectionError:
+                        break
+                    count += 1
+        except BaseException as e:
+            errors.append(e)
+        counts.append(count)
+
+    threads = [threading.Thread(target=slot) for _ in range(num_workers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    if errors:
+        raise errors[0]
+    return sum(counts)
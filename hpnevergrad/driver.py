@@ -0,0 +1,423 @@
+import concurrent.futures
+import numbers
+import time
+from typing import Callable, Iterable, List, Optional, Union
+
+import nevergrad as ng
+import numpy as np
+
+from hpnevergrad import hpng
+from hpnevergrad.cache import EvaluationCache
+from hpnevergrad.profiling import Measurement
+from hpnevergrad.runner import DeadlineExceeded, TrialTimeout
+
+
+class StopSearch(Exception):
+    """
+    Raised by a callback to stop the search: no more candidates are asked,
+    the running trials are cancelled, and the driver returns the current
+    recommendation.
+    """
+
+
+class Trial(object):
+    """
+    A single evaluation of the objective function.
+    """
+
+    candidate = None  # type: ng.p.Parameter
+    """Candidate asked to the optimizer."""
+
+    status = None  # type: str
+    """"running", "ok", "failed", "timeout", "cancelled" or "infeasible"."""
+
+    loss = None  # type: Union[None, float, List[float]]
+    """Loss returned by the objective function; the list of its losses for a
+    multi-objective function."""
+
+    wall_time = None  # type: float
+    """Seconds between the submission of the trial and its completion."""
+
+    cached = None  # type: bool
+    """Whether the loss was found in the cache instead of evaluated."""
+
+    submitted = None  # type: float
+    """Epoch time at which the trial was submitted."""
+
+    ask_time = None  # type: float
+    """Seconds spent in the optimizer's ask."""
+
+    tell_time = None  # type: float
+    """Seconds spent in the optimizer's tell."""
+
+    measurement = None  # type: Optional[Measurement]
+    """Measurement of the objective function, if it is `Instrumented`."""
+
+    seed = None  # type: Optional[int]
+    """Seed derived for the trial in a seeded search."""
+
+    def __init__(self, candidate: ng.p.Parameter, ask_time: float = 0.0):
+        """
+        :param candidate: Candidate asked to the optimizer.
+        :param ask_time: Seconds spent in the optimizer's ask.
+        """
+        self.candidate = candidate
+        self.status = "running"
+        self.cached = False
+        self.ask_time = ask_time
+        self.tell_time = 0.0
+        self.submitted = time.time()
+        self._start = time.perf_counter()
+
+    @property
+    def kwargs(self) -> dict:
+        """Hyperparameters of the trial, the active ones for a conditional
+        space."""
+        return hpng.flatten_kwargs(self.candidate.kwargs)
+
+    def finish(self, loss: Union[None, float, List[float]] = None, status: str = "ok"):
+        self.loss = loss
+        self.status = status
+        self.wall_time = time.perf_counter() - self._start
+
+
+def _as_loss(value):
+    """
+    :return: The loss returned by an objective function as a float, or as a
+        list of floats for several objectives, given as a sequence, an array
+        or a dict of named metrics.
+    """
+    if isinstance(value, numbers.Real):
+        return float(value)
+    if isinstance(value, dict):
+        value = list(value.values())
+    losses = [float(v) for v in np.asarray(value, dtype=float).ravel()]
+    return losses[0] if len(losses) == 1 else losses
+
+
+class _Search(object):
+    """
+    State shared by the ask and tell loops of the drivers.
+    """
+
+    def __init__(
+        self,
+        optimizer,
+        objective_function,
+        callbacks,
+        cache,
+        penalty,
+        timeout=None,
+        max_time=None,
+        seed=None,
+        seed_name=None,
+    ):
+        self.optimizer = optimizer
+        self.objective_function = objective_function
+        self.callbacks = list(callbacks)
+        self.cache = cache
+        self.penalty = penalty
+        self.timeout = timeout
+        self.deadline = None
+        if max_time is not None:
+            self.deadline = time.perf_counter() + max_time
+        self.seed = seed
+        self.seed_name = seed_name
+        self.stopped = False
+        self.penalized = []  # type: List[Trial]
+        self.remaining = (
+            optimizer.budget - optimizer.num_ask - optimizer.num_tell_not_asked
+        )
+
+    def past_deadline(self) -> bool:
+        """Whether the search was stopped by a callback or its deadline."""
+        if self.stopped:
+            return True
+        return self.deadline is not None and time.perf_counter() >= self.deadline
+
+    def can_ask(self) -> bool:
+        """Whether budget and time are left for a new trial."""
+        return self.remaining > 0 and not self.past_deadline()
+
+    def wait_timeout(self, trials: Iterable[Trial]) -> Optional[float]:
+        """
+        :return: Seconds until the first running trial times out or the
+            search deadline, None if there is neither.
+        """
+        if self.stopped:
+            return 0.0
+        limits = []
+        if self.deadline is not None:
+            limits.append(self.deadline)
+        if self.timeout is not None:
+            limits.extend(trial._start + self.timeout for trial in trials)
+        if not limits:
+            return None
+        return max(min(limits) - time.perf_counter(), 0.0)
+
+    def expire(self, running: dict):
+        """
+        Stop the running trials which timed out, or all of them once the
+        deadline passed; their futures or tasks are cancelled, although a
+        trial already running in a thread can not be interrupted.
+
+        :param running: Running trials keyed by future or task.
+        :raise TrialTimeout: if a trial timed out and there is no penalty.
+        """
+        now = time.perf_counter()
+        past_deadline = self.past_deadline()
+        expired = [
+            (future, trial)
+            for future, trial in running.items()
+            if past_deadline
+            or (
+                self.timeout is not None
+                and now - trial._start >= self.timeout
+                # a trial waiting for its turn to be told already finished
+                and not future.done()
+            )
+        ]
+        for future, trial in expired:
+            del running[future]
+            future.cancel()
+        for future, trial in expired:
+            if past_deadline:
+                self.tell(trial, None, "cancelled")
+                continue
+            self.tell(trial, self.penalty, "timeout")
+            if self.penalty is None:
+                raise TrialTimeout("Trial timed out after %ss" % self.timeout)
+
+    def ask(self) -> Trial:
+        start = time.perf_counter()
+        candidate = self.optimizer.ask()
+        self.remaining -= 1
+        trial = Trial(candidate, time.perf_counter() - start)
+        if self.seed is not None:
+            # independent streams for the seed and the number of the trial
+            entropy = [self.seed, self.optimizer.num_ask]
+            trial.seed = int(np.random.SeedSequence(entropy).generate_state(1)[0])
+        return trial
+
+    def arguments(self, trial: Trial) -> tuple:
+        """
+        :return: The args and kwargs of the objective function for a trial,
+            with its seed as `seed_name` if any.
+        """
+        kwargs = trial.kwargs
+        if trial.seed is not None and self.seed_name is not None:
+            kwargs = dict(kwargs, **{self.seed_name: trial.seed})
+        return trial.candidate.args, kwargs
+
+    def lookup(self, trial: Trial) -> bool:
+        """Tell the cached loss of the trial, if any."""
+        loss = None if self.cache is None else self.cache.get(trial.kwargs)
+        if loss is None:
+            return False
+        trial.cached = True
+        self.tell(trial, loss)
+        return True
+
+    def recommend(self) -> ng.p.Parameter:
+        """
+        :return: The recommendation of the optimizer, or a constant None
+            for a multi-objective search, as `optimizer.minimize` does; see
+            `optimizer.pareto_front()` instead.
+        """
+        self._tell_penalized()
+        if self.optimizer.num_objectives > 1:
+            return ng.p.Constant(None)
+        return self.optimizer.provide_recommendation()
+
+    def reject(self, trial: Trial) -> bool:
+        """
+        Tell the penalty of a trial violating the cheap constraints of the
+        parametrization, if it does, without evaluating it; the trial is not
+        told if there is no penalty.
+        """
+        if trial.candidate.satisfies_constraints():
+            return False
+        self.tell(trial, self.penalty, "infeasible")
+        return True
+
+    def _tell_optimizer(self, trial: Trial):
+        loss = trial.loss
+        if isinstance(loss, (int, float)) and self.optimizer.num_objectives > 1:
+            # a penalty of a multi-objective search, reported as told
+            trial.loss = [loss] * self.optimizer.num_objectives
+        start = time.perf_counter()
+        self.optimizer.tell(trial.candidate, trial.loss)
+        trial.tell_time = time.perf_counter() - start
+
+    def _report(self, trial: Trial):
+        for callback in self.callbacks:
+            try:
+                callback(trial)
+            except StopSearch:
+                self.stopped = True
+
+    def _tell_penalized(self):
+        """
+        Tell and report the penalties held until the number of objectives
+        was known; as single objective losses if it still is not.
+        """
+        penalized, self.penalized = self.penalized, []
+        for trial in penalized:
+            self._tell_optimizer(trial)
+            self._report(trial)
+
+    def tell(self, trial: Trial, loss: Optional[float], status: str = "ok"):
+        """
+        Tell the loss of a finished trial to the optimizer and report it to
+        the callbacks. A penalty told before the number of objectives is
+        known would make the search single objective: it is held, and told
+        and reported, on every objective, after the first loss.
+        """
+        trial.finish(loss, status)
+        if loss is not None and status != "ok" and not self.optimizer.num_objectives:
+            self.penalized.append(trial)
+            return
+        if loss is not None:
+            self._tell_optimizer(trial)
+            self._tell_penalized()
+        self._report(trial)
+
+    def evaluate(self, trial: Trial, future=None):
+        """
+        Tell the result of a trial, evaluated here if `future` is None.
+        """
+        try:
+            if future is None:
+                args, kwargs = self.arguments(trial)
+                loss = self.objective_function(*args, **kwargs)
+            else:
+                loss = future.result()
+        except Exception as e:
+            if isinstance(e, DeadlineExceeded) or (
+                isinstance(e, TrialTimeout) and self.past_deadline()
+            ):
+                # killed by the deadline of the search rather than its own
+                self.tell(trial, None, "cancelled")
+                return
+            status = "timeout" if isinstance(e, TrialTimeout) else "failed"
+            self.tell(trial, self.penalty, status)
+            if self.penalty is None:
+                raise
+            return
+        if isinstance(loss, Measurement):
+            trial.measurement, loss = loss, loss.loss
+        loss = _as_loss(loss)
+        if self.cache is not None:
+            self.cache.put(trial.kwargs, loss)
+        self.tell(trial, loss)
+
+
+def minimize(
+    optimizer: ng.optimizers.base.Optimizer,
+    objective_function: Callable[..., float],
+    executor: Optional[concurrent.futures.Executor] = None,
+    callbacks: Iterable[Callable[[Trial], None]] = (),
+    cache: Optional[EvaluationCache] = None,
+    penalty: Optional[float] = None,
+    timeout: Optional[float] = None,
+    max_time: Optional[float] = None,
+    ordered: bool = False,
+    seed: Optional[int] = None,
+    seed_name: Optional[str] = "seed",
+) -> ng.p.Parameter:
+    """
+    Minimize the objective function with the optimizer's ask and tell.
+
+    Unlike `optimizer.minimize`, every finished trial is handed to the
+    callbacks, including failed ones, and points told to the optimizer
+    beforehand without being asked (e.g. replayed from a journal) are deducted
+    from the budget.
+
+    The objective function may return several losses, as a sequence or a
+    dict of metrics, for nevergrad's multi-objective mode. Candidates
+    violating the cheap constraints of the parametrization, e.g. declared
+    by `constraint` hints, are told the penalty without being evaluated.
+
+    A trial running longer than `timeout` is told the penalty with status
+    "timeout", and once `max_time` has passed the trials still running are
+    handed to the callbacks with status "cancelled" and the current
+    recommendation is returned. The driver stops waiting for them, but a
+    trial running in a thread goes on until it returns: use an objective
+    function isolated in processes, such as `runner.IsolatedObjective`, for
+    stragglers to be killed.
+
+    With `ordered`, losses are told in the order the candidates were asked,
+    and a candidate is only asked once the oldest trial is told, so the
+    sequence of asks and tells does not depend on which trial finishes
+    first: with a seeded parametrization, see `hpng.get_parametrization`,
+    the search is reproducible, and evaluating trials in parallel or
+    sequentially (without an executor) gives the same trajectory for the
+    same `optimizer.num_workers`. Workers may wait for the oldest trial.
+    Timeouts and `max_time` still depend on timing.
+
+    :param optimizer: The nevergrad optimizer; its budget must be set.
+    :param objective_function: Function evaluated on the candidates' kwargs.
+    :param executor: Pool evaluating up to `optimizer.num_workers` trials in
+        parallel; trials are evaluated sequentially if it is None.
+    :param callbacks: Functions called with each finished `Trial`.
+    :param cache: Losses of already evaluated hyperparameters; a cached loss
+        is told to the optimizer without evaluating the objective function.
+    :param penalty: Loss told to the optimizer for a trial whose objective
+        function raised or timed out. If None, such a trial stops the search.
+    :param timeout: Seconds after which a trial times out; needs an executor.
+    :param max_time: Seconds after which the search stops; without an
+        executor, it is only checked between trials.
+    :param ordered: Tell losses in ask order, as described above.
+    :param seed: Seed from which a seed is derived for each trial with
+        NumPy's `SeedSequence`, given its number in ask order; it is the
+        trial's `seed`.
+    :param seed_name: Keyword argument receiving the seed of each trial,
+        e.g. an hpman value for `hpng.get_objective_function`; the seed is
+        not passed if None.
+    :return: The recommendation of the optimizer; a constant None for
+        several objectives, whose trade-offs are `optimizer.pareto_front()`.
+    """
+    if timeout is not None and executor is None:
+        raise ValueError("A trial timeout needs an executor")
+    search = _Search(
+        optimizer,
+        objective_function,
+        callbacks,
+        cache,
+        penalty,
+        timeout,
+        max_time,
+        seed,
+        seed_name,
+    )
+    # running trials in ask order
+    running = {}  # type: dict
+    while search.can_ask() or running:
+        while search.can_ask() and len(running) < optimizer.num_workers:
+            trial = search.ask()
+            if search.reject(trial) or search.lookup(trial):
+                continue
+            if executor is None and not ordered:
+                search.evaluate(trial)
+                continue
+            if executor is None:
+                # evaluated once the trials asked before it are told
+                future = concurrent.futures.Future()  # type: concurrent.futures.Future
+            else:
+                args, kwargs = search.arguments(trial)
+                future = executor.submit(objective_function, *args, **kwargs)
+            running[future] = trial
+        if not running:
+            continue
+        if ordered and executor is None:
+            search.evaluate(running.pop(next(iter(running))))
+        else:
+            done, _ = concurrent.futures.wait(
+                [next(iter(running))] if ordered else running,
+                timeout=search.wait_timeout(running.values()),
+                return_when=concurrent.futures.FIRST_COMPLETED,
+            )
+            for future in done:
+                search.evaluate(running.pop(future), future)
+        search.expire(running)
+    return search.recommend()
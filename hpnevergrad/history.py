@@ -0,0 +1,315 @@
+import csv
+import math
+from typing import List, Optional
+
+import nevergrad as ng
+import numpy as np
+
+from hpnevergrad import hpng
+from hpnevergrad.driver import Trial
+
+STATUSES = ["running", "ok", "failed", "timeout", "cancelled", "infeasible"]
+"""Statuses of trials, stored by index."""
+
+TIMINGS = ["wall_time", "ask_time", "tell_time", "objective_time"]
+"""Timings of trials stored in seconds, NaN if unknown."""
+
+
+class TrialHistory(object):
+    """
+    Compact history of the finished trials of a search, in NumPy arrays.
+
+    Passed as a callback of a driver, it stores each trial as one row of
+    preallocated arrays, grown by doubling: floats for `Scalar`, `Log` and
+    the flattened values of `Array`, int codes for `Choice` and
+    `TransitionChoice`, one per repetition, losses, statuses and timings. A trial costs a few
+    bytes per hyperparameter instead of its `Parameter` and dicts, and
+    queries such as `best` are vectorized.
+
+    Hyperparameters of a conditional space which are inactive in a trial
+    are stored as NaN or the code -1, and left out of its kwargs.
+    """
+
+    parametrization = None  # type: ng.p.Instrumentation
+    """The parametrization of the recorded trials."""
+
+    names = None  # type: List[str]
+    """Names of the hyperparameters."""
+
+    def __init__(self, parametrization: ng.p.Instrumentation, capacity: int = 1024):
+        """
+        :param parametrization: The parametrization of the optimizer.
+        :param capacity: Number of rows allocated initially.
+        """
+        self.parametrization = parametrization
+        self._parameters = hpng.all_parameters(parametrization[1])
+        self.names = sorted(self._parameters)
+        self._columns = {}  # type: dict
+        num_floats = num_codes = 0
+        for name in self.names:
+            parameter = self._parameters[name]
+            if isinstance(parameter, ng.p.BaseChoice):
+                size = len(parameter.indices.value)
+                self._columns[name] = ("code", num_codes, num_codes + size)
+                num_codes += size
+            elif isinstance(parameter, ng.p.Data):
+                size = int(np.prod(np.asarray(parameter.value).shape))
+                self._columns[name] = ("float", num_floats, num_floats + size)
+                num_floats += size
+            else:
+                raise TypeError(
+                    "Parameter %s of type %s can not be stored"
+                    % (name, type(parameter).__name__)
+                )
+        self._size = 0
+        self._floats = np.empty((capacity, num_floats))
+        self._codes = np.empty((capacity, num_codes), dtype=np.int32)
+        self._losses = None  # type: Optional[np.ndarray]
+        self._statuses = np.empty(capacity, dtype=np.int8)
+        self._cached = np.empty(capacity, dtype=bool)
+        self._timings = np.empty((capacity, len(TIMINGS)))
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def capacity(self) -> int:
+        """Number of rows allocated."""
+        return len(self._statuses)
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes allocated for the rows."""
+        arrays = [
+            self._floats,
+            self._codes,
+            self._losses,
+            self._statuses,
+            self._cached,
+            self._timings,
+        ]  # type: List[Optional[np.ndarray]]
+        return sum(array.nbytes for array in arrays if array is not None)
+
+    def _grow(self):
+        capacity = 2 * self.capacity
+        for attr in [
+            "_floats",
+            "_codes",
+            "_losses",
+            "_statuses",
+            "_cached",
+            "_timings",
+        ]:
+            array = getattr(self, attr)
+            if array is not None:
+                grown = np.empty((capacity,) + array.shape[1:], dtype=array.dtype)
+                grown[: self._size] = array[: self._size]
+                setattr(self, attr, grown)
+
+    def append(self, trial: Trial):
+        """
+        Record a finished trial.
+
+        :param trial: The finished trial.
+        """
+        losses = trial.loss
+        if self._losses is None and losses is not None:
+            num_objectives = len(losses) if isinstance(losses, list) else 1
+            self._losses = np.full((self.capacity, num_objectives), np.nan)
+        if self._size == self.capacity:
+            self._grow()
+        row = self._size
+        kwargs = hpng.active_parameters(trial.candidate[1])
+        for name, (kind, start, stop) in self._columns.items():
+            if name not in kwargs:
+                if kind == "code":
+                    self._codes[row, start:stop] = -1
+                else:
+                    self._floats[row, start:stop] = np.nan
+            elif kind == "code":
+                self._codes[row, start:stop] = kwargs[name].indices.value
+            else:
+                self._floats[row, start:stop] = np.ravel(kwargs[name].value)
+        if self._losses is not None:
+            self._losses[row] = np.nan if losses is None else losses
+        self._statuses[row] = STATUSES.index(trial.status)
+        self._cached[row] = trial.cached
+        measurement = trial.measurement
+        self._timings[row] = [
+            trial.wall_time,
+            trial.ask_time,
+            trial.tell_time,
+            math.nan if measurement is None else measurement.objective_time,
+        ]
+        self._size += 1
+
+    __call__ = append
+
+    @property
+    def losses(self) -> np.ndarray:
+        """Losses of the trials, one column per objective, NaN if not told."""
+        if self._losses is None:
+            return np.full((self._size, 1), np.nan)
+        return self._losses[: self._size]
+
+    @property
+    def statuses(self) -> List[str]:
+        """Statuses of the trials."""
+        return [STATUSES[i] for i in self._statuses[: self._size]]
+
+    def timings(self, name: str = "wall_time") -> np.ndarray:
+        """
+        :param name: One of `TIMINGS`.
+        :return: The timing of each trial in seconds, NaN if unknown.
+        """
+        return self._timings[: self._size, TIMINGS.index(name)]
+
+    def column(self, name: str) -> np.ndarray:
+        """
+        :param name: Name of a hyperparameter.
+        :return: Its values, one row per trial for an `Array`, and the
+            codes, i.e. indices in the choices, for a choice, one row per
+            trial with repetitions; NaN or -1 where it is inactive.
+        """
+        kind, start, stop = self._columns[name]
+        if kind == "code":
+            codes = self._codes[: self._size, start:stop]
+            return codes if self._is_repeated(name) else codes[:, 0]
+        values = self._floats[: self._size, start:stop]
+        if stop - start == 1 and np.ndim(self._parameters[name].value) == 0:
+            return values[:, 0]
+        return values
+
+    def _is_repeated(self, name: str) -> bool:
+        return hpng.is_repeated(self._parameters[name])
+
+    def _choices(self, name: str, codes: np.ndarray) -> list:
+        """
+        :return: The chosen values, one per repetition.
+        """
+        parameter = self._parameters[name]
+        if hpng.is_conditional(name, parameter):
+            return [parameter.choices[code].value[name] for code in codes]
+        return [parameter.choices.value[code] for code in codes]
+
+    def _choice(self, name: str, codes: np.ndarray):
+        values = self._choices(name, codes)
+        return tuple(values) if self._is_repeated(name) else values[0]
+
+    def _is_active(self, name: str, row: int) -> bool:
+        kind, start, _ = self._columns[name]
+        if kind == "code":
+            return self._codes[row, start] >= 0
+        return not np.isnan(self._floats[row, start])
+
+    def kwargs(self, row: int) -> dict:
+        """
+        :param row: Index of a trial.
+        :return: The hyperparameters of the trial.
+        """
+        if not 0 <= row < self._size:
+            raise IndexError(row)
+        kwargs = {}
+        for name, (kind, start, stop) in self._columns.items():
+            if not self._is_active(name, row):
+                continue
+            if kind == "code":
+                kwargs[name] = self._choice(name, self._codes[row, start:stop])
+                continue
+            template = self._parameters[name].value
+            values = self._floats[row, start:stop]
+            if np.ndim(template) == 0:
+                kwargs[name] = type(template)(values[0])
+            else:
+                kwargs[name] = values.reshape(np.shape(template)).copy()
+        return kwargs
+
+    def best(self, k: int = 1, objective: int = 0) -> List[dict]:
+        """
+        :param k: Number of trials.
+        :param objective: Index of the objective ranking the trials.
+        :return: The `k` trials of lowest loss among the told ones, best
+            first, as dicts of their row, kwargs, loss and status.
+        """
+        losses = self.losses[:, objective]
+        told = np.flatnonzero(~np.isnan(losses))
+        k = min(k, len(told))
+        if k == 0:
+            return []
+        top = told[np.argpartition(losses[told], k - 1)[:k]]
+        top = top[np.argsort(losses[top], kind="stable")]
+        return [
+            {
+                "row": int(row),
+                "kwargs": self.kwargs(row),
+                "loss": self._loss(row),
+                "status": STATUSES[self._statuses[row]],
+            }
+            for row in top
+        ]
+
+    def _loss(self, row: int):
+        losses = self.losses[row].tolist()
+        return losses[0] if len(losses) == 1 else losses
+
+    def _header(self) -> List[str]:
+        header = []
+        for name, (kind, start, stop) in self._columns.items():
+            if stop - start == 1:
+                header.append(name)
+            else:
+                header.extend("%s[%d]" % (name, i) for i in range(stop - start))
+        return header
+
+    def to_csv(self, path: str):
+        """
+        Export the trials as CSV, with one column per hyperparameter, or per
+        element of an `Array`, choices by value and empty if inactive, the
+        losses, status, whether the loss was cached, and the timings.
+
+        :param path: File to write.
+        """
+        num_objectives = self.losses.shape[1]
+        loss_header = (
+            ["loss"]
+            if num_objectives == 1
+            else ["loss[%d]" % i for i in range(num_objectives)]
+        )
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(
+                self._header() + loss_header + ["status", "cached"] + TIMINGS
+            )
+            for row in range(self._size):
+                values = []
+                for name, (kind, start, stop) in self._columns.items():
+                    if not self._is_active(name, row):
+                        values.extend([""] * (stop - start))
+                    elif kind == "code":
+                        codes = self._codes[row, start:stop]
+                        values.extend(self._choices(name, codes))
+                    else:
+                        values.extend(self._floats[row, start:stop].tolist())
+                writer.writerow(
+                    values
+                    + self.losses[row].tolist()
+                    + [STATUSES[self._statuses[row]], bool(self._cached[row])]
+                    + self._timings[row].tolist()
+                )
+
+    def save(self, path: str):
+        """
+        Export the arrays of the trials to a `.npz` file, readable by
+        `np.load`.
+
+        :param path: File to write.
+        """
+        arrays = {
+            "losses": self.losses,
+            "statuses": self._statuses[: self._size],
+            "cached": self._cached[: self._size],
+            "timings": self._timings[: self._size],
+        }
+        for name in self.names:
+            arrays["hp:" + name] = self.column(name)
+        np.savez_compressed(path, **arrays)
@@ -1,11 +1,35 @@
+import ast
+import collections
+import contextlib
+import contextvars
+import hashlib
 import importlib
-from typing import Callable
+import importlib.util
+import inspect
+import json
+import os
+import pickle
+import threading
+import types
+import warnings
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Set, Tuple
 
 import hpman
-import nevergrad as ng
-import numpy as np
+import hpman.m
 from hpman import L
 
+from hpnevergrad._lazy import LazyModule
+
+if TYPE_CHECKING:
+    import concurrent.futures
+
+    import nevergrad as ng
+    import numpy as np
+else:
+    # only needed to build parametrizations and optimizers
+    ng = LazyModule("nevergrad")
+    np = LazyModule("numpy")
+
 
 class NgMethod(object):
     """
@@ -25,7 +49,8 @@ class NgMethod(object):
     casting_kwargs = None
     """Save `set_integer_casting()` kwargs from hpman's hint."""
 
-    method = ng.p.Parameter()
+    method = None  # type: ng.p.Parameter
+    """The nevergrad parameter built."""
 
     def __init__(self, value, hint):
         """
@@ -38,7 +63,9 @@ class NgMethod(object):
         :method: type of parameter in nevergrad.
         """
         self.value = value
-        self.hint = hint
+        # the hint is consumed while building the parameter: never alter
+        # the one stored in the hpman db.
+        self.hint = dict(hint)
         self.bounds_kwargs = {}
         self.mutation_kwargs = {}
         self.casting_kwargs = {}
@@ -158,44 +185,681 @@ def get_method_type(value, hint):
     return method_type
 
 
-def get_parametrization(hp_mgr: hpman.HyperParameterManager):
+class HintConflictError(ValueError):
+    """
+    A hyperparameter is declared with different hints or default values in
+    several places.
+    """
+
+
+def _declaration(oc) -> str:
+    value = oc["value"]
+    if isinstance(value, hpman.EmptyValue):
+        value = None
+    return json.dumps([value, oc["hints"]], sort_keys=True, default=repr)
+
+
+def select_occurrences(occurrences):
+    """
+    Pick the canonical hinted occurrence of each hyperparameter, in a single
+    pass over the occurrences.
+
+    The canonical occurrence is the last one of the last file in name order,
+    preferring occurrences which declare a default value.
+
+    :param occurrences: Occurrences parsed from source files.
+    :return: Dict of hyperparameter name to its canonical occurrence, and
+        dict of hyperparameter name to its occurrences for those declared
+        with different hints, or different default values.
+    """
+    canonical = {}  # type: dict
+    ranks = {}  # type: dict
+    hinted = {}  # type: dict
+    for oc in occurrences:
+        if len(oc["hints"]) == 0:
+            continue
+        name = oc["name"]
+        rank = (not isinstance(oc["value"], hpman.EmptyValue), oc["filename"])
+        if name not in canonical or rank >= ranks[name]:
+            canonical[name], ranks[name] = oc, rank
+        hinted.setdefault(name, []).append(oc)
+    conflicts = {}
+    for name, ocs in hinted.items():
+        if len(ocs) < 2:
+            continue
+        hints = {json.dumps(oc["hints"], sort_keys=True, default=repr) for oc in ocs}
+        values = {
+            _declaration(oc)
+            for oc in ocs
+            if not isinstance(oc["value"], hpman.EmptyValue)
+        }
+        if len(hints) > 1 or len(values) > 1:
+            conflicts[name] = ocs
+    return canonical, conflicts
+
+
+def _check_conflicts(conflicts: dict, strict: bool):
+    if not conflicts:
+        return
+    message = "Conflicting declarations of hyperparameters:\n" + "\n".join(
+        "  %s: %s"
+        % (
+            name,
+            ", ".join(
+                "%s:%s %s" % (oc["filename"], oc["lineno"], _declaration(oc))
+                for oc in ocs
+            ),
+        )
+        for name, ocs in sorted(conflicts.items())
+    )
+    if strict:
+        raise HintConflictError(message)
+    warnings.warn(message)
+
+
+def _fingerprint(occurrences) -> str:
+    rows = []
+    for oc in occurrences:
+        if len(oc["hints"]) > 0:
+            value = oc["value"]
+            if isinstance(value, hpman.EmptyValue):
+                value = None
+            rows.append(
+                json.dumps(
+                    [oc["name"], oc["filename"], oc["lineno"], value, oc["hints"]],
+                    sort_keys=True,
+                    default=repr,
+                )
+            )
+    return hashlib.sha1("\n".join(sorted(rows)).encode("utf-8")).hexdigest()
+
+
+def get_fingerprint(hp_mgr: hpman.HyperParameterManager) -> str:
+    """
+    Hash of the hinted occurrences parsed by a manager, which determine its
+    parametrization.
+
+    :param hp_mgr: The hyperparameter manager from `hpman`.
+    """
+    return _fingerprint(hp_mgr.db.select(L.exist_attr("filename")))
+
+
+def dump_parametrization(parametrization: "ng.p.Instrumentation", path: str):
+    """
+    Save a parametrization, e.g. to be loaded by worker processes.
+
+    :param parametrization: The parametrization to save.
+    :param path: File to write; replaced atomically.
+    """
+    tmp_path = "%s.%d.tmp" % (path, os.getpid())
+    with open(tmp_path, "wb") as f:
+        pickle.dump(parametrization, f)
+    os.replace(tmp_path, path)
+
+
+def load_parametrization(path: str) -> "ng.p.Instrumentation":
+    """
+    :param path: File written by `dump_parametrization`.
+    """
+    with open(path, "rb") as f:
+        return pickle.load(f)
+
+
+_parametrizations = {}  # type: dict
+"""Parametrizations already built in this process, keyed by fingerprint."""
+
+
+class Constraint(object):
+    """
+    Cheap constraint declared by the `constraint` hint of a hyperparameter,
+    a Python expression of the hyperparameters which must hold, e.g.
+    `_("bs", 32, range=[1, 512], constraint="bs * seq_len <= 65536")`.
+
+    Registered on the parametrization, it is checked on each candidate
+    before its objective function is evaluated, and holds if it involves a
+    conditional hyperparameter which is not active. Only the expression is
+    pickled.
+    """
+
+    expression = None  # type: str
+    """Python expression of the hyperparameters."""
+
+    builtins = {
+        "abs": abs,
+        "all": all,
+        "any": any,
+        "bool": bool,
+        "float": float,
+        "int": int,
+        "len": len,
+        "max": max,
+        "min": min,
+        "round": round,
+    }  # type: Dict[str, Callable]
+    """Functions available to the expression."""
+
+    def __init__(self, expression: str):
+        """
+        :param expression: Python expression of the hyperparameters, true
+            for feasible ones.
+        """
+        self.expression = expression
+        self._code = None  # type: Optional[types.CodeType]
+        self._names = []  # type: List[str]
+
+    @property
+    def names(self) -> List[str]:
+        """Names the expression refers to, other than its functions."""
+        tree = ast.parse(self.expression, mode="eval")
+        names = set()  # type: Set[str]
+        bound = set(self.builtins)
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Name):
+                # variables of comprehensions are stored
+                (names if isinstance(node.ctx, ast.Load) else bound).add(node.id)
+            elif isinstance(node, ast.arg):
+                bound.add(node.arg)
+        return sorted(names - bound)
+
+    def __call__(self, value) -> bool:
+        """
+        :param value: Value of an instrumentation, i.e. args and kwargs.
+        """
+        if self._code is None:
+            self._code = compile(self.expression, "<constraint>", "eval")
+            self._names = self.names
+        kwargs = flatten_kwargs(value[1])
+        if any(name not in kwargs for name in self._names):
+            # an inactive conditional hyperparameter
+            return True
+        return bool(eval(self._code, {"__builtins__": self.builtins}, kwargs))
+
+    def __getstate__(self):
+        return {"expression": self.expression}
+
+    def __setstate__(self, state):
+        Constraint.__init__(self, state["expression"])
+
+    def __repr__(self):
+        return "Constraint(%r)" % self.expression
+
+
+def _parse_condition(name: str, condition) -> Tuple[str, list]:
+    """
+    :return: The hyperparameter an `active_if` hint depends on, and the
+        values of it for which the hinted one is active.
+    """
+    if not isinstance(condition, dict) or len(condition) != 1:
+        raise ValueError(
+            "active_if of %s must map one hyperparameter to its values, got %r"
+            % (name, condition)
+        )
+    ((parent, values),) = condition.items()
+    if not isinstance(values, (list, tuple)):
+        values = [values]
+    return parent, list(values)
+
+
+def _check_conditions(hints: dict, conditions: dict):
+    for name, (parent, values) in sorted(conditions.items()):
+        if parent not in hints:
+            raise ValueError(
+                "%s is active_if %s, which is not a hyperparameter" % (name, parent)
+            )
+        choices = hints[parent].get("choices")
+        if choices is None or "repetitions" in hints[parent]:
+            raise ValueError(
+                "%s is active_if %s, which is not a single choice" % (name, parent)
+            )
+        unknown = [v for v in values if v not in choices]
+        if unknown:
+            raise ValueError(
+                "%s is active_if %s in %r, which are not choices of it"
+                % (name, parent, unknown)
+            )
+        ancestors = [name]
+        while parent in conditions:
+            if parent in ancestors:
+                raise ValueError(
+                    "Cyclic active_if: %s" % " -> ".join(ancestors + [parent])
+                )
+            ancestors.append(parent)
+            parent = conditions[parent][0]
+
+
+def _build_parametrization(canonical: dict):
+    hints = {}
+    conditions = {}
+    constraints = []
+    for name, oc in sorted(canonical.items()):
+        hint = dict(oc["hints"])
+        expressions = hint.pop("constraint", [])
+        if isinstance(expressions, str):
+            expressions = [expressions]
+        constraints.extend(expressions)
+        condition = hint.pop("active_if", None)
+        if condition is not None:
+            conditions[name] = _parse_condition(name, condition)
+        hints[name] = hint
+    _check_conditions(hints, conditions)
+    children = collections.defaultdict(list)
+    for name, (parent, _) in sorted(conditions.items()):
+        children[parent].append(name)
+
+    def build(name):
+        value, hint = canonical[name]["value"], hints[name]
+        if name in children:
+            # one branch per choice, holding the choice and the
+            # hyperparameters active for it
+            branches = []
+            for choice in hint["choices"]:
+                branch = {name: choice}
+                for child in children[name]:
+                    if choice in conditions[child][1]:
+                        branch[child] = build(child)
+                branches.append(ng.p.Dict(**branch))
+            hint = dict(hint, choices=branches)
+        method_type = get_method_type(value, hint)
+        return getattr(NgMethod(value, hint), method_type)()
+
+    kw = {name: build(name) for name in sorted(canonical) if name not in conditions}
+    parametrization = ng.p.Instrumentation(**kw)
+    for expression in constraints:
+        constraint = Constraint(expression)
+        unknown = [name for name in constraint.names if name not in canonical]
+        if unknown:
+            raise ValueError(
+                "Constraint %r refers to unknown hyperparameters %s"
+                % (expression, ", ".join(unknown))
+            )
+        parametrization.register_cheap_constraint(constraint)
+    return parametrization
+
+
+def is_conditional(name: str, parameter: "ng.p.Parameter") -> bool:
+    """
+    :return: Whether the parameter of a hyperparameter is the choice of the
+        branches of a conditional space, built for hyperparameters hinted
+        `active_if` it.
+    """
+    return isinstance(parameter, ng.p.BaseChoice) and all(
+        isinstance(branch, ng.p.Dict) and name in branch.keys()
+        for branch in parameter.choices
+    )
+
+
+def is_repeated(parameter: "ng.p.Parameter") -> bool:
+    """
+    :return: Whether a parameter is a choice with repetitions, whose value is
+        a tuple of choices, even for one repetition.
+    """
+    return getattr(parameter, "_repetitions", None) is not None
+
+
+def get_value(name: str, parameter: "ng.p.Parameter"):
+    """
+    :return: The value of the hyperparameter of a parameter, i.e. the choice
+        of the branch for a conditional one.
+    """
+    if is_conditional(name, parameter):
+        return parameter.value[name]
+    return parameter.value
+
+
+def active_parameters(parameters: "ng.p.Dict") -> dict:
+    """
+    :param parameters: The kwargs of an instrumentation, e.g. `candidate[1]`.
+    :return: Name to parameter of the active hyperparameters: for a
+        conditional one, its choice followed by the hyperparameters of the
+        chosen branch.
+    """
+    active = {}
+    for name, parameter in parameters.items():
+        if name in active:
+            # the choice of a branch
+            continue
+        active[name] = parameter
+        if is_conditional(name, parameter):
+            active.update(active_parameters(parameter.choices[parameter.index]))
+            active[name] = parameter
+    return active
+
+
+def all_parameters(parameters: "ng.p.Dict") -> dict:
+    """
+    :param parameters: The kwargs of an instrumentation.
+    :return: Name to parameter of every hyperparameter, active or not, in
+        the first branch it appears in.
+    """
+    every = {}
+    for name, parameter in parameters.items():
+        if name in every:
+            continue
+        every[name] = parameter
+        if is_conditional(name, parameter):
+            for branch in parameter.choices:
+                for child, child_parameter in all_parameters(branch).items():
+                    every.setdefault(child, child_parameter)
+    return every
+
+
+def flatten_kwargs(kwargs: dict) -> dict:
+    """
+    :param kwargs: The kwargs of a candidate, where the value of a
+        conditional hyperparameter is the dict of its branch.
+    :return: The kwargs of the active hyperparameters, flat.
+    """
+    flat = {}
+    for name, value in kwargs.items():
+        if isinstance(value, dict) and name in value:
+            flat.update(flatten_kwargs(value))
+        else:
+            flat[name] = value
+    return flat
+
+
+def _nest_kwargs(parameters: "ng.p.Dict", kwargs: dict) -> dict:
+    nested = {}
+    for name, parameter in parameters.items():
+        if is_conditional(name, parameter):
+            value = kwargs[name] if name in kwargs else get_value(name, parameter)
+            for branch in parameter.choices:
+                if branch.value[name] == value:
+                    break
+            else:
+                raise ValueError("%r is not a choice of %s" % (value, name))
+            nested[name] = _nest_kwargs(branch, kwargs)
+        elif name in kwargs:
+            nested[name] = kwargs[name]
+        else:
+            nested[name] = parameter.value
+    return nested
+
+
+def nest_kwargs(parametrization: "ng.p.Instrumentation", kwargs: dict) -> dict:
+    """
+    Inverse of `flatten_kwargs`.
+
+    :param parametrization: The parametrization.
+    :param kwargs: Flat kwargs; missing hyperparameters take the value of
+        the parametrization.
+    :return: The kwargs of a candidate, e.g. for
+        `parametrization.spawn_child(new_value=((), kwargs))`.
+    """
+    return _nest_kwargs(parametrization[1], kwargs)
+
+
+def _get_parametrization(occurrences, cache_dir=None, strict=False, seed=None):
+    occurrences = list(occurrences)
+    canonical, conflicts = select_occurrences(occurrences)
+    _check_conflicts(conflicts, strict)
+    fingerprint = _fingerprint(occurrences)
+    if fingerprint not in _parametrizations:
+        path = None
+        if cache_dir is not None:
+            path = os.path.join(cache_dir, fingerprint + ".pkl")
+        if path is not None and os.path.exists(path):
+            parametrization = load_parametrization(path)
+        else:
+            parametrization = _build_parametrization(canonical)
+            if path is not None:
+                os.makedirs(cache_dir, exist_ok=True)
+                dump_parametrization(parametrization, path)
+        _parametrizations[fingerprint] = parametrization
+    parametrization = _parametrizations[fingerprint].copy()
+    if seed is not None:
+        # copies share the random state: give this one its own, before any
+        # value is drawn, e.g. the default of a choice
+        parametrization.random_state = np.random.RandomState(seed)
+    return parametrization
+
+
+def get_parametrization(
+    hp_mgr: hpman.HyperParameterManager,
+    cache_dir: Optional[str] = None,
+    strict: bool = False,
+    seed: Optional[int] = None,
+):
     """Define hyperparameters in nevergrad parametrization type.
 
+    Each hyperparameter is defined by its canonical hinted occurrence, see
+    `select_occurrences`. The parametrization is built once per fingerprint
+    of the manager's db and memoized; each call returns an independent copy.
+
     :param hp_mgr: The hyperparameter manager from `hpman`. It is
         usually an 'underscore' variable obtained by `from hpman.m import _`
+    :param cache_dir: Directory where built parametrizations are saved by
+        fingerprint, so that other processes load them instead of building.
+    :param strict: Raise `HintConflictError` instead of warning when a
+        hyperparameter is declared with different hints or default values.
+    :param seed: Seed of the random state of the parametrization, which
+        nevergrad optimizers draw from, for reproducible searches.
     :return: ng.p.Instrumentation. Container of parameters available.
     """
-    kw = {}
-    for k, d in sorted(hp_mgr.db.group_by("name").items()):
-        for i, oc in enumerate(
-            d.select(L.exist_attr("filename")).sorted(L.order_by("filename"))
-        ):
-            if len(oc["hints"]) > 0:
-                hint = oc["hints"]
-                value = oc["value"]
-                name = oc["name"]
-                method_type = get_method_type(value, hint)
-                method = getattr(NgMethod(value, hint), method_type)
-                kw[name] = method()
-    return ng.p.Instrumentation(**kw)
+    return _get_parametrization(
+        hp_mgr.db.select(L.exist_attr("filename")), cache_dir, strict, seed
+    )
+
+
+_bound_values = contextvars.ContextVar(
+    "hpnevergrad_bound_values", default={}
+)  # type: contextvars.ContextVar[dict]
+"""Values bound by `bind_values` in the current context, keyed by manager id."""
+
+
+def _enable_bound_values(hpm: hpman.HyperParameterManager):
+    """
+    Make `hpm` look up the values bound in the current context before its db.
+    This is done once per manager; the db is never written when binding.
+    """
+    if getattr(hpm, "_hpng_bound_values", False):
+        return
+    get_value, get_values = hpm.get_value, hpm.get_values
+    push_occurrence = hpm.db.push_occurrence
+    lock = threading.Lock()
+
+    def bound_get_value(name, *, raise_exception=True):
+        values = _bound_values.get().get(id(hpm), {})
+        if name in values:
+            return values[name]
+        return get_value(name, raise_exception=raise_exception)
+
+    def bound_get_values():
+        values = get_values()
+        values.update(_bound_values.get().get(id(hpm), {}))
+        return values
+
+    def locked_push_occurrence(*args, **kwargs):
+        # hpman checks-then-appends; concurrent trials calling `_(name, value)`
+        # for the first time would otherwise both append an occurrence.
+        with lock:
+            push_occurrence(*args, **kwargs)
+
+    hpm.get_value = bound_get_value
+    hpm.get_values = bound_get_values
+    hpm.db.push_occurrence = locked_push_occurrence
+    hpm._hpng_bound_values = True
+
+
+@contextlib.contextmanager
+def bind_values(hpm: hpman.HyperParameterManager, values: dict):
+    """
+    Bind hyperparameter values to `hpm` in the current context only.
+
+    The values take precedence over every value in the hpman db, but are only
+    visible to code running in the same thread or asyncio task, so concurrent
+    trials sharing one manager never read each other's values.
+
+    :param hpm: The hyperparameter manager read by the trial.
+    :param values: Dict of hyperparameter name to value.
+    """
+    _enable_bound_values(hpm)
+    bound = dict(_bound_values.get())
+    scoped = dict(bound.get(id(hpm), {}))
+    scoped.update(values)
+    bound[id(hpm)] = scoped
+    token = _bound_values.set(bound)
+    try:
+        yield hpm
+    finally:
+        _bound_values.reset(token)
 
 
 def get_objective_function(
     train: Callable[[], float], hpm: hpman.HyperParameterManager
 ):
+    if inspect.iscoroutinefunction(train):
+
+        async def async_objective_function(**kwargs):
+            with bind_values(hpm, kwargs):
+                return await train()
+
+        return async_objective_function
+
     def objective_function(**kwargs):
-        hpm.set_values(kwargs)
-        return train()
+        with bind_values(hpm, kwargs):
+            return train()
 
     return objective_function
 
 
+class ModuleObjective(object):
+    """
+    Picklable objective function of the command line `module.py:obj`.
+
+    Only the location of the objective is pickled; the target module is
+    imported lazily, once per process, and its values are bound to that
+    process's own hpman manager. It can therefore be shipped to the workers
+    of a process pool without sharing state between trials.
+    """
+
+    module = None  # type: str
+    """File name of the target module."""
+
+    obj = None  # type: str
+    """Name of the objective function in the target module."""
+
+    placeholder = None  # type: str
+    """Placeholder of hpman used in the target module."""
+
+    _loaded = {}  # type: dict
+    """Objective functions already imported in the current process."""
+
+    def __init__(self, module: str, obj: str, placeholder: str = "_"):
+        """
+        :param module: A string of file name to parse.
+        :param obj: A string of the function in module.
+        :param placeholder: The placeholder of hpman used in module, which is
+            the name of the manager obtained by `from hpman.m import _`.
+        """
+        self.module = module
+        self.obj = obj
+        self.placeholder = placeholder
+
+    def load(self) -> Callable[..., float]:
+        """
+        :return: the objective function of the current process.
+        """
+        key = (self.module, self.obj, self.placeholder)
+        if key not in self._loaded:
+            train = import_func(self.module, self.obj)
+            hp_mgr = getattr(hpman.m, self.placeholder)
+            self._loaded[key] = get_objective_function(train, hp_mgr)
+        return self._loaded[key]
+
+    def __call__(self, **kwargs):
+        return self.load()(**kwargs)
+
+
 # hpng command line tool
-def optimizer_warpper(optim_type: str, budget: int, param: ng.p.Instrumentation):
-    optim = ng.optimizers.registry[optim_type](parametrization=param, budget=budget)
+def optimizer_warpper(
+    optim_type: str, budget: int, param: "ng.p.Instrumentation", num_workers: int = 1
+):
+    optim = ng.optimizers.registry[optim_type](
+        parametrization=param, budget=budget, num_workers=num_workers
+    )
     return optim
 
 
+def _optimizer_names_path() -> Optional[str]:
+    """
+    :return: File caching the optimizer names of the installed nevergrad,
+        keyed by its location and modification time; None if nevergrad has
+        no file to key it by, e.g. a namespace or zip install.
+    """
+    spec = importlib.util.find_spec("nevergrad")
+    if spec is None or spec.origin is None:
+        return None
+    try:
+        key = "%s:%s" % (spec.origin, os.stat(spec.origin).st_mtime_ns)
+    except OSError:
+        return None
+    cache_home = os.environ.get(
+        "XDG_CACHE_HOME", os.path.join(os.path.expanduser("~"), ".cache")
+    )
+    return os.path.join(
+        cache_home,
+        "hpnevergrad",
+        "optimizers-%s.json" % hashlib.sha1(key.encode("utf-8")).hexdigest()[:16],
+    )
+
+
+def get_optimizer_names() -> List[str]:
+    """
+    Names of the optimizers in nevergrad's registry.
+
+    Importing nevergrad takes seconds, so the names are cached in the user's
+    cache directory and only listed again when nevergrad changes.
+    """
+    path = _optimizer_names_path()
+    if path is None:
+        return sorted(ng.optimizers.registry.keys())
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        pass
+    names = sorted(ng.optimizers.registry.keys())
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = "%s.%d.tmp" % (path, os.getpid())
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(names, f)
+        os.replace(tmp_path, path)
+    except OSError:
+        pass
+    return names
+
+
+def get_executor(executor: str, num_workers: int) -> "concurrent.futures.Executor":
+    """
+    Create the pool in which trials are evaluated.
+
+    :param executor: "thread" or "process".
+    :param num_workers: number of trials evaluated in parallel.
+    """
+    import concurrent.futures
+
+    if executor == "thread":
+        return concurrent.futures.ThreadPoolExecutor(max_workers=num_workers)
+    if executor == "process":
+        return concurrent.futures.ProcessPoolExecutor(max_workers=num_workers)
+    raise ValueError("Unknown executor: %r" % executor)
+
+
+def to_json(value):
+    """
+    `default` of `json.dumps` for the numpy values found in kwargs.
+
+    :param value: A value `json` can not serialize.
+    """
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError("Object of type %s is not JSON serializable" % type(value))
+
+
 def split_module(module):
     """
     split module string to file name and function name.
@@ -0,0 +1,176 @@
+import glob
+import hashlib
+import os
+import pickle
+from typing import List, Optional, Union
+
+import hpman
+
+from hpnevergrad import hpng
+
+
+class SourceIndex(object):
+    """
+    Hinted hyperparameter declarations of a code base, parsed file by file
+    and saved between searches.
+
+    `hpman` parses all files into one db, at a cost growing with the square
+    of the number of occurrences. The index parses each file with its own
+    manager instead, and only files whose content changed since the last
+    `update` are parsed again, which keeps building the search space of a
+    large repository fast.
+    """
+
+    placeholder = None  # type: str
+    """Placeholder of hpman used in the indexed files."""
+
+    path = None  # type: Optional[str]
+    """File the index is saved to."""
+
+    version = 1
+    """Version of the saved index; an index of another version is rebuilt."""
+
+    def __init__(self, placeholder: str = "_", path: Optional[str] = None):
+        """
+        :param placeholder: The placeholder of hpman used in the indexed
+            files.
+        :param path: File the index is loaded from if it exists, and saved
+            to by `update`; the index only lives in memory if None.
+        """
+        self.placeholder = placeholder
+        self.path = path
+        self._files = {}  # type: dict
+        if path is not None and os.path.exists(path):
+            try:
+                with open(path, "rb") as f:
+                    saved = pickle.load(f)
+            except (OSError, EOFError, pickle.UnpicklingError):
+                saved = None
+            if (
+                isinstance(saved, dict)
+                and saved.get("version") == self.version
+                and saved.get("placeholder") == placeholder
+            ):
+                self._files = saved["files"]
+
+    @staticmethod
+    def _walk(paths: List[str]) -> List[str]:
+        """
+        :return: The python files of the given files and directories, like
+            `hpman.HyperParameterManager.parse_file` walks them.
+        """
+        files = set()
+        for path in paths:
+            if os.path.isdir(path):
+                files.update(glob.glob(os.path.join(path, "**/*.py"), recursive=True))
+            elif os.path.exists(path):
+                files.add(path)
+            else:
+                raise FileNotFoundError(path)
+        return sorted(files)
+
+    def _parse(self, filename: str, source: str) -> list:
+        hp_mgr = hpman.HyperParameterManager(self.placeholder)
+        hp_mgr.parse_source(source, filename)
+        return [
+            {
+                "name": oc["name"],
+                "value": oc["value"],
+                "hints": oc["hints"],
+                "filename": oc["filename"],
+                "lineno": oc["lineno"],
+            }
+            for oc in hp_mgr.db
+            if len(oc["hints"]) > 0
+        ]
+
+    def update(self, paths: Union[str, List[str]]) -> List[str]:
+        """
+        Index the given files and directories, parsing only the files that
+        are new or changed since they were last indexed, and forget the
+        files no longer found. The index is saved if it changed.
+
+        :param paths: Python files or directories, searched recursively.
+        :return: The files parsed.
+        """
+        if not isinstance(paths, list):
+            paths = [paths]
+        files = {}
+        parsed = []
+        changed = False
+        for filename in self._walk(paths):
+            stat = os.stat(filename)
+            entry = self._files.get(filename)
+            if entry is not None and entry["stat"] == (stat.st_mtime_ns, stat.st_size):
+                files[filename] = entry
+                continue
+            with open(filename, "rb") as f:
+                content = f.read()
+            sha1 = hashlib.sha1(content).hexdigest()
+            changed = True
+            if entry is None or entry["sha1"] != sha1:
+                entry = {
+                    "sha1": sha1,
+                    "occurrences": self._parse(filename, content.decode("utf-8")),
+                }
+                parsed.append(filename)
+            entry["stat"] = (stat.st_mtime_ns, stat.st_size)
+            files[filename] = entry
+        changed = changed or len(files) != len(self._files)
+        self._files = files
+        if changed and self.path is not None:
+            self.save()
+        return parsed
+
+    def save(self):
+        """
+        Save the index to `path`; replaced atomically.
+        """
+        if self.path is None:
+            raise ValueError("The index has no path")
+        tmp_path = "%s.%d.tmp" % (self.path, os.getpid())
+        with open(tmp_path, "wb") as f:
+            pickle.dump(
+                {
+                    "version": self.version,
+                    "placeholder": self.placeholder,
+                    "files": self._files,
+                },
+                f,
+            )
+        os.replace(tmp_path, self.path)
+
+    @property
+    def files(self) -> List[str]:
+        """The indexed files."""
+        return sorted(self._files)
+
+    def occurrences(self) -> list:
+        """
+        :return: The hinted occurrences of the indexed files, as dicts with
+            the keys of `hpman` occurrences, in file order.
+        """
+        return [
+            oc
+            for filename in sorted(self._files)
+            for oc in self._files[filename]["occurrences"]
+        ]
+
+    def get_parametrization(
+        self,
+        cache_dir: Optional[str] = None,
+        strict: bool = False,
+        seed: Optional[int] = None,
+    ):
+        """
+        Counterpart of `hpng.get_parametrization` for the indexed files.
+
+        :param cache_dir: Directory where built parametrizations are saved by
+            fingerprint.
+        :param strict: Raise `hpng.HintConflictError` instead of warning when
+            a hyperparameter is declared with different hints or default
+            values.
+        :param seed: Seed of the random state of the parametrization.
+        :return: ng.p.Instrumentation. Container of parameters available.
+        """
+        return hpng._get_parametrization(self.occurrences(), cache_dir, strict, seed)
@@ -0,0 +1,157 @@
+import json
+import os
+import time
+from typing import List
+
+import nevergrad as ng
+
+from hpnevergrad import hpng
+from hpnevergrad.driver import Trial
+
+
+class TrialJournal(object):
+    """
+    Append-only journal of finished trials, one JSON object per line.
+
+    Every record is flushed to the OS as soon as it is written, so it survives
+    a crash of the search process; `fsync` is batched to keep the journal
+    cheap while bounding what a machine failure can lose. A truncated last
+    line, left by a crash in the middle of a write, is removed when the
+    journal is reopened, so that new records start on a line of their own.
+    """
+
+    path = None  # type: str
+    """File the journal is appended to."""
+
+    fsync_every = None  # type: int
+    """Maximum number of records written between two fsync."""
+
+    fsync_interval = None  # type: float
+    """Maximum number of seconds between two fsync."""
+
+    def __init__(self, path: str, fsync_every: int = 16, fsync_interval: float = 5.0):
+        """
+        :param path: File the journal is appended to; created if missing,
+            and truncated after its last complete line.
+        :param fsync_every: Maximum number of records written between two fsync.
+        :param fsync_interval: Maximum number of seconds between two fsync.
+        """
+        self.path = path
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        _truncate_torn(path)
+        self._file = open(path, "a", encoding="utf-8")
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def write(self, trial: Trial):
+        """
+        Append a finished trial to the journal.
+
+        :param trial: The finished trial.
+        """
+        record = {
+            "kwargs": trial.kwargs,
+            "loss": trial.loss,
+            "wall_time": trial.wall_time,
+            "status": trial.status,
+        }
+        if trial.seed is not None:
+            record["seed"] = trial.seed
+        self._file.write(json.dumps(record, default=hpng.to_json) + "\n")
+        self._file.flush()
+        self._unsynced += 1
+        if (
+            self._unsynced >= self.fsync_every
+            or time.monotonic() - self._last_sync >= self.fsync_interval
+        ):
+            self.sync()
+
+    __call__ = write
+
+    def sync(self):
+        """Force the written records to disk."""
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def close(self):
+        if not self._file.closed:
+            self.sync()
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _truncate_torn(path: str, block_size: int = 4096):
+    """
+    Remove the bytes after the last newline of a file, if any.
+    """
+    if not os.path.exists(path):
+        return
+    with open(path, "rb+") as f:
+        end = f.seek(0, os.SEEK_END)
+        if end == 0:
+            return
+        f.seek(end - 1)
+        if f.read(1) == b"\n":
+            return
+        stop = end
+        while stop > 0:
+            start = max(stop - block_size, 0)
+            f.seek(start)
+            newline = f.read(stop - start).rfind(b"\n")
+            if newline >= 0:
+                f.truncate(start + newline + 1)
+                return
+            stop = start
+        f.truncate(0)
+
+
+def load(path: str) -> List[dict]:
+    """
+    Read the records of a journal.
+
+    A truncated last line, left by a crash in the middle of a write, is
+    ignored.
+
+    :param path: File of the journal.
+    :return: List of records, in the order they were written.
+    """
+    records = []
+    with open(path, encoding="utf-8") as f:
+        lines = f.read().splitlines()
+    for i, line in enumerate(lines):
+        if not line.strip():
+            continue
+        try:
+            records.append(json.loads(line))
+        except ValueError:
+            if i != len(lines) - 1:
+                raise
+    return records
+
+
+def replay(optimizer: ng.optimizers.base.Optimizer, records: List[dict]) -> int:
+    """
+    Tell the successful trials of a journal to an optimizer.
+
+    :param optimizer: The nevergrad optimizer, built on the same
+        parametrization as the journaled search.
+    :param records: Records read by `load`.
+    :return: Number of trials told to the optimizer.
+    """
+    told = 0
+    for record in records:
+        if record["status"] != "ok":
+            continue
+        kwargs = hpng.nest_kwargs(optimizer.parametrization, record["kwargs"])
+        candidate = optimizer.parametrization.spawn_child(new_value=((), kwargs))
+        optimizer.tell(candidate, record["loss"])
+        told += 1
+    return told
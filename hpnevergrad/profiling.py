@@ -0,0 +1,236 @@
+import cProfile
+import heapq
+import json
+import marshal
+import statistics
+import time
+from typing import Callable, List, Optional
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None  # type: ignore
+
+
+def _peak_rss() -> Optional[int]:
+    """
+    :return: Peak resident set size of the current process in bytes.
+    """
+    if resource is None:
+        return None
+    # kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+class Measurement(object):
+    """
+    Loss of a trial along with how its objective function ran, returned by
+    `Instrumented` and unpacked by the drivers.
+    """
+
+    loss = None  # type: float
+    """Loss returned by the objective function."""
+
+    started = None  # type: float
+    """Epoch time at which the objective function started."""
+
+    objective_time = None  # type: float
+    """Wall seconds spent in the objective function."""
+
+    cpu_time = None  # type: float
+    """CPU seconds of the evaluating process during the objective function."""
+
+    peak_rss = None  # type: Optional[int]
+    """Peak resident set size of the evaluating process in bytes."""
+
+    stats = None  # type: Optional[dict]
+    """cProfile statistics of the objective function, if profiled."""
+
+    def __init__(self, loss, started, objective_time, cpu_time, peak_rss, stats=None):
+        self.loss = loss
+        self.started = started
+        self.objective_time = objective_time
+        self.cpu_time = cpu_time
+        self.peak_rss = peak_rss
+        self.stats = stats
+
+
+class Instrumented(object):
+    """
+    Wrap an objective function to measure each call where it runs, i.e. in
+    the worker process with a process pool. Picklable if the objective
+    function is.
+
+    CPU time and peak RSS are those of the evaluating process: they include
+    concurrent trials of a thread pool, and for isolated trials only cover
+    the dispatching thread.
+    """
+
+    objective_function = None  # type: Callable
+    """The measured objective function."""
+
+    profile = None  # type: bool
+    """Whether to run the objective function under cProfile."""
+
+    def __init__(self, objective_function: Callable, profile: bool = False):
+        """
+        :param objective_function: The measured objective function.
+        :param profile: Whether to run the objective function under cProfile.
+        """
+        self.objective_function = objective_function
+        self.profile = profile
+
+    def __call__(self, *args, **kwargs) -> Measurement:
+        started = time.time()
+        start, cpu_start = time.perf_counter(), time.process_time()
+        profiler = None
+        if self.profile:
+            profiler = cProfile.Profile()
+            loss = profiler.runcall(self.objective_function, *args, **kwargs)
+        else:
+            loss = self.objective_function(*args, **kwargs)
+        objective_time = time.perf_counter() - start
+        cpu_time = time.process_time() - cpu_start
+        stats = None
+        if profiler is not None:
+            profiler.create_stats()
+            stats = profiler.stats
+        return Measurement(loss, started, objective_time, cpu_time, _peak_rss(), stats)
+
+
+class TrialProfiler(object):
+    """
+    Callback of the drivers recording per-trial timings: wall time, time in
+    the objective, CPU time, peak RSS, time waiting in the executor's queue,
+    and time spent in the optimizer's ask and tell.
+
+    Records are written as JSON lines if a file is given; the cProfile
+    statistics of the slowest trials are kept when the objective function is
+    `Instrumented` with `profile=True`.
+    """
+
+    records = None  # type: List[dict]
+    """Records of the finished trials."""
+
+    slowest = None  # type: int
+    """Number of the slowest trials whose cProfile statistics are kept."""
+
+    def __init__(self, path: Optional[str] = None, slowest: int = 0):
+        """
+        :param path: File the records are written to as JSON lines, if any.
+        :param slowest: Number of the slowest trials whose cProfile
+            statistics are kept.
+        """
+        self.records = []
+        self.slowest = slowest
+        self._profiles = []  # type: list
+        self._file = None
+        if path is not None:
+            self._file = open(path, "w", encoding="utf-8")
+
+    def __call__(self, trial):
+        record = {
+            "trial": len(self.records),
+            "status": trial.status,
+            "cached": trial.cached,
+            "loss": trial.loss,
+            "wall_time": trial.wall_time,
+            "ask_time": trial.ask_time,
+            "tell_time": trial.tell_time,
+        }
+        measurement = trial.measurement
+        if measurement is not None:
+            record["objective_time"] = measurement.objective_time
+            record["queue_wait"] = max(measurement.started - trial.submitted, 0.0)
+            record["cpu_time"] = measurement.cpu_time
+            record["peak_rss"] = measurement.peak_rss
+            if measurement.stats is not None and self.slowest > 0:
+                item = (measurement.objective_time, record["trial"], measurement.stats)
+                if len(self._profiles) < self.slowest:
+                    heapq.heappush(self._profiles, item)
+                else:
+                    heapq.heappushpop(self._profiles, item)
+        self.records.append(record)
+        if self._file is not None:
+            self._file.write(json.dumps(record) + "\n")
+            self._file.flush()
+
+    def dump_profiles(self, prefix: str) -> List[str]:
+        """
+        Write the cProfile statistics of the slowest trials, readable by
+        `pstats.Stats`.
+
+        :param prefix: Prefix of the files, suffixed by `.trial-<n>.prof`.
+        :return: The written files, slowest first.
+        """
+        paths = []
+        for _, index, stats in sorted(self._profiles, reverse=True):
+            path = "%s.trial-%d.prof" % (prefix, index)
+            with open(path, "wb") as f:
+                marshal.dump(stats, f)
+            paths.append(path)
+        return paths
+
+    def summary(self) -> dict:
+        """
+        :return: Totals and per-trial statistics of the recorded timings.
+        """
+        summary = {"trials": len(self.records)}  # type: dict
+        for key in [
+            "wall_time",
+            "objective_time",
+            "queue_wait",
+            "cpu_time",
+            "ask_time",
+            "tell_time",
+        ]:
+            values = [r[key] for r in self.records if r.get(key) is not None]
+            if values:
+                summary[key] = {
+                    "total": sum(values),
+                    "mean": statistics.mean(values),
+                    "median": statistics.median(values),
+                    "max": max(values),
+                }
+        rss = [r["peak_rss"] for r in self.records if r.get("peak_rss") is not None]
+        if rss:
+            summary["peak_rss"] = max(rss)
+        return summary
+
+    def format_summary(self) -> str:
+        """
+        :return: The summary as a table.
+        """
+        summary = self.summary()
+        lines = [
+            "%-16s %10s %10s %10s %10s"
+            % ("%d trials" % summary["trials"], "total", "mean", "median", "max")
+        ]
+        for key, value in summary.items():
+            if isinstance(value, dict):
+                lines.append(
+                    "%-16s %10.4f %10.4f %10.4f %10.4f"
+                    % (
+                        key,
+                        value["total"],
+                        value["mean"],
+                        value["median"],
+                        value["max"],
+                    )
+                )
+        if "peak_rss" in summary:
+            lines.append(
+                "%-16s %10.1f MB" % ("peak_rss", summary["peak_rss"] / 2**20)
+            )
+        return "\n".join(lines)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,236 @@
+import json
+import queue
+import threading
+import time
+from typing import Callable, Iterable, Iterator, List, Optional, Union
+
+import nevergrad as ng
+
+from hpnevergrad import driver, hpng
+from hpnevergrad.driver import StopSearch, Trial
+
+
+class Progress(object):
+    """
+    Callback of the drivers reporting the progress of a search after every
+    finished trial: its status and loss, the best loss so far, the number of
+    trials finished per second and the estimated time left.
+
+    Reports are dicts, written as JSON lines if a file is given, and passed
+    to a listener, e.g. to push them to a queue. `stop` makes the driver
+    stop the search when the next trial finishes, see `driver.StopSearch`.
+    """
+
+    trials = None  # type: int
+    """Number of finished trials."""
+
+    total = None  # type: int
+    """Number of trials of the search, from the remaining budget."""
+
+    best_loss = None  # type: Union[None, float, List[float]]
+    """Lowest loss so far; the lowest of each objective for several."""
+
+    best_kwargs = None  # type: Optional[dict]
+    """Hyperparameters of the lowest loss, for a single objective."""
+
+    last = None  # type: Optional[dict]
+    """The last report."""
+
+    def __init__(
+        self,
+        optimizer: ng.optimizers.base.Optimizer,
+        path: Optional[str] = None,
+        listener: Optional[Callable[[dict], None]] = None,
+        max_time: Optional[float] = None,
+    ):
+        """
+        :param optimizer: The optimizer of the search, before it starts.
+        :param path: File the reports are written to as JSON lines, if any.
+        :param listener: Function called with each report.
+        :param max_time: Seconds after which the search stops, bounding the
+            estimated time left.
+        """
+        self.optimizer = optimizer
+        self.total = optimizer.budget - optimizer.num_ask - optimizer.num_tell_not_asked
+        self.listener = listener
+        self.max_time = max_time
+        self.trials = 0
+        self._start = time.perf_counter()
+        self._stopped = False
+        self._lock = threading.Lock()
+        self._file = None
+        if path is not None:
+            self._file = open(path, "w", encoding="utf-8")
+
+    def _update_best(self, trial: Trial):
+        if trial.status != "ok" or trial.loss is None:
+            return
+        if isinstance(trial.loss, list):
+            if isinstance(self.best_loss, list):
+                self.best_loss = [min(a, b) for a, b in zip(self.best_loss, trial.loss)]
+            else:
+                self.best_loss = list(trial.loss)
+        elif (
+            self.best_loss is None
+            or isinstance(self.best_loss, list)
+            or trial.loss < self.best_loss
+        ):
+            self.best_loss = trial.loss
+            self.best_kwargs = trial.kwargs
+
+    def _rates(self) -> dict:
+        elapsed = time.perf_counter() - self._start
+        rate = self.trials / elapsed if elapsed > 0 else None
+        remaining = max(self.total - self.trials, 0)
+        eta = None
+        if remaining == 0:
+            eta = 0.0
+        elif rate:
+            eta = remaining / rate
+        if self.max_time is not None:
+            left = max(self.max_time - elapsed, 0.0)
+            eta = left if eta is None else min(eta, left)
+        return {
+            "elapsed": elapsed,
+            "trials_per_sec": rate,
+            "remaining": remaining,
+            "eta": eta,
+        }
+
+    def _report(self, report: dict):
+        self.last = report
+        if self._file is not None:
+            self._file.write(json.dumps(report, default=hpng.to_json) + "\n")
+            self._file.flush()
+        if self.listener is not None:
+            self.listener(report)
+
+    def __call__(self, trial: Trial):
+        with self._lock:
+            self.trials += 1
+            self._update_best(trial)
+            report = {
+                "event": "trial",
+                "trial": self.trials,
+                "status": trial.status,
+                "cached": trial.cached,
+                "loss": trial.loss,
+                "kwargs": trial.kwargs,
+                "best_loss": self.best_loss,
+                "best_kwargs": self.best_kwargs,
+            }
+            report.update(self._rates())
+            self._report(report)
+            if self._stopped:
+                raise StopSearch()
+
+    def stop(self):
+        """
+        Stop the search when the next trial finishes.
+        """
+        self._stopped = True
+
+    def finish(self, recommendation: Optional[ng.p.Parameter] = None) -> dict:
+        """
+        Report the end of the search.
+
+        :param recommendation: The recommendation returned by the driver.
+        :return: The final report, with the recommended kwargs for a single
+            objective.
+        """
+        with self._lock:
+            report = {
+                "event": "done",
+                "trials": self.trials,
+                "best_loss": self.best_loss,
+                "best_kwargs": self.best_kwargs,
+                "recommendation": None,
+            }
+            if recommendation is not None and self.optimizer.num_objectives <= 1:
+                report["recommendation"] = hpng.flatten_kwargs(recommendation.kwargs)
+            report.update(self._rates())
+            self._report(report)
+            return report
+
+    def close(self):
+        if self._file is not None and not self._file.closed:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def watch(
+    optimizer: ng.optimizers.base.Optimizer,
+    objective_function: Callable[..., float],
+    callbacks: Iterable[Callable[[Trial], None]] = (),
+    **kwargs
+) -> Iterator[dict]:
+    """
+    Run `driver.minimize` in a background thread and yield its progress
+    reports as trials finish, e.g.::
+
+        for report in progress.watch(optimizer, train, executor=executor):
+            print(report["trial"], report["best_loss"], report["eta"])
+            if report["event"] == "trial" and report["elapsed"] > 3600:
+                break
+
+    The last report is the `Progress.finish` report, with the
+    recommendation. Leaving the loop early stops the search once the trial
+    being evaluated finishes.
+
+    :param optimizer: The nevergrad optimizer; its budget must be set.
+    :param objective_function: Function evaluated on the candidates' kwargs.
+    :param callbacks: Other functions called with each finished `Trial`.
+    :param kwargs: Other arguments of `driver.minimize`.
+    :raise: The error raised by `driver.minimize`, if any.
+    """
+    reports = queue.Queue()  # type: queue.Queue
+
+    def listener(report):
+        reports.put(report)
+        if report["event"] == "trial":
+            # the search waits for the report to be consumed, so that
+            # leaving the loop stops it before the next trial is told
+            reports.join()
+
+    progress = Progress(optimizer, listener=listener, max_time=kwargs.get("max_time"))
+    result = {}
+
+    def run():
+        try:
+            result["recommendation"] = driver.minimize(
+                optimizer,
+                objective_function,
+                callbacks=list(callbacks) + [progress],
+                **kwargs
+            )
+        except BaseException as e:
+            result["error"] = e
+        finally:
+            reports.put(None)
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    try:
+        while True:
+            report = reports.get()
+            try:
+                if report is None:
+                    break
+                try:
+                    yield report
+                except GeneratorExit:
+                    progress.stop()
+                    raise
+            finally:
+                reports.task_done()
+    finally:
+        progress.stop()
+        thread.join()
+    if "error" in result:
+        raise result["error"]
+    yield progress.finish(result["recommendation"])
@@ -0,0 +1,185 @@
+import bisect
+import math
+import numbers
+from typing import List
+
+import nevergrad as ng
+
+
+class Racing(object):
+    """
+    Portfolio of nevergrad optimizers racing on one parametrization and one
+    evaluation budget.
+
+    It has the ask and tell interface of an optimizer, so it can be passed
+    to any driver. Each ask is delegated to a member chosen by the UCB1
+    bandit rule, after `warmup` asks per member in turn. The reward of a
+    member for a trial is the fraction of previously told losses which are
+    worse than the trial's loss, so members proposing good candidates
+    receive more trials. Every told loss is also told to the other members
+    as a point they did not ask, so all of them learn from every evaluation.
+    Only single-objective searches are supported.
+    """
+
+    names = None  # type: List[str]
+    """Names of the racing optimizers in `ng.optimizers.registry`."""
+
+    budget = None  # type: int
+    """Number of evaluations shared by the members."""
+
+    num_workers = None  # type: int
+    """Number of trials evaluated in parallel."""
+
+    parametrization = None  # type: ng.p.Instrumentation
+    """The parametrization the members optimize on."""
+
+    warmup = 2
+    """Asks of each member before the allocation adapts to their rewards."""
+
+    num_ask = None  # type: int
+    """Number of candidates asked."""
+
+    num_tell = None  # type: int
+    """Number of losses told."""
+
+    num_tell_not_asked = None  # type: int
+    """Number of losses told for candidates not asked, e.g. from a journal."""
+
+    def __init__(
+        self,
+        names: List[str],
+        parametrization: ng.p.Instrumentation,
+        budget: int,
+        num_workers: int = 1,
+    ):
+        """
+        :param names: Names of at least two optimizers of
+            `ng.optimizers.registry`.
+        :param parametrization: The parametrization to optimize on; each
+            member optimizes on its own copy.
+        :param budget: Number of evaluations shared by the members.
+        :param num_workers: Number of trials evaluated in parallel.
+        """
+        if len(names) < 2:
+            raise ValueError("Racing needs at least two optimizers")
+        self.names = list(names)
+        self.budget = budget
+        self.num_workers = num_workers
+        self.parametrization = parametrization
+        self.members = [
+            ng.optimizers.registry[name](
+                parametrization=parametrization.copy(),
+                budget=budget,
+                num_workers=num_workers,
+            )
+            for name in self.names
+        ]
+        self.asks = [0] * len(self.members)
+        self.rewards = [0.0] * len(self.members)
+        self.best_losses = [math.inf] * len(self.members)
+        self.num_ask = 0
+        self.num_tell = 0
+        self.num_tell_not_asked = 0
+        self._owners = {}  # type: dict
+        self._losses = []  # type: list
+
+    @property
+    def num_objectives(self) -> int:
+        return self.members[0].num_objectives
+
+    def _select(self) -> int:
+        for index, asks in enumerate(self.asks):
+            if asks < self.warmup:
+                return index
+        asked = sum(self.asks)
+        scores = [
+            reward / asks + math.sqrt(2 * math.log(asked) / asks)
+            for reward, asks in zip(self.rewards, self.asks)
+        ]
+        return scores.index(max(scores))
+
+    def ask(self) -> ng.p.Parameter:
+        """
+        :return: A candidate of the member chosen by the bandit.
+        """
+        index = self._select()
+        candidate = self.members[index].ask()
+        self.asks[index] += 1
+        self.num_ask += 1
+        self._owners[candidate.uid] = index
+        return candidate
+
+    def tell(self, candidate: ng.p.Parameter, loss: float):
+        """
+        Tell a loss to the member which asked the candidate, if any, and to
+        the others as a point they did not ask.
+        """
+        if not isinstance(loss, numbers.Real):
+            raise ValueError("Racing only supports a single objective")
+        loss = float(loss)
+        owner = self._owners.pop(candidate.uid, None)
+        if owner is None:
+            self.num_tell_not_asked += 1
+        else:
+            # worse previous losses over all previous losses
+            worse = len(self._losses) - bisect.bisect_right(self._losses, loss)
+            self.rewards[owner] += worse / len(self._losses) if self._losses else 0.5
+            self.best_losses[owner] = min(self.best_losses[owner], loss)
+        bisect.insort(self._losses, loss)
+        self.num_tell += 1
+        for index, member in enumerate(self.members):
+            if index == owner:
+                member.tell(candidate, loss)
+            else:
+                member.tell(
+                    member.parametrization.spawn_child(new_value=candidate.value), loss
+                )
+
+    def leader(self) -> int:
+        """
+        :return: Index of the member with the best mean reward.
+        """
+        means = [
+            reward / asks if asks else 0.0
+            for reward, asks in zip(self.rewards, self.asks)
+        ]
+        return means.index(max(means))
+
+    def provide_recommendation(self) -> ng.p.Parameter:
+        """
+        :return: The recommendation of the leading member, which was told
+            every loss.
+        """
+        return self.members[self.leader()].provide_recommendation()
+
+    def stats(self) -> List[dict]:
+        """
+        :return: The name, number of asks, mean reward and best loss of each
+            member.
+        """
+        return [
+            {
+                "name": name,
+                "asks": asks,
+                "reward": reward / asks if asks else None,
+                "best_loss": None if math.isinf(best) else best,
+            }
+            for name, asks, reward, best in zip(
+                self.names, self.asks, self.rewards, self.best_losses
+            )
+        ]
+
+    def format_stats(self) -> str:
+        """
+        :return: The stats as one line per member.
+        """
+        return "\n".join(
+            "racing: %-24s %5d trials, mean reward %s, best loss %s"
+            % (
+                s["name"],
+                s["asks"],
+                "-" if s["reward"] is None else "%.3f" % s["reward"],
+                s["best_loss"],
+            )
+            for s in self.stats()
+        )
@@ -0,0 +1,197 @@
+import contextlib
+import functools
+import hashlib
+import inspect
+import json
+import os
+import pickle
+import shutil
+import tempfile
+import threading
+from typing import Callable, Optional
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None  # type: ignore
+
+ENV = "HPNEVERGRAD_RESOURCES"
+"""Environment variable naming the directory fixtures are shared through."""
+
+_directory = None  # type: Optional[str]
+_fixtures = {}  # type: dict
+_loaded = {}  # type: dict
+_lock = threading.RLock()
+
+
+def set_directory(path: Optional[str]):
+    """
+    Share fixtures through a directory, in this process and the processes
+    it starts later, as `$HPNEVERGRAD_RESOURCES` does.
+
+    :param path: The directory, created if needed; None to keep fixtures
+        in the memory of each process.
+    """
+    global _directory
+    _directory = path
+    if path is None:
+        os.environ.pop(ENV, None)
+    else:
+        os.makedirs(path, exist_ok=True)
+        os.environ[ENV] = path
+
+
+def get_directory() -> Optional[str]:
+    """
+    :return: The directory fixtures are shared through, if any.
+    """
+    return _directory or os.environ.get(ENV) or None
+
+
+def _get_key(name: str, version: str, args: tuple, kwargs: dict) -> str:
+    s = json.dumps([name, version, args, kwargs], sort_keys=True, default=repr)
+    return "%s-%s" % (name, hashlib.sha1(s.encode("utf-8")).hexdigest()[:16])
+
+
+def _is_arrays(value) -> bool:
+    return isinstance(value, dict) and all(
+        isinstance(k, str) and isinstance(v, np.ndarray) for k, v in value.items()
+    )
+
+
+def _save(value, path: str):
+    """
+    Save a built value to a new directory: arrays as `.npy` files, which
+    are memory-mapped when loaded, anything else pickled.
+    """
+    os.makedirs(path)
+    if isinstance(value, np.ndarray):
+        np.save(os.path.join(path, "value.npy"), value, allow_pickle=False)
+    elif _is_arrays(value):
+        for i, (k, v) in enumerate(value.items()):
+            np.save(os.path.join(path, "%d.npy" % i), v, allow_pickle=False)
+        with open(os.path.join(path, "keys.json"), "w", encoding="utf-8") as f:
+            json.dump(list(value), f)
+    else:
+        with open(os.path.join(path, "value.pkl"), "wb") as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def _load(path: str):
+    array_path = os.path.join(path, "value.npy")
+    if os.path.exists(array_path):
+        return np.load(array_path, mmap_mode="r")
+    keys_path = os.path.join(path, "keys.json")
+    if os.path.exists(keys_path):
+        with open(keys_path, encoding="utf-8") as f:
+            keys = json.load(f)
+        return {
+            k: np.load(os.path.join(path, "%d.npy" % i), mmap_mode="r")
+            for i, k in enumerate(keys)
+        }
+    with open(os.path.join(path, "value.pkl"), "rb") as f:
+        return pickle.load(f)
+
+
+@contextlib.contextmanager
+def _file_lock(path: str):
+    """
+    Hold an exclusive lock between processes on a file, POSIX only; a
+    no-op elsewhere, where concurrent processes may build a fixture twice.
+    """
+    if fcntl is None:  # pragma: no cover
+        yield
+        return
+    with open(path, "a") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def _build_shared(directory: str, key: str, build: Callable[[], object]):
+    """
+    :return: The value stored under the key in the directory, built by the
+        first process asking for it while the others wait.
+    """
+    path = os.path.join(directory, key)
+    if not os.path.isdir(path):
+        with _file_lock(path + ".lock"):
+            if not os.path.isdir(path):
+                tmp = tempfile.mkdtemp(prefix=key + ".", dir=directory)
+                try:
+                    _save(build(), os.path.join(tmp, "value"))
+                    # readers only ever see a complete directory
+                    os.rename(os.path.join(tmp, "value"), path)
+                finally:
+                    shutil.rmtree(tmp, ignore_errors=True)
+    return _load(path)
+
+
+def fixture(
+    func: Optional[Callable] = None, name: Optional[str] = None, version: str = ""
+):
+    """
+    Declare an expensive value shared by the trials of a search, such as a
+    dataset or a preprocessed array, e.g.::
+
+        @resources.fixture
+        def mnist(split):
+            return {"data": ..., "labels": ...}
+
+        def train():
+            data = mnist("train")["data"]
+
+    The decorated function is called at most once per distinct arguments
+    and process, as with `functools.lru_cache`. When a directory is set,
+    by `set_directory` or `$HPNEVERGRAD_RESOURCES` as `hpng` does for trials
+    run in other processes, it is called at most once per directory: the
+    first process builds the value and saves it, and every process then
+    loads it. NumPy arrays and dicts of arrays are memory-mapped read-only,
+    so all the trials share one copy in the page cache and loading costs
+    no copy; other values are pickled.
+
+    :param func: The function building the value; its arguments must be
+        JSON serializable.
+    :param name: Name of the fixture in the directory; by default the
+        qualified name of the function.
+    :param version: Changed to rebuild the values saved in a directory
+        which is kept between searches.
+    """
+    if func is None:
+        return functools.partial(fixture, name=name, version=version)
+    name = name or "%s.%s" % (func.__module__, func.__qualname__)
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        directory = get_directory()
+        key = _get_key(name, version, args, kwargs)
+        with _lock:
+            if (directory, key) not in _loaded:
+                build = functools.partial(func, *args, **kwargs)
+                if directory is None:
+                    value = build()
+                else:
+                    value = _build_shared(directory, key, build)
+                _loaded[directory, key] = value
+            return _loaded[directory, key]
+
+    _fixtures[name] = (func, wrapper)
+    return wrapper
+
+
+def preload():
+    """
+    Load the fixtures declared without arguments, e.g. in a warm worker
+    before it forks its trials, which then inherit them.
+    """
+    for func, wrapper in list(_fixtures.values()):
+        parameters = inspect.signature(func).parameters.values()
+        if all(
+            p.default is not p.empty or p.kind in (p.VAR_POSITIONAL, p.VAR_KEYWORD)
+            for p in parameters
+        ):
+            wrapper()
@@ -0,0 +1,370 @@
+import multiprocessing
+import os
+import queue
+import signal
+import sys
+import time
+import traceback
+from typing import Optional
+
+import hpman.m
+
+from hpnevergrad import hpng
+
+
+class TrialError(RuntimeError):
+    """
+    The trial failed in its worker process: the objective function raised,
+    or the process died.
+    """
+
+
+class TrialTimeout(TrialError):
+    """
+    The trial exceeded its timeout and its worker process was killed.
+    """
+
+
+class DeadlineExceeded(TrialTimeout):
+    """
+    The trial was still running at the deadline of the search and its worker
+    process was killed; the drivers cancel it rather than tell a penalty.
+    """
+
+
+def _limit_memory(memory_limit):
+    import resource
+
+    resource.setrlimit(resource.RLIMIT_AS, (memory_limit, memory_limit))
+
+
+def _evaluate(objective_function, kwargs):
+    try:
+        return "ok", objective_function(**kwargs)
+    except BaseException:
+        return "error", traceback.format_exc()
+
+
+def _check(status, result, by_deadline=False):
+    """
+    :param by_deadline: Whether a timeout is the deadline of the search.
+    :return: the loss sent back by a worker process, or raise its failure.
+    """
+    if status == "ok":
+        return result
+    if status == "timeout" and by_deadline:
+        raise DeadlineExceeded("Trial killed at the deadline of the search")
+    if status == "timeout":
+        raise TrialTimeout("Trial timed out after %ss" % result)
+    if status == "died":
+        raise TrialError("Trial process died with exit code %s" % result)
+    raise TrialError(result)
+
+
+def _trial_timeout(timeout, deadline):
+    """
+    :return: Seconds a trial may run given its timeout and the epoch time
+        at which the search ends, None if unlimited, and whether the limit
+        is the deadline.
+    """
+    if deadline is None:
+        return timeout, False
+    remaining = max(deadline - time.time(), 0.0)
+    if timeout is None or remaining < timeout:
+        return remaining, True
+    return timeout, False
+
+
+def _run_trial(conn, module, obj, placeholder, memory_limit):
+    """
+    Entry point of a worker process: evaluate the kwargs received from the
+    pipe and send back the loss, or the formatted exception.
+    """
+    if memory_limit is not None:
+        _limit_memory(memory_limit)
+    kwargs = conn.recv()
+    conn.send(_evaluate(hpng.ModuleObjective(module, obj, placeholder), kwargs))
+    conn.close()
+
+
+class IsolatedObjective(object):
+    """
+    Objective function of the command line `module.py:obj`, evaluated in a
+    fresh interpreter per trial.
+
+    Memory leaks, CUDA state and global mutations of a trial die with its
+    process, so long searches keep a flat memory profile, and a crash only
+    fails its own trial. Hyperparameters and the loss are exchanged over a
+    pipe.
+    """
+
+    module = None  # type: str
+    """File name of the target module."""
+
+    obj = None  # type: str
+    """Name of the objective function in the target module."""
+
+    placeholder = None  # type: str
+    """Placeholder of hpman used in the target module."""
+
+    timeout = None  # type: Optional[float]
+    """Seconds after which a trial is killed."""
+
+    memory_limit = None  # type: Optional[int]
+    """Bytes of address space a trial may use."""
+
+    deadline = None  # type: Optional[float]
+    """Epoch time after which running trials are killed."""
+
+    def __init__(
+        self,
+        module: str,
+        obj: str,
+        placeholder: str = "_",
+        timeout: Optional[float] = None,
+        memory_limit: Optional[int] = None,
+        deadline: Optional[float] = None,
+    ):
+        """
+        :param module: A string of file name to parse.
+        :param obj: A string of the function in module.
+        :param placeholder: The placeholder of hpman used in module.
+        :param timeout: Seconds after which a trial is killed and
+            `TrialTimeout` raised; no timeout if None.
+        :param memory_limit: Bytes of address space a trial may use
+            (`RLIMIT_AS`, POSIX only); unlimited if None.
+        :param deadline: Epoch time, e.g. the end of the search, after which
+            running trials are killed and `TrialTimeout` raised.
+        """
+        self.module = module
+        self.obj = obj
+        self.placeholder = placeholder
+        self.timeout = timeout
+        self.memory_limit = memory_limit
+        self.deadline = deadline
+
+    def __call__(self, **kwargs):
+        ctx = multiprocessing.get_context("spawn")
+        conn, child_conn = ctx.Pipe()
+        process = ctx.Process(
+            target=_run_trial,
+            args=(
+                child_conn,
+                self.module,
+                self.obj,
+                self.placeholder,
+                self.memory_limit,
+            ),
+        )
+        process.start()
+        child_conn.close()
+        timeout, by_deadline = _trial_timeout(self.timeout, self.deadline)
+        try:
+            conn.send(kwargs)
+            if not conn.poll(timeout):
+                status, result = "timeout", timeout
+            else:
+                status, result = conn.recv()
+                # let the process flush its output before it is killed
+                process.join(5)
+        except (EOFError, BrokenPipeError):
+            process.join()
+            status, result = "died", process.exitcode
+        finally:
+            if process.is_alive():
+                process.kill()
+            process.join()
+            conn.close()
+        return _check(status, result, by_deadline)
+
+
+def _fork_trial(objective_function, kwargs, timeout, memory_limit):
+    """
+    Evaluate a trial in a child forked from the current process.
+
+    :return: The message a worker process sends back.
+    """
+    conn, child_conn = multiprocessing.Pipe(duplex=False)
+    pid = os.fork()
+    if pid == 0:
+        try:
+            conn.close()
+            if memory_limit is not None:
+                _limit_memory(memory_limit)
+            child_conn.send(_evaluate(objective_function, kwargs))
+            sys.stdout.flush()
+            sys.stderr.flush()
+        finally:
+            os._exit(0)
+    child_conn.close()
+    reaped = False
+    try:
+        if not conn.poll(timeout):
+            os.kill(pid, signal.SIGKILL)
+            return "timeout", timeout
+        try:
+            return conn.recv()
+        except EOFError:
+            _, exit_status = os.waitpid(pid, 0)
+            reaped = True
+            if os.WIFSIGNALED(exit_status):
+                return "died", -os.WTERMSIG(exit_status)
+            return "died", os.WEXITSTATUS(exit_status)
+    finally:
+        if not reaped:
+            os.waitpid(pid, 0)
+        conn.close()
+
+
+def _serve(conn, module, obj, placeholder, memory_limit):
+    """
+    Entry point of a warm worker: import the target module, parse its hpman
+    declarations and load its fixtures without arguments once, then fork a
+    child per trial received with its timeout.
+    """
+    try:
+        objective_function = hpng.ModuleObjective(module, obj, placeholder).load()
+        getattr(hpman.m, placeholder).parse_file(module)
+        # imported here as it imports numpy, which trials may not need
+        from hpnevergrad import resources
+
+        resources.preload()
+    except BaseException:
+        conn.send(("error", traceback.format_exc()))
+        return
+    conn.send(("ok", None))
+    while True:
+        try:
+            kwargs, timeout = conn.recv()
+        except EOFError:
+            break
+        conn.send(_fork_trial(objective_function, kwargs, timeout, memory_limit))
+
+
+class WarmPool(object):
+    """
+    Fork-server pool of warm workers evaluating the command line
+    `module.py:obj`.
+
+    Each worker imports the target module, parses its hpman declarations and
+    loads its `resources.fixture` values once, then forks a cheap child per
+    trial, which keeps the isolation of `IsolatedObjective` without paying
+    interpreter startup, imports and data loading on every trial. POSIX
+    only.
+    """
+
+    module = None  # type: str
+    """File name of the target module."""
+
+    obj = None  # type: str
+    """Name of the objective function in the target module."""
+
+    placeholder = None  # type: str
+    """Placeholder of hpman used in the target module."""
+
+    num_workers = None  # type: int
+    """Number of warm workers, i.e. of trials evaluated in parallel."""
+
+    timeout = None  # type: Optional[float]
+    """Seconds after which a trial is killed."""
+
+    memory_limit = None  # type: Optional[int]
+    """Bytes of address space a trial may use."""
+
+    deadline = None  # type: Optional[float]
+    """Epoch time after which running trials are killed."""
+
+    def __init__(
+        self,
+        module: str,
+        obj: str,
+        placeholder: str = "_",
+        num_workers: int = 1,
+        timeout: Optional[float] = None,
+        memory_limit: Optional[int] = None,
+        deadline: Optional[float] = None,
+    ):
+        """
+        :param module: A string of file name to parse.
+        :param obj: A string of the function in module.
+        :param placeholder: The placeholder of hpman used in module.
+        :param num_workers: Number of warm workers.
+        :param timeout: Seconds after which a trial is killed and
+            `TrialTimeout` raised; no timeout if None.
+        :param memory_limit: Bytes of address space a trial may use
+            (`RLIMIT_AS`); unlimited if None.
+        :param deadline: Epoch time, e.g. the end of the search, after which
+            running trials are killed and `TrialTimeout` raised.
+        """
+        self.module = module
+        self.obj = obj
+        self.placeholder = placeholder
+        self.num_workers = num_workers
+        self.timeout = timeout
+        self.memory_limit = memory_limit
+        self.deadline = deadline
+        self._workers = []  # type: list
+        self._idle = queue.Queue()  # type: queue.Queue
+
+    def _start_worker(self):
+        ctx = multiprocessing.get_context("spawn")
+        conn, child_conn = ctx.Pipe()
+        process = ctx.Process(
+            target=_serve,
+            args=(
+                child_conn,
+                self.module,
+                self.obj,
+                self.placeholder,
+                self.memory_limit,
+            ),
+        )
+        process.start()
+        child_conn.close()
+        self._workers.append((process, conn))
+        return process, conn
+
+    def start(self) -> "WarmPool":
+        """
+        Start the workers and wait until they are warm.
+        """
+        for _ in range(self.num_workers):
+            self._start_worker()
+        for process, conn in self._workers:
+            _check(*conn.recv())
+            self._idle.put((process, conn))
+        return self
+
+    def __call__(self, **kwargs):
+        process, conn = self._idle.get()
+        timeout, by_deadline = _trial_timeout(self.timeout, self.deadline)
+        try:
+            conn.send((kwargs, timeout))
+            status, result = conn.recv()
+        except (EOFError, BrokenPipeError):
+            # the worker itself died: replace it by a new one
+            process.join()
+            exitcode = process.exitcode
+            self._workers.remove((process, conn))
+            process, conn = self._start_worker()
+            _check(*conn.recv())
+            raise TrialError("Warm worker died with exit code %s" % exitcode)
+        finally:
+            self._idle.put((process, conn))
+        return _check(status, result, by_deadline)
+
+    def close(self):
+        for process, conn in self._workers:
+            conn.close()
+        for process, conn in self._workers:
+            process.join(5)
+            if process.is_alive():
+                process.kill()
+                process.join()
+        self._workers = []
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.close()
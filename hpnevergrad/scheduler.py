@@ -0,0 +1,216 @@
+import collections
+import contextlib
+import contextvars
+import functools
+import inspect
+import itertools
+import math
+import threading
+from typing import Callable, Optional
+
+
+class TrialPruned(Exception):
+    """
+    Raised by `report` in a trial the scheduler decided to stop.
+    """
+
+
+class _Reporter(object):
+    def __init__(self, scheduler, trial_id):
+        self.scheduler = scheduler
+        self.trial_id = trial_id
+        self.last = None
+
+
+_reporter = contextvars.ContextVar(
+    "hpnevergrad_reporter", default=None
+)  # type: contextvars.ContextVar[Optional[_Reporter]]
+"""Reporter of the trial running in the current context."""
+
+
+def report(value: float, step: int):
+    """
+    Report an intermediate loss of the running trial, e.g. after each epoch.
+
+    Does nothing outside of a trial wrapped by a scheduler, so the objective
+    still runs standalone.
+
+    :param value: Intermediate loss; lower is better.
+    :param step: Resource spent so far by the trial, e.g. number of epochs.
+    :raise TrialPruned: if the scheduler stops the trial.
+    """
+    reporter = _reporter.get()
+    if reporter is None:
+        return
+    reporter.last = value
+    if reporter.scheduler.should_stop(reporter.trial_id, step, value):
+        raise TrialPruned("Trial %d pruned at step %s" % (reporter.trial_id, step))
+
+
+class Scheduler(object):
+    """
+    Base class of the early stopping schedulers.
+
+    A scheduler wraps the objective function; the objective calls `report`
+    with its intermediate losses, and stops as soon as the scheduler decides
+    so. The last reported loss of a stopped trial is returned to the driver,
+    which tells it to the optimizer.
+    """
+
+    pruned = None  # type: int
+    """Number of trials stopped early."""
+
+    def __init__(self):
+        self.pruned = 0
+        self._trial_ids = itertools.count()
+        self._lock = threading.Lock()
+
+    def should_stop(self, trial_id: int, step: int, value: float) -> bool:
+        """
+        :param trial_id: Id of the reporting trial.
+        :param step: Resource spent so far by the trial.
+        :param value: Intermediate loss of the trial.
+        :return: Whether the trial should be stopped.
+        """
+        raise NotImplementedError
+
+    @contextlib.contextmanager
+    def _trial(self):
+        """
+        Context of a trial; a pruned trial exits it without raising.
+        """
+        reporter = _Reporter(self, next(self._trial_ids))
+        token = _reporter.set(reporter)
+        try:
+            yield reporter
+        except TrialPruned:
+            with self._lock:
+                self.pruned += 1
+        finally:
+            _reporter.reset(token)
+
+    def wrap(self, objective_function: Callable) -> Callable:
+        """
+        Schedule the trials of an objective function evaluated in this
+        process, sequentially, in threads or in asyncio tasks.
+
+        :param objective_function: The objective function, which calls
+            `report` with its intermediate losses.
+        """
+        if inspect.iscoroutinefunction(objective_function):
+
+            @functools.wraps(objective_function)
+            async def async_scheduled(*args, **kwargs):
+                with self._trial() as reporter:
+                    return await objective_function(*args, **kwargs)
+                return reporter.last
+
+            return async_scheduled
+
+        @functools.wraps(objective_function)
+        def scheduled(*args, **kwargs):
+            with self._trial() as reporter:
+                return objective_function(*args, **kwargs)
+            return reporter.last
+
+        return scheduled
+
+
+class SuccessiveHalving(Scheduler):
+    """
+    Asynchronous successive halving (ASHA).
+
+    Rungs are placed at `min_resource * reduction_factor ** k` steps. A trial
+    reaching a rung continues only if its loss is among the best
+    `1 / reduction_factor` of the losses recorded at that rung so far, so
+    promising trials are promoted to higher fidelity without waiting for a
+    whole batch.
+    """
+
+    min_resource = None  # type: int
+    """Steps of the first rung."""
+
+    reduction_factor = None  # type: int
+    """Inverse of the fraction of trials promoted at each rung."""
+
+    max_resource = None  # type: Optional[int]
+    """Steps after which trials are never stopped."""
+
+    def __init__(
+        self,
+        min_resource: int = 1,
+        reduction_factor: int = 3,
+        max_resource: Optional[int] = None,
+    ):
+        """
+        :param min_resource: Steps of the first rung.
+        :param reduction_factor: Inverse of the fraction of trials promoted
+            at each rung.
+        :param max_resource: Steps after which trials are never stopped,
+            usually the number of epochs of a full trial.
+        """
+        super().__init__()
+        self.min_resource = min_resource
+        self.reduction_factor = reduction_factor
+        self.max_resource = max_resource
+        self._rungs = collections.defaultdict(list)  # type: dict
+        self._next_rung = {}  # type: dict
+
+    def rung_resource(self, rung: int) -> int:
+        return self.min_resource * self.reduction_factor**rung
+
+    def should_stop(self, trial_id: int, step: int, value: float) -> bool:
+        with self._lock:
+            rung = self._next_rung.get(trial_id, 0)
+            stop = False
+            while step >= self.rung_resource(rung) and (
+                self.max_resource is None
+                or self.rung_resource(rung) < self.max_resource
+            ):
+                values = self._rungs[rung]
+                values.append(value)
+                rung += 1
+                k = max(len(values) // self.reduction_factor, 1)
+                if value > sorted(values)[k - 1]:
+                    stop = True
+                    break
+            self._next_rung[trial_id] = rung
+            return stop
+
+
+class Hyperband(Scheduler):
+    """
+    Hyperband on top of asynchronous successive halving.
+
+    Trials are dealt round-robin to brackets of `SuccessiveHalving` whose
+    first rungs start at increasing resources, hedging between aggressive
+    early stopping and letting slow starters run longer.
+    """
+
+    brackets = None  # type: list
+    """The `SuccessiveHalving` schedulers of the brackets."""
+
+    def __init__(
+        self, min_resource: int = 1, max_resource: int = 81, reduction_factor: int = 3
+    ):
+        """
+        :param min_resource: Steps of the first rung of the most aggressive
+            bracket.
+        :param max_resource: Steps of a full trial.
+        :param reduction_factor: Inverse of the fraction of trials promoted
+            at each rung.
+        """
+        super().__init__()
+        num_brackets = (
+            int(math.log(max_resource / min_resource, reduction_factor) + 1e-9) + 1
+        )
+        self.brackets = [
+            SuccessiveHalving(
+                min_resource * reduction_factor**s, reduction_factor, max_resource
+            )
+            for s in range(num_brackets)
+        ]
+
+    def should_stop(self, trial_id: int, step: int, value: float) -> bool:
+        bracket = self.brackets[trial_id % len(self.brackets)]
+        return bracket.should_stop(trial_id, step, value)
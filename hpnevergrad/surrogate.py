@@ -0,0 +1,246 @@
+import math
+import numbers
+from typing import Optional, Tuple
+
+import nevergrad as ng
+import numpy as np
+
+try:
+    from scipy.linalg import solve_triangular
+except ImportError:  # pragma: no cover
+    solve_triangular = None
+
+
+class GaussianProcess(object):
+    """
+    Gaussian process regression with an RBF kernel, in NumPy.
+
+    Observations are added one at a time by extending the Cholesky factor
+    of the kernel matrix, at a cost growing with the square of the number of
+    observations instead of its cube. The length scale is set from the
+    median distance between observations, and the factor is recomputed when
+    the number of observations doubles.
+    """
+
+    noise = 1e-6
+    """Variance of the observation noise, relative to the kernel's."""
+
+    def __init__(self):
+        self.length_scale = 1.0
+        self._x = np.empty((0, 0))
+        self._y = np.empty(0)
+        self._chol = np.empty((0, 0))
+        self._fitted = 0
+
+    def __len__(self) -> int:
+        return len(self._y)
+
+    def _kernel(self, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+        sq = (
+            np.sum(a**2, axis=1)[:, None]
+            + np.sum(b**2, axis=1)[None, :]
+            - 2 * a @ b.T
+        )
+        return np.exp(-0.5 * np.maximum(sq, 0.0) / self.length_scale**2)
+
+    def _refit(self):
+        x = self._x
+        if len(x) > 1:
+            dist = np.sqrt(np.sum((x[:, None, :] - x[None, :, :]) ** 2, axis=-1))
+            median = np.median(dist[np.triu_indices(len(x), 1)])
+            self.length_scale = float(median) if median > 0 else 1.0
+        else:
+            self.length_scale = 1.0
+        kernel = self._kernel(x, x) + self.noise * np.eye(len(x))
+        self._chol = np.linalg.cholesky(kernel)
+        self._fitted = len(x)
+
+    def add(self, x: np.ndarray, y: float):
+        """
+        Add an observation.
+
+        :param x: Encoded point.
+        :param y: Its value.
+        """
+        x = np.asarray(x, dtype=float)[None, :]
+        n = len(self._y)
+        self._x = x if n == 0 else np.vstack([self._x, x])
+        self._y = np.append(self._y, y)
+        if n == 0 or n + 1 >= 2 * self._fitted:
+            self._refit()
+            return
+        # extend the Cholesky factor with the new row
+        k = self._kernel(self._x[:n], x)[:, 0]
+        row = _solve_lower(self._chol, k)
+        diag = math.sqrt(max(1.0 + self.noise - row @ row, self.noise))
+        chol = np.zeros((n + 1, n + 1))
+        chol[:n, :n] = self._chol
+        chol[n, :n] = row
+        chol[n, n] = diag
+        self._chol = chol
+
+    def predict(self, x: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        :param x: Encoded points, one per row.
+        :return: Mean and standard deviation of the prediction at each point.
+        """
+        mean_y = self._y.mean()
+        std_y = self._y.std() or 1.0
+        alpha = _solve_lower(self._chol, (self._y - mean_y) / std_y)
+        k = self._kernel(np.asarray(x, dtype=float), self._x)
+        v = _solve_lower(self._chol, k.T)
+        mean = mean_y + std_y * (v.T @ alpha)
+        var = np.maximum(1.0 - np.sum(v**2, axis=0), 0.0)
+        return mean, std_y * np.sqrt(var)
+
+
+def _solve_lower(chol: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """
+    :return: The solution of `chol @ x = b` for a lower triangular `chol`.
+    """
+    if solve_triangular is None:
+        return np.linalg.solve(chol, b)
+    return solve_triangular(chol, b, lower=True)
+
+
+class Prescreened(object):
+    """
+    Optimizer whose candidates are prescreened by a surrogate model.
+
+    Each ask draws `pool_size` candidates from the inner optimizer, encoded
+    as their standardized data, and returns the one with the lowest
+    confidence bound `mean - kappa * std` of a `GaussianProcess` fitted on
+    the losses told so far; the other candidates are told their predicted
+    loss, so the inner optimizer keeps progressing without evaluating them.
+    The first `min_trials` candidates are returned unscreened. It has the
+    ask and tell interface of an optimizer, so it can be passed to any
+    driver, and only supports a single objective. Predicted losses are only
+    told to the inner optimizer: the recommendation is the candidate of the
+    lowest real loss.
+    """
+
+    budget = None  # type: int
+    """Number of real evaluations."""
+
+    pool_size = None  # type: int
+    """Number of candidates drawn from the inner optimizer per ask."""
+
+    min_trials = None  # type: int
+    """Number of losses told before candidates are prescreened."""
+
+    kappa = None  # type: float
+    """Weight of the uncertainty in the confidence bound."""
+
+    max_points = None  # type: int
+    """Maximum number of observations of the surrogate; the best are kept."""
+
+    def __init__(
+        self,
+        optimizer: ng.optimizers.base.Optimizer,
+        budget: int,
+        pool_size: int = 16,
+        min_trials: int = 10,
+        kappa: float = 1.0,
+        max_points: int = 500,
+    ):
+        """
+        :param optimizer: The inner optimizer, e.g. built with a budget of
+            `budget * pool_size` as it is told every candidate it proposes.
+        :param budget: Number of real evaluations.
+        :param pool_size: Number of candidates drawn per ask.
+        :param min_trials: Number of losses told before prescreening.
+        :param kappa: Weight of the uncertainty in the confidence bound.
+        :param max_points: Maximum number of observations of the surrogate.
+        """
+        self.optimizer = optimizer
+        self.budget = budget
+        self.pool_size = pool_size
+        self.min_trials = min_trials
+        self.kappa = kappa
+        self.max_points = max_points
+        self.num_ask = 0
+        self.num_tell = 0
+        self.num_tell_not_asked = 0
+        self.screened = 0
+        self._model = GaussianProcess()
+        self._points = []  # type: list
+        self._asked = set()  # type: set
+        self._best = None  # type: Optional[Tuple[ng.p.Parameter, float]]
+
+    @property
+    def parametrization(self) -> ng.p.Parameter:
+        return self.optimizer.parametrization
+
+    @property
+    def num_workers(self) -> int:
+        return self.optimizer.num_workers
+
+    @property
+    def num_objectives(self) -> int:
+        return self.optimizer.num_objectives
+
+    def _encode(self, candidate: ng.p.Parameter) -> np.ndarray:
+        return candidate.get_standardized_data(reference=self.parametrization)
+
+    def ask(self) -> ng.p.Parameter:
+        """
+        :return: The most promising of `pool_size` candidates of the inner
+            optimizer.
+        """
+        self.num_ask += 1
+        if len(self._model) < self.min_trials:
+            candidate = self.optimizer.ask()
+            self._asked.add(candidate.uid)
+            return candidate
+        candidates = [self.optimizer.ask() for _ in range(self.pool_size)]
+        mean, std = self._model.predict(np.array([self._encode(c) for c in candidates]))
+        best = int(np.argmin(mean - self.kappa * std))
+        for index, candidate in enumerate(candidates):
+            if index != best:
+                self.optimizer.tell(candidate, float(mean[index]))
+        self.screened += len(candidates) - 1
+        self._asked.add(candidates[best].uid)
+        return candidates[best]
+
+    def tell(self, candidate: ng.p.Parameter, loss: float):
+        """
+        Tell a real loss to the inner optimizer and the surrogate.
+        """
+        if not isinstance(loss, numbers.Real):
+            raise ValueError("Prescreening only supports a single objective")
+        loss = float(loss)
+        if candidate.uid in self._asked:
+            self._asked.remove(candidate.uid)
+        else:
+            self.num_tell_not_asked += 1
+        self.num_tell += 1
+        self.optimizer.tell(candidate, loss)
+        if self._best is None or loss < self._best[1]:
+            self._best = (candidate, loss)
+        self._observe(self._encode(candidate), loss)
+
+    def _observe(self, x: np.ndarray, loss: float):
+        self._points.append((x, loss))
+        finite = [y for _, y in self._points if math.isfinite(y)]
+        if not finite:
+            return
+        if len(self._points) > self.max_points:
+            self._points.sort(key=lambda p: p[1])
+            del self._points[self.max_points :]
+        elif math.isfinite(loss) and len(self._model) == len(self._points) - 1:
+            self._model.add(x, loss)
+            return
+        # penalties are modeled as the worst finite loss
+        worst = max(finite)
+        self._model = GaussianProcess()
+        for point, y in self._points:
+            self._model.add(point, y if math.isfinite(y) else worst)
+
+    def provide_recommendation(self) -> ng.p.Parameter:
+        """
+        :return: The evaluated candidate of the lowest loss; the inner
+            optimizer's recommendation if none was told.
+        """
+        if self._best is None:
+            return self.optimizer.provide_recommendation()
+        return self._best[0]
@@ -0,0 +1,262 @@
+import collections
+import csv
+import json
+import math
+import os
+import re
+from typing import Dict, List, Optional
+
+import nevergrad as ng
+import numpy as np
+
+from hpnevergrad import hpng, journal
+
+_INVALID = object()
+
+
+def load(path: str) -> List[dict]:
+    """
+    Read the trials of a previous search.
+
+    Three formats are recognized by extension: a journal written by
+    `journal.TrialJournal` (`.jsonl`), a JSON list of objects (`.json`),
+    either journal records or flat objects of hyperparameters and a `loss`,
+    and a CSV file (`.csv`) with a `loss` column and one column per
+    hyperparameter. The `name[i]` columns written by
+    `history.TrialHistory.to_csv` for arrays and repeated choices are
+    reassembled into lists, and losses of multi-objective searches are
+    lists, or `loss[i]` columns.
+
+    :param path: File of the trials.
+    :return: Records with the `kwargs` and `loss` of each successful trial.
+    """
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".jsonl":
+        rows = journal.load(path)
+    elif ext == ".json":
+        with open(path, encoding="utf-8") as f:
+            rows = json.load(f)
+    elif ext == ".csv":
+        with open(path, newline="", encoding="utf-8") as f:
+            rows = list(csv.DictReader(f))
+    else:
+        raise ValueError("Unknown format of trials: %r" % path)
+    records = []
+    for row in rows:
+        if row.get("status", "ok") != "ok":
+            continue
+        if "kwargs" in row:
+            kwargs = row["kwargs"]
+        else:
+            kwargs = _group_columns(row)
+        loss = _parse_loss(row)
+        if loss is None:
+            continue
+        records.append({"kwargs": kwargs, "loss": loss})
+    return records
+
+
+def _is_loss(key: str) -> bool:
+    return key == "loss" or key.startswith("loss[")
+
+
+def _group_columns(row: dict) -> dict:
+    """
+    :return: The hyperparameters of a flat row, with the values of its
+        `name[i]` columns as a list.
+    """
+    kwargs = {}
+    indexed = collections.defaultdict(dict)  # type: Dict[str, Dict[int, object]]
+    for key, value in row.items():
+        if _is_loss(key):
+            continue
+        match = re.fullmatch(r"(.+)\[(\d+)\]", key)
+        if match is None:
+            kwargs[key] = value
+        else:
+            indexed[match.group(1)][int(match.group(2))] = value
+    for name, values in indexed.items():
+        kwargs[name] = [values[i] for i in sorted(values)]
+    return kwargs
+
+
+def _parse_loss(row: dict):
+    """
+    :return: The loss of a row, a float or a list of floats for several
+        objectives, or None if it is missing or NaN.
+    """
+    if "loss" in row:
+        loss = row["loss"]
+    else:
+        columns = sorted(
+            (int(k[len("loss[") : -1]), v) for k, v in row.items() if _is_loss(k)
+        )
+        loss = [v for _, v in columns] or None
+    if isinstance(loss, str) and loss.startswith("["):
+        loss = json.loads(loss)
+    if isinstance(loss, list):
+        if any(v is None or v == "" for v in loss):
+            return None
+        loss = [float(v) for v in loss]
+        return None if any(math.isnan(v) for v in loss) else loss
+    if loss is None or loss == "":
+        return None
+    loss = float(loss)
+    return None if math.isnan(loss) else loss
+
+
+def _match(choices: list, value):
+    """
+    :return: The index of the value among the choices, or None.
+    """
+    for index, choice in enumerate(choices):
+        if choice == value:
+            return index
+    # values read from CSV are strings
+    for index, choice in enumerate(choices):
+        if str(choice) == str(value):
+            return index
+    return None
+
+
+def _adapt_value(parameter: ng.p.Parameter, value):
+    """
+    :return: The value converted for the parameter, or `_INVALID` if it can
+        not be represented by it.
+    """
+    if isinstance(parameter, ng.p.BaseChoice):
+        choices = parameter.choices.value
+        if not hpng.is_repeated(parameter):
+            index = _match(choices, value)
+            return _INVALID if index is None else choices[index]
+        # each repetition is matched on its own
+        if isinstance(value, str):
+            try:
+                value = json.loads(value)
+            except ValueError:
+                return _INVALID
+        if not isinstance(value, (list, tuple)):
+            return _INVALID
+        if len(value) != len(parameter.indices.value):
+            return _INVALID
+        indices = [_match(choices, v) for v in value]
+        if None in indices:
+            return _INVALID
+        return tuple(choices[i] for i in indices)
+    if isinstance(parameter, ng.p.Data):
+        try:
+            if isinstance(value, str):
+                value = json.loads(value)
+            array = np.asarray(value, dtype=float)
+        except (TypeError, ValueError):
+            return _INVALID
+        shape = np.asarray(parameter.value).shape
+        if array.size != int(np.prod(shape)):
+            return _INVALID
+        array = array.reshape(shape)
+        lower, upper = parameter.bounds
+        if lower is not None or upper is not None:
+            array = np.clip(array, lower, upper)
+        if not shape:
+            return array.item()
+        return array
+    return value
+
+
+def adapt(parametrization: ng.p.Instrumentation, kwargs: dict) -> Optional[dict]:
+    """
+    Map the hyperparameters of a previous trial onto the current search
+    space: hyperparameters no longer declared are dropped, new ones take
+    their default value, values out of bounds are clipped, and numbers
+    read as strings are converted. In a conditional space, only the
+    hyperparameters active for the previous choices are kept.
+
+    :param parametrization: The current parametrization, e.g. built by
+        `hpng.get_parametrization`.
+    :param kwargs: Hyperparameters of the previous trial, flat.
+    :return: The adapted kwargs, nested as the value of a candidate, see
+        `hpng.nest_kwargs`, or None if a value is not in the current space,
+        e.g. a choice which was removed.
+    """
+    return _adapt(parametrization[1], kwargs)
+
+
+def _adapt(parameters: ng.p.Dict, kwargs: dict) -> Optional[dict]:
+    adapted = {}
+    for name, parameter in parameters.items():
+        if hpng.is_conditional(name, parameter):
+            branches = parameter.choices
+            value = kwargs.get(name, hpng.get_value(name, parameter))
+            index = _match([branch.value[name] for branch in branches], value)
+            if index is None:
+                return None
+            branch = _adapt(branches[index], kwargs)
+            if branch is None:
+                return None
+            adapted[name] = dict(branch, **{name: branches[index].value[name]})
+            continue
+        if name not in kwargs:
+            adapted[name] = parameter.value
+            continue
+        value = _adapt_value(parameter, kwargs[name])
+        if value is _INVALID:
+            return None
+        adapted[name] = value
+    return adapted
+
+
+def _spawn(parametrization: ng.p.Instrumentation, kwargs: dict):
+    """
+    :return: A child of the parametrization holding the adapted kwargs, or
+        None if they can not be adapted.
+    """
+    adapted = adapt(parametrization, kwargs)
+    if adapted is None:
+        return None
+    try:
+        return parametrization.spawn_child(new_value=((), adapted))
+    except ValueError:
+        return None
+
+
+def adapt_records(
+    parametrization: ng.p.Instrumentation, records: List[dict]
+) -> List[dict]:
+    """
+    :param parametrization: The current parametrization.
+    :param records: Records read by `load`.
+    :return: The records whose hyperparameters can be adapted to the
+        parametrization, with their adapted kwargs.
+    """
+    adapted = []
+    for record in records:
+        candidate = _spawn(parametrization, record["kwargs"])
+        if candidate is not None:
+            kwargs = hpng.flatten_kwargs(candidate.kwargs)
+            adapted.append({"kwargs": kwargs, "loss": record["loss"]})
+    return adapted
+
+
+def warm_start(optimizer: ng.optimizers.base.Optimizer, records: List[dict]) -> int:
+    """
+    Tell the trials of previous searches to an optimizer before it asks any
+    candidate.
+
+    Unlike `journal.replay`, the trials may come from a search space which
+    changed since: they are adapted as by `adapt`, and skipped if they can
+    not be. Told trials are deducted from the budget of the drivers; build
+    the optimizer with a budget increased by the number of adapted records
+    to keep its new evaluations.
+
+    :param optimizer: The nevergrad optimizer.
+    :param records: Records read by `load`.
+    :return: Number of trials told to the optimizer.
+    """
+    told = 0
+    for record in records:
+        candidate = _spawn(optimizer.parametrization, record["kwargs"])
+        if candidate is None:
+            continue
+        optimizer.tell(candidate, record["loss"])
+        told += 1
+    return told
@@ -25,6 +25,7 @@ setuptools.setup(
     # url="https://github.com/megvii-research/hpnevergrad",
     packages=setuptools.find_packages(),
     install_requires=requirements,
+    python_requires=">=3.7",
     scripts=["bin/hpng"],
     classifiers=[
         "Programming Language :: Python :: 3",
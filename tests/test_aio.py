@@ -0,0 +1,127 @@
+import asyncio
+
+import hpman
+import nevergrad as ng
+import pytest
+
+from hpnevergrad import aio, hpng
+
+
+def _make_optimizer(budget=12, num_workers=4):
+    parametrization = ng.p.Instrumentation(delay=ng.p.Choice([0.0, 0.01, 0.05]))
+    return ng.optimizers.registry["RandomSearch"](
+        parametrization=parametrization, budget=budget, num_workers=num_workers
+    )
+
+
+class Test(object):
+    def test_minimize_async(self) -> None:
+        in_flight = []
+
+        async def objective_function(delay):
+            in_flight.append(1)
+            peak.append(len(in_flight))
+            await asyncio.sleep(delay)
+            in_flight.pop()
+            return delay
+
+        peak = []
+        trials = []
+        optimizer = _make_optimizer()
+        recommendation = asyncio.run(
+            aio.minimize(optimizer, objective_function, callbacks=[trials.append])
+        )
+        assert recommendation.kwargs["delay"] == 0.0
+        assert optimizer.num_tell == len(trials) == 12
+        assert max(peak) == 4
+
+    def test_minimize_out_of_order(self) -> None:
+        started = []
+
+        async def objective_function(delay):
+            started.append(len(started))
+            index = started[-1]
+            await asyncio.sleep(0.05 if index == 0 else 0.0)
+            return index
+
+        trials = []
+        asyncio.run(
+            aio.minimize(
+                _make_optimizer(budget=4), objective_function, callbacks=[trials.append]
+            )
+        )
+        # the slow first trial does not hold back the three others
+        assert trials[-1].loss == 0
+        assert sorted(t.loss for t in trials[:3]) == [1, 2, 3]
+
+    def test_minimize_sync(self) -> None:
+        optimizer = _make_optimizer()
+        asyncio.run(aio.minimize(optimizer, lambda delay: delay))
+        assert optimizer.num_tell == 12
+
+    def test_minimize_failure(self) -> None:
+        async def objective_function(delay):
+            if delay == 0.0:
+                raise RuntimeError("diverged")
+            await asyncio.sleep(delay)
+            return delay
+
+        with pytest.raises(RuntimeError):
+            asyncio.run(aio.minimize(_make_optimizer(budget=100), objective_function))
+
+    def test_minimize_timeout(self) -> None:
+        cancelled = []
+
+        async def objective_function(delay):
+            try:
+                await asyncio.sleep(10 if delay == 0.05 else delay)
+            except asyncio.CancelledError:
+                cancelled.append(delay)
+                raise
+            return delay
+
+        trials = []
+        optimizer = _make_optimizer()
+        asyncio.run(
+            aio.minimize(
+                optimizer,
+                objective_function,
+                callbacks=[trials.append],
+                penalty=1.0,
+                timeout=0.1,
+            )
+        )
+        assert optimizer.num_tell == len(trials) == 12
+        timed_out = [t for t in trials if t.status == "timeout"]
+        assert all(t.kwargs["delay"] == 0.05 for t in timed_out)
+        assert len(cancelled) == len(timed_out)
+
+    def test_minimize_max_time(self) -> None:
+        async def objective_function(delay):
+            await asyncio.sleep(10)
+
+        trials = []
+        optimizer = _make_optimizer()
+        asyncio.run(
+            aio.minimize(
+                optimizer, objective_function, callbacks=[trials.append], max_time=0.1
+            )
+        )
+        assert optimizer.num_tell == 0
+        assert [t.status for t in trials] == ["cancelled"] * 4
+
+    def test_async_objective_function(self) -> None:
+        async_hpm = hpman.HyperParameterManager("async_hpm")
+
+        async def train():
+            await asyncio.sleep(0)
+            return async_hpm("async_lr", 0.1)
+
+        objective_function = hpng.get_objective_function(train, async_hpm)
+
+        async def run():
+            return await asyncio.gather(
+                *[objective_function(async_lr=i) for i in range(4)]
+            )
+
+        assert asyncio.run(run()) == [0, 1, 2, 3]
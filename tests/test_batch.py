@@ -0,0 +1,131 @@
+import hpman
+import nevergrad as ng
+import numpy as np
+import pytest
+
+from hpnevergrad import batch, cache, hpng
+
+
+def _make_optimizer(budget=20, num_workers=5):
+    parametrization = ng.p.Instrumentation(
+        lr=ng.p.Log(init=1e-3, lower=1e-3, upper=1.0),
+        bs=ng.p.Scalar(init=4, lower=1, upper=12).set_integer_casting(),
+        architecture=ng.p.Choice(["conv", "fc"]),
+        weights=ng.p.Array(init=np.zeros(3)),
+    )
+    return ng.optimizers.registry["RandomSearch"](
+        parametrization=parametrization, budget=budget, num_workers=num_workers
+    )
+
+
+def vectorized(lr, bs, architecture, weights):
+    return (
+        (lr - 0.2) ** 2
+        + (bs - 4) ** 2
+        + np.where(architecture == "conv", 0, 10)
+        + (weights**2).sum(axis=1)
+    )
+
+
+def scalar(lr, bs, architecture, weights):
+    return (
+        (lr - 0.2) ** 2
+        + (bs - 4) ** 2
+        + (0 if architecture == "conv" else 10)
+        + float((weights**2).sum())
+    )
+
+
+class Test(object):
+    def test_stack_kwargs(self) -> None:
+        optimizer = _make_optimizer()
+        candidates = [optimizer.ask() for _ in range(5)]
+        columns = batch.stack_kwargs(
+            optimizer.parametrization, [c.kwargs for c in candidates]
+        )
+        assert columns["lr"].shape == (5,) and columns["lr"].dtype == float
+        assert columns["bs"].dtype.kind == "i"
+        assert columns["architecture"].tolist() == [
+            c.kwargs["architecture"] for c in candidates
+        ]
+        assert columns["weights"].shape == (5, 3)
+
+    def test_stack_mixed_choices(self) -> None:
+        parametrization = ng.p.Instrumentation(act=ng.p.Choice(["relu", None, 2]))
+        kwargs = [{"act": "relu"}, {"act": None}, {"act": 2}]
+        column = batch.stack_kwargs(parametrization, kwargs)["act"]
+        assert column.dtype == object
+        assert column.tolist() == ["relu", None, 2]
+
+    def test_minimize_batched(self) -> None:
+        calls = []
+
+        def objective_function(**columns):
+            calls.append(len(columns["lr"]))
+            return vectorized(**columns)
+
+        trials = []
+        optimizer = _make_optimizer()
+        batch.minimize_batched(optimizer, objective_function, callbacks=[trials.append])
+        assert calls == [5] * 4
+        assert optimizer.num_tell == len(trials) == 20
+        for trial in trials:
+            assert trial.loss == pytest.approx(scalar(**trial.kwargs))
+
+    def test_minimize_batched_hpman(self) -> None:
+        hpm = hpman.HyperParameterManager("_")
+        calls = []
+
+        def train():
+            calls.append(1)
+            return (hpm.get_value("x") - 1.0) ** 2
+
+        parametrization = ng.p.Instrumentation(x=ng.p.Scalar(init=0.0))
+        optimizer = ng.optimizers.registry["RandomSearch"](
+            parametrization=parametrization, budget=12, num_workers=4
+        )
+        trials = []
+        batch.minimize_batched(
+            optimizer,
+            hpng.get_objective_function(train, hpm),
+            callbacks=[trials.append],
+        )
+        assert len(calls) == 3
+        assert all(t.loss == (t.kwargs["x"] - 1.0) ** 2 for t in trials)
+
+    def test_minimize_batched_cache(self) -> None:
+        parametrization = ng.p.Instrumentation(x=ng.p.Choice([0, 1]))
+        optimizer = ng.optimizers.registry["RandomSearch"](
+            parametrization=parametrization, budget=10, num_workers=2
+        )
+        evaluated = []
+
+        def objective_function(x):
+            evaluated.extend(x.tolist())
+            return x * 2.0
+
+        with cache.EvaluationCache() as evaluation_cache:
+            batch.minimize_batched(
+                optimizer, objective_function, cache=evaluation_cache
+            )
+        assert optimizer.num_tell == 10
+        assert len(set(evaluated)) <= 2 < 10
+
+    def test_minimize_batched_failure(self) -> None:
+        def objective_function(**columns):
+            return np.zeros(2)
+
+        trials = []
+        with pytest.raises(ValueError):
+            batch.minimize_batched(
+                _make_optimizer(), objective_function, callbacks=[trials.append]
+            )
+        assert [t.status for t in trials] == ["failed"] * 5
+
+        trials = []
+        optimizer = _make_optimizer()
+        batch.minimize_batched(
+            optimizer, objective_function, callbacks=[trials.append], penalty=1e3
+        )
+        assert optimizer.num_tell == 20
+        assert all(t.loss == 1e3 for t in trials)
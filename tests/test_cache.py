@@ -0,0 +1,64 @@
+import nevergrad as ng
+import numpy as np
+
+from hpnevergrad import cache, driver
+
+
+class Test(object):
+    def test_get_key(self) -> None:
+        assert cache.get_key({"a": 1, "b": "x"}) == cache.get_key({"b": "x", "a": 1})
+        assert cache.get_key({"a": np.int64(1)}) == cache.get_key({"a": 1})
+        assert cache.get_key({"a": np.array([1.0, 2.0])}) == cache.get_key(
+            {"a": [1.0, 2.0]}
+        )
+        assert cache.get_key({"a": 1}) != cache.get_key({"a": 2})
+
+    def test_lru(self) -> None:
+        evaluation_cache = cache.EvaluationCache(maxsize=2)
+        for i in range(3):
+            evaluation_cache.put({"x": i}, float(i))
+        assert evaluation_cache.get({"x": 0}) is None
+        assert evaluation_cache.get({"x": 2}) == 2.0
+        assert (evaluation_cache.hits, evaluation_cache.misses) == (1, 1)
+
+    def test_path(self, tmp_path) -> None:
+        path = str(tmp_path / "cache.sqlite")
+        with cache.EvaluationCache(maxsize=1, path=path) as evaluation_cache:
+            evaluation_cache.put({"x": 0}, 0.5)
+            evaluation_cache.put({"x": 1}, 1.5)
+            assert evaluation_cache.get({"x": 0}) == 0.5
+        with cache.EvaluationCache(path=path) as evaluation_cache:
+            assert evaluation_cache.get({"x": 1}) == 1.5
+
+    def test_wrap(self) -> None:
+        calls = []
+
+        def objective_function(x):
+            calls.append(x)
+            return x * 2.0
+
+        evaluation_cache = cache.EvaluationCache()
+        wrapped = evaluation_cache.wrap(objective_function)
+        assert [wrapped(x=1), wrapped(x=1), wrapped(x=2)] == [2.0, 2.0, 4.0]
+        assert calls == [1, 2]
+
+    def test_driver(self) -> None:
+        calls = []
+
+        def objective_function(bs):
+            calls.append(bs)
+            return float(bs)
+
+        parametrization = ng.p.Instrumentation(bs=ng.p.Choice([1, 2]))
+        optimizer = ng.optimizers.registry["RandomSearch"](
+            parametrization=parametrization, budget=20
+        )
+        evaluation_cache = cache.EvaluationCache()
+        trials = []
+        driver.minimize(
+            optimizer, objective_function, None, [trials.append], evaluation_cache
+        )
+        assert optimizer.num_tell == 20
+        assert sorted(calls) == sorted(set(calls))
+        assert evaluation_cache.misses == len(calls)
+        assert evaluation_cache.hits == sum(t.cached for t in trials) == 20 - len(calls)
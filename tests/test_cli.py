@@ -0,0 +1,166 @@
+import ast
+import csv
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HPNG = os.path.join(ROOT, "bin", "hpng")
+# modules are imported by name, relative to the working directory
+EXAMPLE = os.path.join(ROOT, "examples", "00-basic")
+BASIC = "basic.py:train"
+
+
+def _env(**kwargs):
+    # the repository is importable even when hpnevergrad is not installed
+    path = os.pathsep.join(filter(None, [ROOT, os.environ.get("PYTHONPATH")]))
+    return dict(os.environ, PYTHONPATH=path, PYTHONUNBUFFERED="1", **kwargs)
+
+
+def _parse(stdout):
+    recommendation = ast.literal_eval(stdout.strip().splitlines()[-1])
+    assert sorted(recommendation) == ["architecture", "bs", "lr"]
+    return recommendation
+
+
+def _hpng(*args):
+    """
+    :return: The recommendation printed by `hpng BASIC args` run in the
+        example directory, and its standard error.
+    """
+    process = subprocess.run(
+        [sys.executable, HPNG, BASIC] + [str(arg) for arg in args],
+        cwd=EXAMPLE,
+        env=_env(),
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+        timeout=120,
+    )
+    assert process.returncode == 0, process.stderr
+    return _parse(process.stdout), process.stderr
+
+
+def _journal(path):
+    with open(str(path)) as f:
+        return [json.loads(line) for line in f]
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class Test(object):
+    def test_journal_resume(self, tmp_path) -> None:
+        path = tmp_path / "search.jsonl"
+        _hpng("--budget", 3, "--journal", path)
+        assert len(_journal(path)) == 3
+        # the journaled trials are deducted from the budget
+        _hpng("--budget", 5, "--resume", path)
+        records = _journal(path)
+        assert [r["status"] for r in records] == ["ok"] * 5
+
+    def test_warm_start(self, tmp_path) -> None:
+        path = tmp_path / "previous.jsonl"
+        _hpng("--budget", 3, "--journal", path)
+        _, stderr = _hpng("--budget", 2, "--warm-start", path)
+        assert "warm start: 3 trials" in stderr
+
+    def test_history(self, tmp_path) -> None:
+        path = tmp_path / "history.csv"
+        _hpng("--budget", 4, "--history", path)
+        with open(str(path)) as f:
+            rows = list(csv.DictReader(f))
+        assert len(rows) == 4
+        assert {"lr", "bs", "architecture", "loss", "status"} <= set(rows[0])
+        # a CSV history can warm start a search
+        _, stderr = _hpng("--budget", 1, "--warm-start", path)
+        assert "warm start: 4 trials" in stderr
+        _hpng("--budget", 4, "--history", tmp_path / "history.npz")
+        with np.load(str(tmp_path / "history.npz")) as data:
+            assert len(data["losses"]) == 4
+
+    def test_max_time(self, tmp_path) -> None:
+        path = tmp_path / "search.jsonl"
+        start = time.perf_counter()
+        _hpng("--budget", 100000, "--max-time", 2, "--journal", path)
+        assert time.perf_counter() - start < 30
+        records = _journal(path)
+        assert 0 < len(records) < 100000
+        assert {r["status"] for r in records} <= {"ok", "cancelled"}
+
+    def test_seed(self, tmp_path) -> None:
+        runs = []
+        for name in ["first.jsonl", "second.jsonl"]:
+            path = tmp_path / name
+            recommendation, _ = _hpng(
+                "--budget", 6, "--num-workers", 2, "--seed", 7, "--journal", path
+            )
+            trials = [(r["kwargs"], r["loss"]) for r in _journal(path)]
+            runs.append((recommendation, trials))
+        assert runs[0] == runs[1]
+
+    def test_isolate_warm(self, tmp_path) -> None:
+        _hpng("--budget", 2, "--isolate", "--journal", tmp_path / "a.jsonl")
+        _hpng(
+            "--budget",
+            4,
+            "--num-workers",
+            2,
+            "--warm",
+            "--journal",
+            tmp_path / "b.jsonl",
+        )
+        for name, budget in [("a.jsonl", 2), ("b.jsonl", 4)]:
+            records = _journal(tmp_path / name)
+            assert [r["status"] for r in records] == ["ok"] * budget
+
+    def test_race(self) -> None:
+        _, stderr = _hpng("--budget", 6, "--race", "RandomSearch,OnePlusOne")
+        assert "RandomSearch" in stderr and "OnePlusOne" in stderr
+
+    def test_prescreen(self) -> None:
+        _, stderr = _hpng("--budget", 6, "--prescreen", 3)
+        assert "prescreening: " in stderr
+
+    def test_serve_worker(self) -> None:
+        address = "127.0.0.1:%d" % _free_port()
+        env = _env(HPNG_AUTHKEY="test-key")
+        server = subprocess.Popen(
+            [sys.executable, HPNG, BASIC, "--budget", "4", "--serve", address],
+            cwd=EXAMPLE,
+            env=env,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            universal_newlines=True,
+        )
+        try:
+            # the worker connects once the search is served
+            lines = []
+            for line in server.stderr:
+                lines.append(line)
+                if line.startswith("serving on"):
+                    break
+            assert lines[-1:] and lines[-1].startswith("serving on"), lines
+            worker = subprocess.run(
+                [sys.executable, HPNG, "worker", address, BASIC],
+                cwd=EXAMPLE,
+                env=env,
+                stderr=subprocess.PIPE,
+                universal_newlines=True,
+                timeout=120,
+            )
+            stdout, _ = server.communicate(timeout=120)
+        finally:
+            server.kill()
+        assert worker.returncode == 0, worker.stderr
+        assert "worker: 4 trials evaluated" in worker.stderr
+        assert server.returncode == 0
+        _parse(stdout)
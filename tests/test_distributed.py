@@ -0,0 +1,134 @@
+import threading
+import time
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client
+
+import nevergrad as ng
+import pytest
+
+from hpnevergrad import distributed, runner
+
+
+def square(x):
+    return (x - 1.0) ** 2
+
+
+def _make_optimizer(budget=20, num_workers=4):
+    parametrization = ng.p.Instrumentation(x=ng.p.Scalar(init=0.0))
+    return ng.optimizers.registry["RandomSearch"](
+        parametrization=parametrization, budget=budget, num_workers=num_workers
+    )
+
+
+def _serve(coordinator, results):
+    try:
+        results.append(coordinator.serve())
+    except Exception as e:
+        results.append(e)
+
+
+class Test(object):
+    def test_parse_address(self) -> None:
+        assert distributed.parse_address("node1:5000") == ("node1", 5000)
+        assert distributed.parse_address(":5000") == ("127.0.0.1", 5000)
+        with pytest.raises(ValueError):
+            distributed.parse_address("node1")
+
+    def test_coordinator(self) -> None:
+        optimizer = _make_optimizer()
+        trials = []
+        results = []
+        with distributed.Coordinator(optimizer, callbacks=[trials.append]) as c:
+            server = threading.Thread(target=_serve, args=(c, results))
+            server.start()
+            counts = []
+            workers = [
+                threading.Thread(
+                    target=lambda: counts.append(
+                        distributed.work(c.address, square, c.authkey, num_workers=2)
+                    )
+                )
+                for _ in range(2)
+            ]
+            for worker in workers:
+                worker.start()
+            for worker in workers:
+                worker.join()
+            server.join()
+        assert isinstance(results[0], ng.p.Parameter)
+        assert sum(counts) == optimizer.num_tell == len(trials) == 20
+        assert all(t.loss == square(**t.kwargs) for t in trials)
+
+    def test_authkey(self) -> None:
+        results = []
+        with distributed.Coordinator(_make_optimizer(budget=2)) as c:
+            with distributed.Coordinator(_make_optimizer()) as other:
+                # a random key, not a public default
+                assert c.authkey != other.authkey
+            server = threading.Thread(target=_serve, args=(c, results))
+            server.start()
+            with pytest.raises(AuthenticationError):
+                Client(c.address, authkey=b"hpnevergrad")
+            assert distributed.work(c.address, square, c.authkey) == 2
+            server.join()
+
+    def test_max_time(self) -> None:
+        def slow(x):
+            time.sleep(0.05)
+            return square(x)
+
+        optimizer = _make_optimizer(budget=1000, num_workers=2)
+        trials = []
+        results = []
+        with distributed.Coordinator(
+            optimizer, callbacks=[trials.append], max_time=0.3
+        ) as c:
+            server = threading.Thread(target=_serve, args=(c, results))
+            server.start()
+            count = distributed.work(c.address, slow, c.authkey, num_workers=2)
+            server.join()
+        assert isinstance(results[0], ng.p.Parameter)
+        assert 0 < optimizer.num_tell <= count < 1000
+        assert {t.status for t in trials} <= {"ok", "cancelled"}
+        assert len(trials) == optimizer.num_ask
+
+    def test_disconnected_worker(self) -> None:
+        optimizer = _make_optimizer(budget=3, num_workers=1)
+        trials = []
+        results = []
+        with distributed.Coordinator(optimizer, callbacks=[trials.append]) as c:
+            server = threading.Thread(target=_serve, args=(c, results))
+            server.start()
+            # a worker dies after receiving its trial: it is handed to another
+            with Client(c.address, authkey=c.authkey) as conn:
+                conn.send(("ask",))
+                _, _, kwargs = conn.recv()
+            assert distributed.work(c.address, square, c.authkey) == 3
+            server.join()
+        assert optimizer.num_ask == optimizer.num_tell == 3
+        assert kwargs in [t.kwargs for t in trials]
+
+    def test_failure(self) -> None:
+        def fail(x):
+            raise ValueError("diverged")
+
+        results = []
+        with distributed.Coordinator(_make_optimizer(budget=5)) as c:
+            server = threading.Thread(target=_serve, args=(c, results))
+            server.start()
+            distributed.work(c.address, fail, c.authkey)
+            server.join()
+        assert isinstance(results[0], runner.TrialError)
+        assert "diverged" in str(results[0])
+
+        trials = []
+        optimizer = _make_optimizer(budget=5)
+        with distributed.Coordinator(
+            optimizer, callbacks=[trials.append], penalty=1e3
+        ) as c:
+            server = threading.Thread(target=_serve, args=(c, results))
+            server.start()
+            distributed.work(c.address, fail, c.authkey)
+            server.join()
+        assert [t.status for t in trials] == ["failed"] * 5
+        assert optimizer.num_tell == 5
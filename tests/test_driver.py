@@ -0,0 +1,244 @@
+import concurrent.futures
+import random
+import time
+
+import nevergrad as ng
+import pytest
+
+from hpnevergrad import driver, runner
+
+
+def square(x):
+    return (x - 1.0) ** 2
+
+
+def driver_constraint(value):
+    return False
+
+
+class Test(object):
+    def _make_optimizer(self, budget=10, num_workers=1):
+        parametrization = ng.p.Instrumentation(x=ng.p.Scalar(init=0.0))
+        return ng.optimizers.registry["RandomSearch"](
+            parametrization=parametrization, budget=budget, num_workers=num_workers
+        )
+
+    def test_minimize(self) -> None:
+        optimizer = self._make_optimizer()
+        trials = []
+        recommendation = driver.minimize(optimizer, square, callbacks=[trials.append])
+        assert isinstance(recommendation, ng.p.Parameter)
+        assert optimizer.num_tell == 10
+        assert [t.status for t in trials] == ["ok"] * 10
+        assert all(t.loss == square(**t.kwargs) for t in trials)
+        assert all(t.wall_time >= 0 for t in trials)
+
+    def test_minimize_executor(self) -> None:
+        optimizer = self._make_optimizer(num_workers=4)
+        trials = []
+        with concurrent.futures.ThreadPoolExecutor(max_workers=4) as executor:
+            driver.minimize(optimizer, square, executor, [trials.append])
+        assert optimizer.num_ask == optimizer.num_tell == len(trials) == 10
+
+    def test_minimize_failure(self) -> None:
+        def fail(x):
+            raise RuntimeError("diverged")
+
+        trials = []
+        with pytest.raises(RuntimeError):
+            driver.minimize(self._make_optimizer(), fail, callbacks=[trials.append])
+        assert [t.status for t in trials] == ["failed"]
+
+    def test_minimize_deducts_told_not_asked(self) -> None:
+        optimizer = self._make_optimizer()
+        for x in range(3):
+            candidate = optimizer.parametrization.spawn_child(((), {"x": x}))
+            optimizer.tell(candidate, square(x))
+        driver.minimize(optimizer, square)
+        assert optimizer.num_ask == 7
+
+    def test_minimize_timeout(self) -> None:
+        def straggle(x):
+            time.sleep(0.5 if x > 0 else 0.0)
+            return square(x)
+
+        optimizer = self._make_optimizer(budget=8, num_workers=4)
+        trials = []
+        # threads of timed out trials stay busy: spare ones run the next trials
+        with concurrent.futures.ThreadPoolExecutor(max_workers=8) as executor:
+            driver.minimize(
+                optimizer,
+                straggle,
+                executor,
+                [trials.append],
+                penalty=1e9,
+                timeout=0.1,
+            )
+        assert optimizer.num_tell == len(trials) == 8
+        for trial in trials:
+            if trial.kwargs["x"] > 0:
+                assert (trial.status, trial.loss) == ("timeout", 1e9)
+            else:
+                assert trial.status == "ok"
+        with pytest.raises(ValueError):
+            driver.minimize(self._make_optimizer(), square, timeout=1.0)
+
+    def test_minimize_timeout_without_penalty(self) -> None:
+        trials = []
+        with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+            with pytest.raises(runner.TrialTimeout):
+                driver.minimize(
+                    self._make_optimizer(),
+                    lambda x: time.sleep(0.3),
+                    executor,
+                    [trials.append],
+                    timeout=0.05,
+                )
+        assert [t.status for t in trials] == ["timeout"]
+
+    def test_minimize_max_time(self) -> None:
+        def slow(x):
+            time.sleep(0.05)
+            return square(x)
+
+        optimizer = self._make_optimizer(budget=1000, num_workers=2)
+        trials = []
+        start = time.perf_counter()
+        with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
+            recommendation = driver.minimize(
+                optimizer, slow, executor, [trials.append], max_time=0.3
+            )
+        assert time.perf_counter() - start < 1.0
+        assert isinstance(recommendation, ng.p.Parameter)
+        assert 0 < optimizer.num_tell < optimizer.num_ask < 1000
+        told = [t for t in trials if t.status == "ok"]
+        cancelled = [t for t in trials if t.status == "cancelled"]
+        assert len(told) == optimizer.num_tell
+        assert len(told) + len(cancelled) == optimizer.num_ask
+        assert all(t.loss is None for t in cancelled)
+
+    def test_minimize_multiobjective(self) -> None:
+        def metrics(x):
+            return {"error": (x - 1.0) ** 2, "cost": x**2}
+
+        optimizer = self._make_optimizer(budget=20)
+        trials = []
+        recommendation = driver.minimize(optimizer, metrics, callbacks=[trials.append])
+        assert recommendation.value is None
+        assert optimizer.num_objectives == 2
+        assert all(t.loss == list(metrics(**t.kwargs).values()) for t in trials)
+        front = optimizer.pareto_front()
+        assert front
+        for candidate in front:
+            assert candidate.losses.tolist() in [t.loss for t in trials]
+
+    def test_minimize_multiobjective_failures(self) -> None:
+        calls = []
+
+        def metrics(x):
+            calls.append(x)
+            if len(calls) <= 2:
+                raise RuntimeError("diverged")
+            return [(x - 1.0) ** 2, x**2]
+
+        optimizer = self._make_optimizer(budget=10)
+        trials = []
+        driver.minimize(optimizer, metrics, callbacks=[trials.append], penalty=1e9)
+        # the first penalties did not make the search single objective
+        assert optimizer.num_objectives == 2
+        assert optimizer.num_tell == 10
+        assert [t.status for t in trials[:2]] == ["failed"] * 2
+        # and are reported as told, on every objective
+        assert [t.loss for t in trials[:2]] == [[1e9, 1e9]] * 2
+        assert all(len(t.loss) == 2 for t in trials)
+
+    def test_minimize_infeasible(self) -> None:
+        evaluated = []
+
+        def objective_function(x):
+            evaluated.append(x)
+            return square(x)
+
+        optimizer = self._make_optimizer(budget=2)
+        # no candidate can satisfy it: nevergrad sends them anyway
+        optimizer.parametrization.register_cheap_constraint(driver_constraint)
+        trials = []
+        with pytest.warns(ng.errors.FailedConstraintWarning):
+            driver.minimize(
+                optimizer, objective_function, callbacks=[trials.append], penalty=1e9
+            )
+        assert evaluated == []
+        assert optimizer.num_tell == 2
+        assert [(t.status, t.loss) for t in trials] == [("infeasible", 1e9)] * 2
+
+    def test_minimize_ordered(self) -> None:
+        def objective_function(x):
+            # trials finish in an arbitrary order
+            time.sleep(random.random() * 0.01)
+            return square(x)
+
+        def search(executor):
+            parametrization = ng.p.Instrumentation(x=ng.p.Scalar(init=0.0))
+            parametrization.random_state.seed(0)
+            optimizer = ng.optimizers.registry["DE"](
+                parametrization=parametrization, budget=24, num_workers=4
+            )
+            trials = []
+            recommendation = driver.minimize(
+                optimizer,
+                objective_function,
+                executor,
+                [trials.append],
+                ordered=True,
+            )
+            return [t.kwargs for t in trials], recommendation.kwargs
+
+        sequential = search(None)
+        with concurrent.futures.ThreadPoolExecutor(max_workers=4) as executor:
+            assert search(executor) == sequential
+            assert search(executor) == sequential
+
+    def test_minimize_seed(self) -> None:
+        def objective_function(x, seed):
+            return random.Random(seed).random()
+
+        def search(seed_name="seed"):
+            optimizer = self._make_optimizer(budget=5)
+            trials = []
+            driver.minimize(
+                optimizer,
+                objective_function if seed_name else square,
+                callbacks=[trials.append],
+                seed=1,
+                seed_name=seed_name,
+            )
+            return trials
+
+        trials = search()
+        seeds = [t.seed for t in trials]
+        assert len(set(seeds)) == 5
+        assert [t.seed for t in search()] == seeds
+        assert [t.loss for t in trials] == [random.Random(s).random() for s in seeds]
+        # the kwargs of the trials do not include the seed
+        assert all(list(t.kwargs) == ["x"] for t in trials)
+        assert [t.seed for t in search(None)] == seeds
+
+    def test_minimize_stop(self) -> None:
+        def stop(trial):
+            if trial.status == "ok":
+                raise driver.StopSearch()
+
+        def objective_function(x):
+            time.sleep(0.05)
+            return square(x)
+
+        optimizer = self._make_optimizer(budget=20, num_workers=4)
+        trials = []
+        with concurrent.futures.ThreadPoolExecutor(max_workers=4) as executor:
+            driver.minimize(
+                optimizer, objective_function, executor, [stop, trials.append]
+            )
+        # the trials still running are cancelled
+        assert optimizer.num_ask == len(trials) == 4
+        assert [t.status for t in trials].count("ok") >= 1
+        assert optimizer.num_tell == [t.status for t in trials].count("ok")
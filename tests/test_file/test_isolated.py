@@ -0,0 +1,29 @@
+import os
+import time
+
+from hpman.m import _
+
+calls = []
+
+
+def train() -> float:
+    lr = _("lr", 1e-3, range=[1e-3, 1.0], scale="log")
+    calls.append(lr)
+    return lr * len(calls)
+
+
+def crash() -> float:
+    os.abort()
+
+
+def hang() -> float:
+    time.sleep(60)
+    return 0.0
+
+
+def fail() -> float:
+    raise ValueError("diverged")
+
+
+def allocate() -> float:
+    return float(len(bytearray(_("size", 1))))
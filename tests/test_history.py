@@ -0,0 +1,175 @@
+import csv
+
+import nevergrad as ng
+import numpy as np
+import pytest
+
+from hpnevergrad import driver, history
+
+
+def objective_function(x, n, arch, arr):
+    return (x - 0.5) ** 2 + n + (0 if arch == "conv" else 1) + float(np.sum(arr))
+
+
+def _make_parametrization():
+    return ng.p.Instrumentation(
+        x=ng.p.Scalar(init=0.5),
+        n=ng.p.Scalar(init=2, lower=0, upper=10).set_integer_casting(),
+        arch=ng.p.Choice(["conv", "fc"]),
+        arr=ng.p.Array(init=np.zeros((2, 2))),
+    )
+
+
+def _search(budget, callbacks, penalty=None, objective=objective_function):
+    optimizer = ng.optimizers.registry["RandomSearch"](
+        parametrization=_make_parametrization(), budget=budget
+    )
+    driver.minimize(optimizer, objective, callbacks=callbacks, penalty=penalty)
+    return optimizer
+
+
+class Test(object):
+    def test_record(self) -> None:
+        trials = []
+        trial_history = history.TrialHistory(_make_parametrization(), capacity=4)
+        _search(10, [trials.append, trial_history])
+        assert len(trial_history) == 10
+        assert trial_history.capacity == 16
+        assert trial_history.statuses == ["ok"] * 10
+        for row, trial in enumerate(trials):
+            kwargs = trial_history.kwargs(row)
+            assert kwargs["x"] == trial.kwargs["x"]
+            assert kwargs["n"] == trial.kwargs["n"] and isinstance(kwargs["n"], int)
+            assert kwargs["arch"] == trial.kwargs["arch"]
+            assert (kwargs["arr"] == trial.kwargs["arr"]).all()
+            assert trial_history.losses[row, 0] == trial.loss
+        assert trial_history.column("arr").shape == (10, 4)
+        assert trial_history.column("x").shape == (10,)
+        assert set(trial_history.column("arch")) <= {0, 1}
+        assert (trial_history.timings("wall_time") >= 0).all()
+        assert np.isnan(trial_history.timings("objective_time")).all()
+        with pytest.raises(IndexError):
+            trial_history.kwargs(10)
+
+    def test_best(self) -> None:
+        trials = []
+        trial_history = history.TrialHistory(_make_parametrization())
+        _search(50, [trials.append, trial_history])
+        best = trial_history.best(3)
+        expected = sorted(trials, key=lambda t: t.loss)[:3]
+        assert [b["loss"] for b in best] == [t.loss for t in expected]
+        assert best[0]["kwargs"]["arch"] == expected[0].kwargs["arch"]
+        assert len(trial_history.best(100)) == 50
+
+    def test_failures(self) -> None:
+        def fail(**kwargs):
+            raise RuntimeError("diverged")
+
+        trial_history = history.TrialHistory(_make_parametrization())
+        assert trial_history.best() == []
+        _search(3, [trial_history], penalty=1e9, objective=fail)
+        assert trial_history.statuses == ["failed"] * 3
+        assert trial_history.losses[:, 0].tolist() == [1e9] * 3
+
+    def test_export(self, tmp_path) -> None:
+        trial_history = history.TrialHistory(_make_parametrization())
+        _search(5, [trial_history])
+        path = str(tmp_path / "history.csv")
+        trial_history.to_csv(path)
+        with open(path) as f:
+            rows = list(csv.DictReader(f))
+        assert len(rows) == 5
+        assert rows[0]["arch"] in ("conv", "fc")
+        assert float(rows[0]["loss"]) == trial_history.losses[0, 0]
+        assert "arr[3]" in rows[0] and rows[0]["status"] == "ok"
+        path = str(tmp_path / "history.npz")
+        trial_history.save(path)
+        arrays = np.load(path)
+        assert arrays["hp:arr"].shape == (5, 4)
+        assert (arrays["losses"] == trial_history.losses).all()
+
+    def test_memory(self) -> None:
+        trial_history = history.TrialHistory(_make_parametrization(), capacity=256)
+        _search(200, [trial_history])
+        nbytes = trial_history.nbytes
+        _search(50, [trial_history])
+        # rows are preallocated: recording more trials allocates nothing
+        assert trial_history.nbytes == nbytes
+        assert nbytes / trial_history.capacity < 128
+
+    def test_conditional(self, tmp_path) -> None:
+        parametrization = ng.p.Instrumentation(
+            x=ng.p.Scalar(init=0.5),
+            arch=ng.p.Choice(
+                [ng.p.Dict(arch="conv", k=ng.p.Scalar(init=3.0)), ng.p.Dict(arch="fc")]
+            ),
+        )
+        optimizer = ng.optimizers.registry["RandomSearch"](
+            parametrization=parametrization, budget=20
+        )
+        trials = []
+        trial_history = history.TrialHistory(parametrization)
+        driver.minimize(
+            optimizer,
+            lambda x, arch, k=0.0: x**2 + k**2,
+            callbacks=[trials.append, trial_history],
+        )
+        assert trial_history.names == ["arch", "k", "x"]
+        for row, trial in enumerate(trials):
+            assert trial_history.kwargs(row) == trial.kwargs
+        arch = trial_history.column("arch")
+        assert set(arch) == {0, 1}
+        # inactive hyperparameters are NaN
+        assert np.isnan(trial_history.column("k")[arch == 1]).all()
+        assert not np.isnan(trial_history.column("k")[arch == 0]).any()
+        path = str(tmp_path / "history.csv")
+        trial_history.to_csv(path)
+        with open(path) as f:
+            rows = list(csv.DictReader(f))
+        assert {row["k"] == "" for row in rows if row["arch"] == "fc"} == {True}
+
+    def test_repetitions(self, tmp_path) -> None:
+        parametrization = ng.p.Instrumentation(
+            c=ng.p.Choice([0, 1, 2, 3], repetitions=2), x=ng.p.Scalar()
+        )
+        optimizer = ng.optimizers.registry["RandomSearch"](
+            parametrization=parametrization, budget=10
+        )
+        trials = []
+        trial_history = history.TrialHistory(parametrization)
+        driver.minimize(
+            optimizer,
+            lambda c, x: sum(c) + x**2,
+            callbacks=[trials.append, trial_history],
+        )
+        assert len(trial_history) == 10
+        for row, trial in enumerate(trials):
+            assert trial_history.kwargs(row) == trial.kwargs
+        assert trial_history.column("c").shape == (10, 2)
+        path = str(tmp_path / "history.csv")
+        trial_history.to_csv(path)
+        with open(path) as f:
+            rows = list(csv.DictReader(f))
+        assert (int(rows[0]["c[0]"]), int(rows[0]["c[1]"])) == trials[0].kwargs["c"]
+
+    def test_multiobjective_early_failure(self, tmp_path) -> None:
+        calls = []
+
+        def metrics(x, n, arch, arr):
+            calls.append(x)
+            if len(calls) == 1:
+                raise RuntimeError("diverged")
+            return [objective_function(x, n, arch, arr), x**2]
+
+        trial_history = history.TrialHistory(_make_parametrization())
+        # the penalty of the first trial is held until the number of
+        # objectives is known, then recorded on every objective
+        _search(5, [trial_history], penalty=5.0, objective=metrics)
+        assert trial_history.losses.shape == (5, 2)
+        assert trial_history.statuses.count("failed") == 1
+        row = trial_history.statuses.index("failed")
+        assert trial_history.losses[row].tolist() == [5.0, 5.0]
+        path = str(tmp_path / "history.csv")
+        trial_history.to_csv(path)
+        with open(path) as f:
+            assert "loss[1]" in next(csv.reader(f))
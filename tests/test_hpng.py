@@ -1,8 +1,12 @@
+import concurrent.futures
+import pickle
+import threading
+
 import hpman
 import nevergrad as ng
 import pytest
 
-from hpnevergrad import hpng
+from hpnevergrad import driver, hpng
 
 
 class Test(object):
@@ -104,3 +108,261 @@ class Test(object):
         obj = "train"
         f = hpng.import_func(f, obj)
         assert callable(f)
+
+    def test_optimizer_warpper_num_workers(self):
+        parametrization = ng.p.Instrumentation(y=ng.p.Scalar())
+        optimizer = hpng.optimizer_warpper("RandomSearch", 10, parametrization, 4)
+        assert optimizer.num_workers == 4
+
+    def test_module_objective(self):
+        objective_function = hpng.ModuleObjective("test_file/test_bin.py", "train")
+        objective_function = pickle.loads(pickle.dumps(objective_function))
+        assert objective_function(lr=0.2, bs=4, architecture="conv") == 0.0
+        assert objective_function(lr=0.2, bs=4, architecture="fc") == 10.0
+
+    @pytest.mark.parametrize("executor", ["thread", "process"])
+    def test_get_executor(self, executor):
+        parametrization = ng.p.Instrumentation(
+            lr=ng.p.Scalar(init=0.1), bs=ng.p.Scalar(init=4), architecture="conv"
+        )
+        optimizer = hpng.optimizer_warpper("RandomSearch", 8, parametrization, 2)
+        objective_function = hpng.ModuleObjective("test_file/test_bin.py", "train")
+        with hpng.get_executor(executor, 2) as pool:
+            optimizer.minimize(objective_function, executor=pool, batch_mode=False)
+        assert optimizer.num_tell == 8
+
+    def test_bind_values(self) -> None:
+        bind_hpm = hpman.HyperParameterManager("bind_hpm")
+
+        def func():
+            barrier.wait()
+            return bind_hpm("bind_lr", 0.1)
+
+        barrier = threading.Barrier(8)
+        objective_function = hpng.get_objective_function(func, bind_hpm)
+        with concurrent.futures.ThreadPoolExecutor(max_workers=8) as pool:
+            futures = [pool.submit(objective_function, bind_lr=i) for i in range(8)]
+            assert [f.result() for f in futures] == list(range(8))
+        assert bind_hpm.get_value("bind_lr") == 0.1
+
+        with hpng.bind_values(bind_hpm, {"bind_lr": 0.5}):
+            assert bind_hpm.get_values()["bind_lr"] == 0.5
+            with hpng.bind_values(bind_hpm, {"bind_bs": 4}):
+                assert bind_hpm.get_value("bind_lr") == 0.5
+                assert bind_hpm.get_value("bind_bs") == 4
+            assert not bind_hpm.exists("bind_bs")
+
+    def test_get_parametrization_idempotent(self) -> None:
+        idem_hpm = hpman.HyperParameterManager("idem_hpm")
+        idem_hpm.parse_file(__file__)
+        idem_lr = idem_hpm("idem_lr", 0.02, range=[1e-3, 1.0], scale="log", sigma=2)
+        first = hpng.get_parametrization(idem_hpm)
+        second = hpng.get_parametrization(idem_hpm)
+        assert first is not second
+        assert first.name == second.name
+        assert "Log" in first.name
+        (oc,) = idem_hpm.db.select(lambda row: row.filename is not None)
+        assert oc["hints"] == {"range": [1e-3, 1.0], "scale": "log", "sigma": 2}
+
+    def test_get_parametrization_cache_dir(self, tmp_path, monkeypatch) -> None:
+        cached_hpm = hpman.HyperParameterManager("cached_hpm")
+        cached_hpm.parse_file(__file__)
+        cached_bs = cached_hpm("cached_bs", 2, choices=[1, 2, 4])
+        fingerprint = hpng.get_fingerprint(cached_hpm)
+        parametrization = hpng.get_parametrization(cached_hpm, str(tmp_path))
+        assert (tmp_path / (fingerprint + ".pkl")).exists()
+
+        # another process loads the saved parametrization instead of building
+        monkeypatch.setattr(hpng, "_parametrizations", {})
+        monkeypatch.setattr(hpng, "_build_parametrization", None)
+        loaded = hpng.get_parametrization(cached_hpm, str(tmp_path))
+        assert loaded.name == parametrization.name
+
+    def test_get_parametrization_seed(self) -> None:
+        seed_hpm = hpman.HyperParameterManager("seed_hpm")
+        seed_hpm.parse_file(__file__)
+        seed_arch = seed_hpm("seed_arch", "a", choices=["a", "b", "c", "d"])
+        seed_x = seed_hpm("seed_x", 0.5, range=[0.0, 1.0])
+
+        def sample(seed):
+            parametrization = hpng.get_parametrization(seed_hpm, seed=seed)
+            default = parametrization.value[1]["seed_arch"]
+            optimizer = ng.optimizers.registry["RandomSearch"](
+                parametrization=parametrization, budget=4
+            )
+            return [default] + [optimizer.ask().kwargs for _ in range(4)]
+
+        assert sample(3) == sample(3)
+        assert sample(3) != sample(4)
+        # seeded copies do not share the random state of other copies
+        first = hpng.get_parametrization(seed_hpm, seed=3)
+        second = hpng.get_parametrization(seed_hpm)
+        assert first.random_state is not second.random_state
+
+    def test_get_fingerprint(self) -> None:
+        fp1_hpm = hpman.HyperParameterManager("fp_hpm")
+        fp1_hpm.parse_source('fp_hpm("fp", 1, range=[0, 2])')
+        fp2_hpm = hpman.HyperParameterManager("fp_hpm")
+        fp2_hpm.parse_source('fp_hpm("fp", 1, range=[0, 3])')
+        assert hpng.get_fingerprint(fp1_hpm) != hpng.get_fingerprint(fp2_hpm)
+        fingerprint = hpng.get_fingerprint(fp2_hpm)
+        fp2_hpm.set_value("fp", 2)
+        assert hpng.get_fingerprint(fp2_hpm) == fingerprint
+
+    def test_select_occurrences(self) -> None:
+        sel_hpm = hpman.HyperParameterManager("sel_hpm")
+        sel_hpm.parse_source('sel_hpm("sel_x", 1, range=[0, 2])', "b.py")
+        sel_hpm.parse_source('sel_hpm("sel_x", range=[0, 3])', "c.py")
+        sel_hpm.parse_source('sel_hpm("sel_y", range=[0, 1])', "a.py")
+        sel_hpm.parse_source('sel_hpm("sel_y", 0.5, range=[0, 1])', "b.py")
+        sel_hpm.parse_source('sel_hpm("sel_y", range=[0, 1])', "c.py")
+        canonical, conflicts = hpng.select_occurrences(sel_hpm.db)
+        assert canonical["sel_x"]["filename"] == "b.py"
+        assert canonical["sel_y"]["value"] == 0.5
+        assert list(conflicts) == ["sel_x"]
+        assert [oc["filename"] for oc in conflicts["sel_x"]] == ["b.py", "c.py"]
+
+    def test_get_parametrization_conflicts(self) -> None:
+        conflict_hpm = hpman.HyperParameterManager("conflict_hpm")
+        conflict_hpm.parse_source('conflict_hpm("conflict", 1, choices=[1, 2])', "a.py")
+        conflict_hpm.parse_source('conflict_hpm("conflict", choices=[1, 3])', "b.py")
+        with pytest.warns(UserWarning, match="a.py:1"):
+            parametrization = hpng.get_parametrization(conflict_hpm)
+        assert parametrization[1]["conflict"].choices.value == (1, 2)
+        with pytest.raises(hpng.HintConflictError):
+            hpng.get_parametrization(conflict_hpm, strict=True)
+
+    def test_constraint(self) -> None:
+        constraint_hpm = hpman.HyperParameterManager("constraint_hpm")
+        constraint_hpm.parse_source(
+            'constraint_hpm("c_bs", 32, range=[1, 512], '
+            'constraint="c_bs * c_seq <= 4096")\n'
+            'constraint_hpm("c_seq", 64, range=[1, 512], '
+            'constraint=["c_seq >= 8", "c_seq % 2 == 0 or c_bs < 16"])',
+            "a.py",
+        )
+        parametrization = hpng.get_parametrization(constraint_hpm)
+        assert [c.expression for c in parametrization._constraint_checkers] == [
+            "c_bs * c_seq <= 4096",
+            "c_seq >= 8",
+            "c_seq % 2 == 0 or c_bs < 16",
+        ]
+        for kwargs, feasible in [
+            ({"c_bs": 32, "c_seq": 64}, True),
+            ({"c_bs": 128, "c_seq": 64}, False),
+            ({"c_bs": 32, "c_seq": 4}, False),
+            ({"c_bs": 32, "c_seq": 9}, False),
+        ]:
+            child = parametrization.spawn_child(new_value=((), kwargs))
+            assert child.satisfies_constraints() is feasible
+        # only the expressions are pickled, e.g. with cached parametrizations
+        loaded = pickle.loads(pickle.dumps(parametrization))
+        child = loaded.spawn_child(new_value=((), {"c_bs": 128, "c_seq": 64}))
+        assert not child.satisfies_constraints()
+
+    def _make_conditional(self):
+        cond_hpm = hpman.HyperParameterManager("cond_hpm")
+        cond_hpm.parse_source(
+            'cond_hpm("optimizer", "adam", choices=["adam", "sgd", "rmsprop"])\n'
+            'cond_hpm("momentum", 0.9, range=[0.0, 0.99], '
+            'active_if={"optimizer": ["sgd", "rmsprop"]})\n'
+            'cond_hpm("nesterov", False, choices=[False, True], '
+            'active_if={"optimizer": "sgd"})\n'
+            'cond_hpm("dampening", 0.1, range=[0.0, 0.5], '
+            'active_if={"nesterov": False}, constraint="dampening < momentum")\n'
+            'cond_hpm("lr", 0.01, range=[1e-4, 1.0], scale="log")',
+            "a.py",
+        )
+        return hpng.get_parametrization(cond_hpm, seed=0)
+
+    def test_active_if(self) -> None:
+        parametrization = self._make_conditional()
+        assert sorted(parametrization[1].keys()) == ["lr", "optimizer"]
+        assert sorted(hpng.all_parameters(parametrization[1])) == [
+            "dampening",
+            "lr",
+            "momentum",
+            "nesterov",
+            "optimizer",
+        ]
+        expected = {
+            "adam": {"lr", "optimizer"},
+            "rmsprop": {"lr", "momentum", "optimizer"},
+            "sgd": {"lr", "momentum", "nesterov", "optimizer"},
+        }
+        seen = set()
+        for _ in range(50):
+            candidate = parametrization.sample()
+            kwargs = hpng.flatten_kwargs(candidate.kwargs)
+            names = expected[kwargs["optimizer"]]
+            if kwargs.get("nesterov") is False:
+                names = names | {"dampening"}
+            assert set(kwargs) == names
+            assert set(hpng.active_parameters(candidate[1])) == names
+            seen.add((kwargs["optimizer"], kwargs.get("nesterov")))
+            # round trip through flat kwargs, e.g. from a journal
+            nested = hpng.nest_kwargs(parametrization, kwargs)
+            assert nested == candidate.kwargs
+        assert len(seen) == 4
+        # missing hyperparameters take their default
+        nested = hpng.nest_kwargs(parametrization, {"optimizer": "sgd"})
+        child = parametrization.spawn_child(new_value=((), nested))
+        assert hpng.flatten_kwargs(child.kwargs) == {
+            "optimizer": "sgd",
+            "momentum": 0.9,
+            "nesterov": False,
+            "dampening": 0.1,
+            "lr": pytest.approx(0.01),
+        }
+        with pytest.raises(ValueError):
+            hpng.nest_kwargs(parametrization, {"optimizer": "adagrad"})
+        # constraints of inactive hyperparameters hold
+        for kwargs, feasible in [
+            ({"optimizer": "sgd", "momentum": 0.05, "nesterov": False}, False),
+            ({"optimizer": "sgd", "momentum": 0.05, "nesterov": True}, True),
+            ({"optimizer": "adam"}, True),
+        ]:
+            nested = hpng.nest_kwargs(parametrization, kwargs)
+            child = parametrization.spawn_child(new_value=((), nested))
+            assert child.satisfies_constraints() is feasible
+        loaded = pickle.loads(pickle.dumps(parametrization))
+        assert loaded.spawn_child(new_value=((), nested)).satisfies_constraints()
+
+    def test_active_if_search(self) -> None:
+        parametrization = self._make_conditional()
+        optimizer = ng.optimizers.registry["RandomSearch"](
+            parametrization=parametrization, budget=20
+        )
+        trials = []
+
+        def objective_function(optimizer, lr, **kwargs):
+            assert ("momentum" in kwargs) is (optimizer != "adam")
+            return lr + kwargs.get("momentum", 1.0)
+
+        recommendation = driver.minimize(
+            optimizer, objective_function, callbacks=[trials.append]
+        )
+        assert all(t.status == "ok" for t in trials)
+        best = min(trials, key=lambda t: t.loss)
+        assert hpng.flatten_kwargs(recommendation.kwargs) == best.kwargs
+
+    @pytest.mark.parametrize(
+        "source",
+        [
+            'err_hpm("a", 1, range=[0, 2], active_if={"b": 1})',
+            'err_hpm("a", 1, range=[0, 2], active_if={"b": 1})\n'
+            'err_hpm("b", 1, range=[0, 2])',
+            'err_hpm("a", 1, range=[0, 2], active_if={"b": 3})\n'
+            'err_hpm("b", 1, choices=[1, 2])',
+            'err_hpm("a", 1, range=[0, 2], active_if="b")\n'
+            'err_hpm("b", 1, choices=[1, 2])',
+            'err_hpm("a", 1, choices=[1, 2], active_if={"b": 1})\n'
+            'err_hpm("b", 1, choices=[1, 2], active_if={"a": 1})',
+            'err_hpm("a", 1, range=[0, 2], constraint="a < b")',
+        ],
+    )
+    def test_active_if_errors(self, source) -> None:
+        err_hpm = hpman.HyperParameterManager("err_hpm")
+        err_hpm.parse_source(source, "a.py")
+        with pytest.raises(ValueError):
+            hpng.get_parametrization(err_hpm)
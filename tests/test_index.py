@@ -0,0 +1,83 @@
+import os
+import warnings
+
+import pytest
+
+from hpnevergrad import hpng, index
+
+
+def _write(path, source):
+    path.write(source)
+    # make the change visible to a stat with a coarse resolution
+    mtime = os.stat(str(path)).st_mtime + 10
+    os.utime(str(path), (mtime, mtime))
+
+
+class Test(object):
+    def _make_tree(self, tmpdir):
+        _write(tmpdir.join("a.py"), '_("lr", 0.1, range=[0.001, 1.0], scale="log")\n')
+        _write(
+            tmpdir.mkdir("pkg").join("b.py"),
+            '_("bs", 4, range=[1, 12])\n_("architecture", "conv", choices=["conv", "fc"])\n',
+        )
+        tmpdir.join("pkg").join("notes.txt").write('_("ignored", 1, range=[0, 1])')
+
+    def test_update(self, tmpdir) -> None:
+        self._make_tree(tmpdir)
+        source_index = index.SourceIndex()
+        parsed = source_index.update(str(tmpdir))
+        assert [os.path.basename(f) for f in parsed] == ["a.py", "b.py"]
+        assert sorted(oc["name"] for oc in source_index.occurrences()) == [
+            "architecture",
+            "bs",
+            "lr",
+        ]
+        parametrization = source_index.get_parametrization()
+        assert sorted(parametrization.kwargs) == ["architecture", "bs", "lr"]
+
+    def test_incremental(self, tmpdir) -> None:
+        self._make_tree(tmpdir)
+        path = str(tmpdir.join("index.pkl"))
+        index.SourceIndex(path=path).update(str(tmpdir))
+
+        # a new process only parses the changed files
+        source_index = index.SourceIndex(path=path)
+        assert source_index.update(str(tmpdir)) == []
+        a = tmpdir.join("a.py")
+        _write(a, a.read())
+        assert source_index.update(str(tmpdir)) == []
+        _write(a, '_("lr", 0.1, range=[0.001, 0.5], scale="log")\n')
+        assert source_index.update(str(tmpdir)) == [str(a)]
+        (lr,) = [oc for oc in source_index.occurrences() if oc["name"] == "lr"]
+        assert lr["hints"]["range"] == [0.001, 0.5]
+
+        tmpdir.join("pkg").join("b.py").remove()
+        assert index.SourceIndex(path=path).update(str(tmpdir)) == []
+        assert index.SourceIndex(path=path).files == [str(a)]
+
+    def test_placeholder_mismatch(self, tmpdir) -> None:
+        self._make_tree(tmpdir)
+        path = str(tmpdir.join("index.pkl"))
+        index.SourceIndex(path=path).update(str(tmpdir))
+        source_index = index.SourceIndex("hp", path)
+        assert source_index.files == []
+        assert len(source_index.update(str(tmpdir))) == 2
+        assert source_index.occurrences() == []
+
+    def test_conflicts(self, tmpdir) -> None:
+        _write(tmpdir.join("a.py"), '_("bs", 4, range=[1, 12])\n')
+        _write(tmpdir.join("b.py"), '_("bs", 8, range=[1, 12])\n')
+        source_index = index.SourceIndex()
+        source_index.update(str(tmpdir))
+        with pytest.raises(hpng.HintConflictError, match="bs"):
+            source_index.get_parametrization(strict=True)
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter("always")
+            parametrization = source_index.get_parametrization()
+        assert len(caught) == 1
+        # the last file wins, deterministically
+        assert parametrization.kwargs["bs"] == 8
+
+    def test_missing_path(self, tmpdir) -> None:
+        with pytest.raises(FileNotFoundError):
+            index.SourceIndex().update(str(tmpdir.join("missing.py")))
@@ -0,0 +1,79 @@
+import nevergrad as ng
+import numpy as np
+
+from hpnevergrad import driver, journal
+
+
+def objective_function(x, arch, arr):
+    return x**2 + (0 if arch == "conv" else 1) + float(np.sum(arr))
+
+
+class Test(object):
+    def _make_optimizer(self, budget=6):
+        parametrization = ng.p.Instrumentation(
+            x=ng.p.Scalar(init=0.5),
+            arch=ng.p.Choice(["conv", "fc"]),
+            arr=ng.p.Array(init=np.zeros(2)),
+        )
+        return ng.optimizers.registry["RandomSearch"](
+            parametrization=parametrization, budget=budget
+        )
+
+    def test_write_load(self, tmp_path) -> None:
+        path = str(tmp_path / "journal.jsonl")
+        with journal.TrialJournal(path, fsync_every=4) as trial_journal:
+            driver.minimize(
+                self._make_optimizer(), objective_function, None, [trial_journal]
+            )
+        records = journal.load(path)
+        assert len(records) == 6
+        for record in records:
+            assert record["status"] == "ok"
+            assert record["wall_time"] >= 0
+            assert record["loss"] == objective_function(**record["kwargs"])
+
+    def test_load_truncated(self, tmp_path) -> None:
+        path = tmp_path / "journal.jsonl"
+        path.write_text(
+            '{"kwargs": {"x": 1}, "loss": 1.0, "wall_time": 0.1, "status": "ok"}\n'
+            '{"kwargs": {"x": 2}, "loss": 4.0, "wal'
+        )
+        assert len(journal.load(str(path))) == 1
+
+    def test_resume_truncated(self, tmp_path) -> None:
+        path = tmp_path / "journal.jsonl"
+        path.write_text(
+            '{"kwargs": {"x": 1.0, "arch": "conv", "arr": [0.0, 0.0]}, '
+            '"loss": 1.0, "wall_time": 0.1, "status": "ok"}\n'
+            '{"kwargs": {"x": 2}, "lo'
+        )
+        path = str(path)
+        for resumed in range(2):
+            optimizer = self._make_optimizer(budget=3 + 2 * resumed)
+            assert journal.replay(optimizer, journal.load(path)) == 1 + 2 * resumed
+            with journal.TrialJournal(path) as trial_journal:
+                driver.minimize(optimizer, objective_function, None, [trial_journal])
+        # the torn record was dropped and no new record was lost
+        assert len(journal.load(path)) == 5
+
+    def test_resume(self, tmp_path) -> None:
+        path = str(tmp_path / "journal.jsonl")
+        with journal.TrialJournal(path) as trial_journal:
+            driver.minimize(
+                self._make_optimizer(budget=4),
+                objective_function,
+                None,
+                [trial_journal],
+            )
+        with open(path, "a") as f:
+            f.write(
+                '{"kwargs": {}, "loss": null, "wall_time": 1.0, "status": "failed"}\n'
+            )
+
+        optimizer = self._make_optimizer(budget=10)
+        assert journal.replay(optimizer, journal.load(path)) == 4
+        with journal.TrialJournal(path) as trial_journal:
+            driver.minimize(optimizer, objective_function, None, [trial_journal])
+        assert optimizer.num_ask == 6
+        assert optimizer.num_tell == 10
+        assert len(journal.load(path)) == 11
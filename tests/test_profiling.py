@@ -0,0 +1,82 @@
+import concurrent.futures
+import json
+import os
+import pstats
+import time
+
+import nevergrad as ng
+
+from hpnevergrad import driver, profiling
+
+
+def square(x):
+    return (x - 1.0) ** 2
+
+
+def sleepy(x):
+    time.sleep(0.01 * abs(x))
+    return x
+
+
+class Test(object):
+    def _make_optimizer(self, budget=6, num_workers=1):
+        parametrization = ng.p.Instrumentation(x=ng.p.Scalar(init=0.0))
+        return ng.optimizers.registry["RandomSearch"](
+            parametrization=parametrization, budget=budget, num_workers=num_workers
+        )
+
+    def test_instrumented(self) -> None:
+        measurement = profiling.Instrumented(square)(x=3.0)
+        assert measurement.loss == 4.0
+        assert measurement.objective_time >= 0
+        assert measurement.cpu_time >= 0
+        assert measurement.stats is None
+
+    def test_trial_profiler(self, tmpdir) -> None:
+        path = str(tmpdir.join("profile.jsonl"))
+        optimizer = self._make_optimizer(num_workers=2)
+        with profiling.TrialProfiler(path) as profiler:
+            with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
+                driver.minimize(
+                    optimizer,
+                    profiling.Instrumented(square),
+                    executor,
+                    callbacks=[profiler],
+                )
+        with open(path) as f:
+            records = [json.loads(line) for line in f]
+        assert records == profiler.records
+        assert len(records) == 6
+        for record in records:
+            assert record["status"] == "ok"
+            assert record["objective_time"] <= record["wall_time"]
+            assert record["queue_wait"] >= 0
+            assert record["ask_time"] >= 0 and record["tell_time"] >= 0
+        summary = profiler.summary()
+        assert summary["trials"] == 6
+        assert summary["objective_time"]["max"] >= summary["objective_time"]["mean"]
+        assert "objective_time" in profiler.format_summary()
+
+    def test_trial_profiler_not_instrumented(self) -> None:
+        profiler = profiling.TrialProfiler()
+        driver.minimize(self._make_optimizer(), square, callbacks=[profiler])
+        assert "objective_time" not in profiler.records[0]
+        assert profiler.summary()["wall_time"]["total"] > 0
+
+    def test_dump_profiles(self, tmpdir) -> None:
+        profiler = profiling.TrialProfiler(slowest=2)
+        optimizer = self._make_optimizer()
+        driver.minimize(
+            optimizer,
+            profiling.Instrumented(sleepy, profile=True),
+            callbacks=[profiler],
+        )
+        paths = profiler.dump_profiles(str(tmpdir.join("profile")))
+        assert len(paths) == 2
+        times = {r["trial"]: r["objective_time"] for r in profiler.records}
+        slowest = sorted(times, key=times.get, reverse=True)[:2]
+        assert paths == [str(tmpdir.join("profile.trial-%d.prof" % i)) for i in slowest]
+        for path in paths:
+            assert os.path.exists(path)
+            stats = pstats.Stats(path)
+            assert any(func[2] == "sleepy" for func in stats.stats)
@@ -0,0 +1,63 @@
+import json
+
+import nevergrad as ng
+
+from hpnevergrad import driver, progress
+
+
+def square(x):
+    return (x - 1.0) ** 2
+
+
+def _make_optimizer(budget=6):
+    parametrization = ng.p.Instrumentation(x=ng.p.Scalar(init=0.0))
+    return ng.optimizers.registry["RandomSearch"](
+        parametrization=parametrization, budget=budget
+    )
+
+
+class Test(object):
+    def test_progress(self, tmp_path) -> None:
+        path = str(tmp_path / "progress.jsonl")
+        optimizer = _make_optimizer()
+        with progress.Progress(optimizer, path) as trial_progress:
+            recommendation = driver.minimize(
+                optimizer, square, callbacks=[trial_progress]
+            )
+            trial_progress.finish(recommendation)
+        with open(path) as f:
+            reports = [json.loads(line) for line in f]
+        assert [r["event"] for r in reports] == ["trial"] * 6 + ["done"]
+        trials, done = reports[:-1], reports[-1]
+        assert [r["trial"] for r in trials] == [1, 2, 3, 4, 5, 6]
+        assert [r["remaining"] for r in trials] == [5, 4, 3, 2, 1, 0]
+        best = [min(r["loss"] for r in trials[: i + 1]) for i in range(6)]
+        assert [r["best_loss"] for r in trials] == best
+        assert all(r["trials_per_sec"] > 0 for r in trials)
+        assert trials[-1]["eta"] == 0.0
+        assert done["best_loss"] == best[-1]
+        assert done["recommendation"] == recommendation.kwargs
+
+    def test_stop(self) -> None:
+        optimizer = _make_optimizer(budget=20)
+
+        def listener(report):
+            if report["trial"] == 3:
+                trial_progress.stop()
+
+        trial_progress = progress.Progress(optimizer, listener=listener)
+        driver.minimize(optimizer, square, callbacks=[trial_progress])
+        assert optimizer.num_ask == optimizer.num_tell == trial_progress.trials == 3
+
+    def test_watch(self) -> None:
+        optimizer = _make_optimizer()
+        reports = list(progress.watch(optimizer, square))
+        assert [r["event"] for r in reports] == ["trial"] * 6 + ["done"]
+        assert reports[-1]["recommendation"] == reports[-1]["best_kwargs"]
+
+        # leaving the loop stops the search
+        optimizer = _make_optimizer(budget=100)
+        for report in progress.watch(optimizer, square):
+            if report["trial"] == 2:
+                break
+        assert optimizer.num_tell == 2
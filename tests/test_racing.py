@@ -0,0 +1,58 @@
+import nevergrad as ng
+import pytest
+
+from hpnevergrad import driver, journal, racing
+
+
+def square(x, y):
+    return (x - 1.0) ** 2 + (y + 0.5) ** 2
+
+
+def _make_parametrization():
+    return ng.p.Instrumentation(
+        x=ng.p.Scalar(init=0.0, lower=-5.0, upper=5.0),
+        y=ng.p.Scalar(init=0.0, lower=-5.0, upper=5.0),
+    )
+
+
+class Test(object):
+    def test_race(self) -> None:
+        optimizer = racing.Racing(
+            ["CMA", "RandomSearch"], _make_parametrization(), budget=100
+        )
+        trials = []
+        recommendation = driver.minimize(optimizer, square, callbacks=[trials.append])
+        assert optimizer.num_ask == optimizer.num_tell == len(trials) == 100
+        # every member is told every loss
+        assert [member.num_tell for member in optimizer.members] == [100, 100]
+        stats = optimizer.stats()
+        assert [s["name"] for s in stats] == ["CMA", "RandomSearch"]
+        assert sum(s["asks"] for s in stats) == 100
+        # the converging optimizer wins most trials
+        assert stats[0]["asks"] > stats[1]["asks"]
+        assert optimizer.leader() == 0
+        assert square(**recommendation.kwargs) < 0.01
+        assert "CMA" in optimizer.format_stats()
+
+    def test_told_not_asked(self) -> None:
+        optimizer = racing.Racing(
+            ["DE", "RandomSearch"], _make_parametrization(), budget=10
+        )
+        records = [
+            {"kwargs": {"x": 1.0, "y": -0.5}, "loss": 0.0, "status": "ok"},
+            {"kwargs": {"x": 0.0, "y": 0.0}, "loss": 1.25, "status": "ok"},
+        ]
+        assert journal.replay(optimizer, records) == 2
+        assert optimizer.num_tell_not_asked == 2
+        driver.minimize(optimizer, square)
+        assert optimizer.num_ask == 8
+        assert optimizer.provide_recommendation().kwargs == {"x": 1.0, "y": -0.5}
+
+    def test_invalid(self) -> None:
+        with pytest.raises(ValueError):
+            racing.Racing(["DE"], _make_parametrization(), budget=10)
+        optimizer = racing.Racing(
+            ["DE", "RandomSearch"], _make_parametrization(), budget=10
+        )
+        with pytest.raises(ValueError):
+            optimizer.tell(optimizer.ask(), [1.0, 2.0])
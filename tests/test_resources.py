@@ -0,0 +1,83 @@
+import concurrent.futures
+import os
+
+import numpy as np
+import pytest
+
+from hpnevergrad import resources, runner
+
+MODULE = "test_file/test_shared.py"
+
+
+@pytest.fixture
+def directory(tmp_path):
+    resources.set_directory(str(tmp_path))
+    yield str(tmp_path)
+    resources.set_directory(None)
+
+
+def _builds(directory):
+    with open(os.path.join(directory, "builds")) as f:
+        return f.read().split()
+
+
+class Test(object):
+    def test_in_process(self) -> None:
+        calls = []
+
+        @resources.fixture
+        def squares(n):
+            calls.append(n)
+            return [i * i for i in range(n)]
+
+        assert squares(3) == [0, 1, 4]
+        assert squares(3) is squares(3)
+        assert squares(n=4) == [0, 1, 4, 9]
+        assert calls == [3, 4]
+
+    def test_shared(self, directory) -> None:
+        calls = []
+
+        @resources.fixture(name="values")
+        def values(kind):
+            calls.append(kind)
+            if kind == "array":
+                return np.arange(6).reshape(2, 3)
+            return {"kind": kind}
+
+        array = values("array")
+        assert isinstance(array, np.memmap) and not array.flags.writeable
+        assert array.tolist() == [[0, 1, 2], [3, 4, 5]]
+        assert values("other") == {"kind": "other"}
+        # another process finds the values in the directory
+        resources._loaded.clear()
+        assert values("array").tolist() == array.tolist()
+        assert values("other") == {"kind": "other"}
+        assert calls == ["array", "other"]
+
+        @resources.fixture(name="values", version="2")
+        def values_v2(kind):
+            calls.append(kind)
+            return kind
+
+        assert values_v2("array") == "array"
+
+    def test_isolated(self, directory) -> None:
+        objective_function = runner.IsolatedObjective(MODULE, "total")
+        with concurrent.futures.ThreadPoolExecutor(4) as executor:
+            losses = list(
+                executor.map(lambda s: objective_function(scale=s), [1, 2, 3, 4])
+            )
+        assert losses == [45.0, 90.0, 135.0, 180.0]
+        # the fixture is built by a single trial while the others wait
+        assert len(_builds(directory)) == 1
+
+    def test_warm_pool(self, directory, monkeypatch) -> None:
+        # the warm workers parse the module relative to the working directory
+        monkeypatch.chdir(os.path.dirname(__file__))
+        with runner.WarmPool(MODULE, "total", num_workers=2) as pool:
+            # the warm workers load the fixture before forking their trials
+            assert len(_builds(directory)) == 1
+            assert pool(scale=2.0) == 90.0
+            assert pool(scale=1.0) == 45.0
+        assert len(_builds(directory)) == 1
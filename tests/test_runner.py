@@ -0,0 +1,125 @@
+import concurrent.futures
+import os
+import time
+
+import nevergrad as ng
+import pytest
+
+from hpnevergrad import driver, runner
+
+MODULE = "test_file/test_isolated.py"
+
+
+class Test(object):
+    def test_isolated_objective(self) -> None:
+        objective_function = runner.IsolatedObjective(MODULE, "train")
+        # a fresh process per trial: module state never accumulates
+        assert objective_function(lr=0.5) == 0.5
+        assert objective_function(lr=0.25) == 0.25
+
+    def test_crash(self) -> None:
+        with pytest.raises(runner.TrialError, match="exit code"):
+            runner.IsolatedObjective(MODULE, "crash")()
+
+    def test_exception(self) -> None:
+        with pytest.raises(runner.TrialError, match="diverged"):
+            runner.IsolatedObjective(MODULE, "fail")()
+
+    def test_timeout(self) -> None:
+        with pytest.raises(runner.TrialTimeout):
+            runner.IsolatedObjective(MODULE, "hang", timeout=0.5)()
+
+    def test_deadline(self) -> None:
+        start = time.perf_counter()
+        with pytest.raises(runner.DeadlineExceeded):
+            runner.IsolatedObjective(
+                MODULE, "hang", timeout=60, deadline=time.time() + 0.5
+            )()
+        assert time.perf_counter() - start < 30
+
+    def test_driver_max_time(self) -> None:
+        parametrization = ng.p.Instrumentation(lr=ng.p.Scalar(init=0.5))
+        optimizer = ng.optimizers.registry["RandomSearch"](
+            parametrization=parametrization, budget=2
+        )
+        trials = []
+        # the runner kills the trial at the deadline, which cancels it
+        driver.minimize(
+            optimizer,
+            runner.IsolatedObjective(MODULE, "hang", deadline=time.time() + 0.5),
+            callbacks=[trials.append],
+            max_time=0.5,
+        )
+        assert optimizer.num_tell == 0
+        assert [t.status for t in trials] == ["cancelled"]
+
+    def test_driver_deadline(self) -> None:
+        parametrization = ng.p.Instrumentation(lr=ng.p.Scalar(init=0.5))
+        optimizer = ng.optimizers.registry["RandomSearch"](
+            parametrization=parametrization, budget=2
+        )
+        trials = []
+        # trials killed at the deadline of the runner are never penalized,
+        # even if the driver's own deadline is later
+        driver.minimize(
+            optimizer,
+            runner.IsolatedObjective(MODULE, "hang", deadline=time.time() + 0.5),
+            callbacks=[trials.append],
+            penalty=float("inf"),
+            max_time=60,
+        )
+        assert optimizer.num_tell == 0
+        assert [t.status for t in trials] == ["cancelled"] * 2
+
+    def test_memory_limit(self) -> None:
+        objective_function = runner.IsolatedObjective(
+            MODULE, "allocate", memory_limit=2**30
+        )
+        assert objective_function(size=2**20) == 2**20
+        with pytest.raises(runner.TrialError, match="MemoryError"):
+            objective_function(size=2**31)
+
+    def test_driver_penalty(self) -> None:
+        parametrization = ng.p.Instrumentation(lr=ng.p.Scalar(init=0.5))
+        optimizer = ng.optimizers.registry["RandomSearch"](
+            parametrization=parametrization, budget=2
+        )
+        trials = []
+        driver.minimize(
+            optimizer,
+            runner.IsolatedObjective(MODULE, "crash"),
+            callbacks=[trials.append],
+            penalty=float("inf"),
+        )
+        assert optimizer.num_tell == 2
+        assert [t.status for t in trials] == ["failed"] * 2
+        assert [t.loss for t in trials] == [float("inf")] * 2
+
+    def test_warm_pool(self, monkeypatch) -> None:
+        monkeypatch.chdir(os.path.dirname(__file__))
+        with runner.WarmPool(MODULE, "train", num_workers=2) as pool:
+            # each trial is forked from the warm worker: state never accumulates
+            assert pool(lr=0.5) == 0.5
+            assert pool(lr=0.25) == 0.25
+            with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
+                losses = list(executor.map(lambda lr: pool(lr=lr), [0.1, 0.2, 0.3]))
+            assert losses == [0.1, 0.2, 0.3]
+
+    def test_warm_pool_failures(self, monkeypatch) -> None:
+        monkeypatch.chdir(os.path.dirname(__file__))
+        with runner.WarmPool(MODULE, "crash") as pool:
+            with pytest.raises(runner.TrialError, match="exit code"):
+                pool()
+        with runner.WarmPool(MODULE, "hang", timeout=0.5) as pool:
+            with pytest.raises(runner.TrialTimeout):
+                pool()
+        with runner.WarmPool(MODULE, "hang", deadline=time.time() + 2) as pool:
+            with pytest.raises(runner.DeadlineExceeded):
+                pool()
+        with runner.WarmPool(MODULE, "fail") as pool:
+            with pytest.raises(runner.TrialError, match="diverged"):
+                pool()
+            with pytest.raises(runner.TrialError, match="diverged"):
+                pool()
+        with pytest.raises(runner.TrialError, match="missing"):
+            runner.WarmPool(MODULE, "missing").start()
@@ -0,0 +1,85 @@
+import asyncio
+
+import nevergrad as ng
+import pytest
+
+from hpnevergrad import driver, scheduler
+
+
+def make_train(curve):
+    def train(**kwargs):
+        for step, value in enumerate(curve, 1):
+            scheduler.report(value, step)
+        return curve[-1]
+
+    return train
+
+
+class Test(object):
+    def test_report_outside_trial(self) -> None:
+        assert make_train([3.0, 2.0, 1.0])() == 1.0
+
+    def test_successive_halving(self) -> None:
+        asha = scheduler.SuccessiveHalving(min_resource=1, reduction_factor=2)
+        assert not asha.should_stop(0, 1, 1.0)
+        # worse than the best of two at rung 0
+        assert asha.should_stop(1, 1, 2.0)
+        assert not asha.should_stop(2, 1, 0.5)
+        # rung 1 is at step 2, rung 2 at step 4
+        assert not asha.should_stop(0, 2, 0.9)
+        assert asha.should_stop(2, 4, 0.95)
+
+    def test_max_resource(self) -> None:
+        asha = scheduler.SuccessiveHalving(1, 2, max_resource=2)
+        assert not asha.should_stop(0, 2, 1.0)
+        assert asha.should_stop(1, 2, 2.0)
+        # no rung at or beyond max_resource
+        assert not asha.should_stop(1, 8, 3.0)
+
+    def test_wrap(self) -> None:
+        asha = scheduler.SuccessiveHalving(min_resource=1, reduction_factor=2)
+        assert asha.wrap(make_train([1.0, 0.5, 0.1]))() == 0.1
+        # pruned at its first rung: its last report is returned
+        assert asha.wrap(make_train([2.0, 0.0, 0.0]))() == 2.0
+        assert asha.pruned == 1
+
+    def test_wrap_async(self) -> None:
+        asha = scheduler.SuccessiveHalving(min_resource=1, reduction_factor=2)
+
+        async def train(curve):
+            for step, value in enumerate(curve, 1):
+                await asyncio.sleep(0)
+                scheduler.report(value, step)
+            return curve[-1]
+
+        wrapped = asha.wrap(train)
+        assert asyncio.run(wrapped([1.0, 0.5])) == 0.5
+        assert asyncio.run(wrapped([3.0, 0.0])) == 3.0
+
+    def test_hyperband(self) -> None:
+        hyperband = scheduler.Hyperband(min_resource=1, max_resource=9)
+        assert [b.min_resource for b in hyperband.brackets] == [1, 3, 9]
+        # the last bracket never stops its trials
+        assert not hyperband.should_stop(2, 9, 0.0)
+        assert not hyperband.should_stop(5, 9, 1.0)
+
+    @pytest.mark.parametrize(
+        "trial_scheduler",
+        [scheduler.SuccessiveHalving(1, 3, 27), scheduler.Hyperband(1, 27)],
+    )
+    def test_driver(self, trial_scheduler) -> None:
+        def train(rate):
+            for step in range(1, 28):
+                scheduler.report(rate / step, step)
+                steps.append(step)
+            return rate / 27
+
+        steps = []
+        parametrization = ng.p.Instrumentation(rate=ng.p.Scalar(lower=1, upper=10))
+        optimizer = ng.optimizers.registry["RandomSearch"](
+            parametrization=parametrization, budget=30
+        )
+        driver.minimize(optimizer, trial_scheduler.wrap(train))
+        assert optimizer.num_tell == 30
+        assert trial_scheduler.pruned > 0
+        assert len(steps) < 30 * 27
@@ -0,0 +1,82 @@
+import importlib.machinery
+import importlib.util
+import os
+import subprocess
+import sys
+import time
+
+import nevergrad as ng
+
+from hpnevergrad import hpng
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HPNG = os.path.join(ROOT, "bin", "hpng")
+
+HELP = (
+    """
+import runpy, sys
+sys.argv = ["hpng", "--help"]
+try:
+    runpy.run_path(%r, run_name="__main__")
+except SystemExit:
+    pass
+print(sorted(m for m in ["nevergrad", "numpy"] if m in sys.modules))
+"""
+    % HPNG
+)
+
+
+def _env(**kwargs):
+    # the repository is importable even when hpnevergrad is not installed
+    path = os.pathsep.join(filter(None, [ROOT, os.environ.get("PYTHONPATH")]))
+    return dict(os.environ, PYTHONPATH=path, **kwargs)
+
+
+def _run(args, env):
+    start = time.perf_counter()
+    output = subprocess.check_output([sys.executable] + args, env=env)
+    return output.decode(), time.perf_counter() - start
+
+
+class Test(object):
+    def test_import_is_light(self) -> None:
+        output, _ = _run(
+            [
+                "-c",
+                "import sys, hpnevergrad.hpng, hpnevergrad.runner, "
+                "hpnevergrad.scheduler; "
+                "print(sorted(m for m in ['nevergrad', 'numpy'] if m in sys.modules))",
+            ],
+            _env(),
+        )
+        assert output.strip() == "[]"
+
+    def test_get_optimizer_names(self, tmpdir, monkeypatch) -> None:
+        monkeypatch.setenv("XDG_CACHE_HOME", str(tmpdir))
+        names = hpng.get_optimizer_names()
+        assert names == sorted(ng.optimizers.registry.keys())
+        assert len(tmpdir.join("hpnevergrad").listdir()) == 1
+        assert hpng.get_optimizer_names() == names
+        # a corrupted cache is listed again
+        tmpdir.join("hpnevergrad").listdir()[0].write("[")
+        assert hpng.get_optimizer_names() == names
+
+    def test_get_optimizer_names_no_origin(self, tmpdir, monkeypatch) -> None:
+        monkeypatch.setenv("XDG_CACHE_HOME", str(tmpdir))
+        # e.g. a namespace or zip install: the names are listed uncached
+        spec = importlib.machinery.ModuleSpec("nevergrad", None)
+        monkeypatch.setattr(importlib.util, "find_spec", lambda name: spec)
+        names = sorted(ng.optimizers.registry.keys())
+        assert hpng.get_optimizer_names() == names
+        monkeypatch.setattr(importlib.util, "find_spec", lambda name: None)
+        assert hpng.get_optimizer_names() == names
+        assert not tmpdir.join("hpnevergrad").check()
+
+    def test_cli_help_startup(self, tmpdir) -> None:
+        env = _env(XDG_CACHE_HOME=str(tmpdir))
+        # the first run lists the optimizers
+        _run([HPNG, "--help"], env)
+        output, help_time = _run(["-c", HELP], env)
+        assert output.strip().splitlines()[-1] == "[]"
+        _, import_time = _run(["-c", "import nevergrad"], env)
+        assert help_time < import_time
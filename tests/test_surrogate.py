@@ -0,0 +1,116 @@
+import math
+
+import nevergrad as ng
+import numpy as np
+import pytest
+
+from hpnevergrad import driver, journal, surrogate
+
+
+def objective_function(x, y, arch):
+    return (x - 1.2) ** 2 + (y + 0.7) ** 2 + (0 if arch == "fc" else 1)
+
+
+def _make_parametrization(seed=0):
+    parametrization = ng.p.Instrumentation(
+        x=ng.p.Scalar(init=0.0, lower=-5.0, upper=5.0),
+        y=ng.p.Scalar(init=0.0, lower=-5.0, upper=5.0),
+        arch=ng.p.Choice(["conv", "fc", "rnn"]),
+    )
+    parametrization.random_state.seed(seed)
+    return parametrization
+
+
+class Test(object):
+    def test_gaussian_process(self) -> None:
+        rng = np.random.RandomState(0)
+        x = rng.uniform(-2, 2, size=(40, 2))
+        y = np.sin(x[:, 0]) + x[:, 1] ** 2
+        model = surrogate.GaussianProcess()
+        for xi, yi in zip(x, y):
+            model.add(xi, yi)
+        # the incrementally extended factor matches a full decomposition
+        kernel = model._kernel(x, x) + model.noise * np.eye(len(x))
+        assert np.allclose(model._chol, np.linalg.cholesky(kernel), atol=1e-6)
+        mean, std = model.predict(x)
+        assert np.allclose(mean, y, atol=1e-2)
+        test = rng.uniform(-1.5, 1.5, size=(20, 2))
+        mean, std = model.predict(test)
+        assert np.abs(mean - (np.sin(test[:, 0]) + test[:, 1] ** 2)).mean() < 0.1
+        far_mean, far_std = model.predict(np.array([[50.0, 50.0]]))
+        assert far_std[0] > std.max()
+
+    def test_prescreened(self) -> None:
+        plain, screened = [], []
+        for seed in range(3):
+            optimizer = ng.optimizers.registry["RandomSearch"](
+                parametrization=_make_parametrization(seed), budget=30
+            )
+            trials = []
+            driver.minimize(optimizer, objective_function, callbacks=[trials.append])
+            plain.append(min(t.loss for t in trials))
+            optimizer = surrogate.Prescreened(
+                ng.optimizers.registry["RandomSearch"](
+                    parametrization=_make_parametrization(seed), budget=30 * 8
+                ),
+                budget=30,
+                pool_size=8,
+            )
+            trials = []
+            recommendation = driver.minimize(
+                optimizer, objective_function, callbacks=[trials.append]
+            )
+            assert optimizer.num_ask == optimizer.num_tell == len(trials) == 30
+            # predicted losses never make the recommendation
+            best = min(trials, key=lambda t: t.loss)
+            assert recommendation.kwargs == best.kwargs
+            assert optimizer.screened == (30 - optimizer.min_trials) * 7
+            screened.append(min(t.loss for t in trials))
+        # the same number of evaluations reaches lower losses
+        assert np.median(screened) < np.median(plain)
+
+    def test_recommendation(self) -> None:
+        for seed in range(2):
+            optimizer = surrogate.Prescreened(
+                ng.optimizers.registry["RandomSearch"](
+                    parametrization=_make_parametrization(seed), budget=30 * 16
+                ),
+                budget=30,
+                pool_size=16,
+            )
+            trials = []
+            recommendation = driver.minimize(
+                optimizer, objective_function, callbacks=[trials.append]
+            )
+            # the recommendation was evaluated, not only predicted
+            assert recommendation.uid in {t.candidate.uid for t in trials}
+
+    def test_penalties_and_replay(self) -> None:
+        optimizer = surrogate.Prescreened(
+            ng.optimizers.registry["RandomSearch"](
+                parametrization=_make_parametrization(), budget=80
+            ),
+            budget=10,
+            pool_size=4,
+            min_trials=3,
+        )
+        records = [
+            {"kwargs": {"x": 1.2, "y": -0.7, "arch": "fc"}, "loss": 0.0, "status": "ok"}
+        ]
+        journal.replay(optimizer, records)
+        assert optimizer.num_tell_not_asked == 1
+
+        def sometimes_fail(x, y, arch):
+            if x < 0:
+                raise RuntimeError("diverged")
+            return objective_function(x, y, arch)
+
+        trials = []
+        driver.minimize(
+            optimizer, sometimes_fail, callbacks=[trials.append], penalty=math.inf
+        )
+        assert len(trials) == 9
+        assert len(optimizer._model) == 10
+        assert np.isfinite(optimizer._model._y).all()
+        with pytest.raises(ValueError):
+            optimizer.tell(optimizer.ask(), [1.0, 2.0])
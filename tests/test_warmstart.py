@@ -0,0 +1,172 @@
+import json
+
+import nevergrad as ng
+import numpy as np
+import pytest
+
+from hpnevergrad import driver, history, journal, warmstart
+
+
+def objective_function(x, arch, arr):
+    return x**2 + (0 if arch == "conv" else 1) + float(np.sum(arr))
+
+
+def _make_parametrization():
+    return ng.p.Instrumentation(
+        x=ng.p.Scalar(init=0.5, lower=-1.0, upper=1.0),
+        arch=ng.p.Choice(["conv", "fc"]),
+        arr=ng.p.Array(init=np.zeros(2)),
+    )
+
+
+class Test(object):
+    def test_load_formats(self, tmp_path) -> None:
+        jsonl = str(tmp_path / "trials.jsonl")
+        with journal.TrialJournal(jsonl) as trial_journal:
+            optimizer = ng.optimizers.registry["RandomSearch"](
+                parametrization=_make_parametrization(), budget=4
+            )
+            driver.minimize(optimizer, objective_function, None, [trial_journal])
+        records = warmstart.load(jsonl)
+        assert len(records) == 4
+        assert all(r["loss"] == objective_function(**r["kwargs"]) for r in records)
+
+        (tmp_path / "trials.json").write_text(
+            json.dumps(
+                [
+                    {"x": 0.1, "arch": "fc", "loss": 1.0},
+                    {"kwargs": {"x": 0.2}, "loss": 2.0, "status": "ok"},
+                    {"kwargs": {"x": 0.3}, "loss": 1e9, "status": "failed"},
+                    {"x": 0.4, "loss": None},
+                ]
+            )
+        )
+        assert warmstart.load(str(tmp_path / "trials.json")) == [
+            {"kwargs": {"x": 0.1, "arch": "fc"}, "loss": 1.0},
+            {"kwargs": {"x": 0.2}, "loss": 2.0},
+        ]
+
+        (tmp_path / "trials.csv").write_text("x,arch,loss\n0.1,fc,1.5\n0.2,conv,\n")
+        assert warmstart.load(str(tmp_path / "trials.csv")) == [
+            {"kwargs": {"x": "0.1", "arch": "fc"}, "loss": 1.5}
+        ]
+
+    def test_load_multiobjective(self, tmp_path) -> None:
+        jsonl = str(tmp_path / "trials.jsonl")
+        with journal.TrialJournal(jsonl) as trial_journal:
+            optimizer = ng.optimizers.registry["RandomSearch"](
+                parametrization=_make_parametrization(), budget=4
+            )
+            driver.minimize(
+                optimizer,
+                lambda x, arch, arr: [x**2, float(np.sum(arr))],
+                None,
+                [trial_journal],
+            )
+        records = warmstart.load(jsonl)
+        assert len(records) == 4 and all(len(r["loss"]) == 2 for r in records)
+        optimizer = ng.optimizers.registry["NGOpt"](
+            parametrization=_make_parametrization(), budget=4
+        )
+        assert warmstart.warm_start(optimizer, records) == 4
+        assert optimizer.num_objectives == 2
+
+        (tmp_path / "trials.csv").write_text(
+            "x,arch,loss[0],loss[1],status\n0.1,fc,1.5,2.0,ok\n0.2,conv,nan,1.0,ok\n"
+        )
+        assert warmstart.load(str(tmp_path / "trials.csv")) == [
+            {"kwargs": {"x": "0.1", "arch": "fc", "status": "ok"}, "loss": [1.5, 2.0]}
+        ]
+
+    def test_adapt(self) -> None:
+        parametrization = _make_parametrization()
+        # removed hyperparameters are dropped and new ones take their default
+        kwargs = warmstart.adapt(parametrization, {"x": "0.25", "lr": 0.1})
+        assert kwargs["x"] == 0.25
+        assert kwargs["arch"] == parametrization[1]["arch"].value
+        assert kwargs["arr"].tolist() == [0.0, 0.0]
+        # out of bounds values are clipped
+        kwargs = warmstart.adapt(
+            parametrization, {"x": 3.0, "arch": "fc", "arr": "[1, 2]"}
+        )
+        assert kwargs["x"] == 1.0
+        assert kwargs["arr"].tolist() == [1.0, 2.0]
+        # values no longer in the space make the trial unusable
+        assert warmstart.adapt(parametrization, {"arch": "rnn"}) is None
+        assert warmstart.adapt(parametrization, {"arr": [1, 2, 3]}) is None
+
+    def test_adapt_conditional(self) -> None:
+        parametrization = ng.p.Instrumentation(
+            arch=ng.p.Choice(
+                [ng.p.Dict(arch="conv", k=ng.p.Scalar(init=3.0)), ng.p.Dict(arch="fc")]
+            ),
+        )
+        # values read from CSV, with the inactive hyperparameters empty
+        kwargs = warmstart.adapt(parametrization, {"arch": "fc", "k": ""})
+        assert kwargs == {"arch": {"arch": "fc"}}
+        kwargs = warmstart.adapt(parametrization, {"arch": "conv", "k": "2.0"})
+        assert kwargs == {"arch": {"arch": "conv", "k": 2.0}}
+        assert warmstart.adapt(parametrization, {"arch": "rnn"}) is None
+        records = [{"kwargs": {"arch": "conv"}, "loss": 1.0}]
+        adapted = warmstart.adapt_records(parametrization, records)
+        assert adapted[0]["kwargs"] == {"arch": "conv", "k": 3.0}
+
+    def test_warm_start(self) -> None:
+        records = [
+            {"kwargs": {"x": 0.0, "arch": "conv", "old": 1}, "loss": 0.0},
+            {"kwargs": {"x": 0.5, "arch": "rnn"}, "loss": 1.0},
+            {"kwargs": {"x": "-0.5", "arch": "fc"}, "loss": 1.25},
+        ]
+        assert len(warmstart.adapt_records(_make_parametrization(), records)) == 2
+        optimizer = ng.optimizers.registry["NGOpt"](
+            parametrization=_make_parametrization(), budget=4
+        )
+        assert warmstart.warm_start(optimizer, records) == 2
+        assert optimizer.num_tell == optimizer.num_tell_not_asked == 2
+        recommendation = optimizer.provide_recommendation()
+        assert recommendation.kwargs["x"] == 0.0
+        assert recommendation.kwargs["arch"] == "conv"
+
+    def test_adapt_repetitions(self) -> None:
+        parametrization = ng.p.Instrumentation(
+            c=ng.p.Choice(["a", "b", "c"], repetitions=2)
+        )
+        # each repetition is matched on its own, whatever the format
+        for value in [("a", "c"), ["a", "c"], '["a", "c"]']:
+            assert warmstart.adapt(parametrization, {"c": value}) == {"c": ("a", "c")}
+        assert warmstart.adapt(parametrization, {"c": ["a", "d"]}) is None
+        assert warmstart.adapt(parametrization, {"c": ["a"]}) is None
+        assert warmstart.adapt(parametrization, {"c": "a"}) is None
+
+    def test_history_round_trip(self, tmp_path) -> None:
+        def make_parametrization():
+            return ng.p.Instrumentation(
+                x=ng.p.Scalar(init=0.5, lower=-1.0, upper=1.0),
+                c=ng.p.Choice([0, 1, 2], repetitions=2),
+                arr=ng.p.Array(init=np.zeros((2, 2))),
+            )
+
+        def objective(x, c, arr):
+            return x**2 + sum(c) + float(np.sum(arr))
+
+        trials = []
+        trial_history = history.TrialHistory(make_parametrization())
+        optimizer = ng.optimizers.registry["RandomSearch"](
+            parametrization=make_parametrization(), budget=4
+        )
+        driver.minimize(optimizer, objective, None, [trials.append, trial_history])
+        trial_history.to_csv(str(tmp_path / "trials.csv"))
+
+        records = warmstart.load(str(tmp_path / "trials.csv"))
+        assert [r["loss"] for r in records] == pytest.approx([t.loss for t in trials])
+        adapted = warmstart.adapt_records(make_parametrization(), records)
+        assert len(adapted) == 4
+        for record, trial in zip(adapted, trials):
+            assert record["kwargs"]["c"] == trial.candidate.kwargs["c"]
+            assert record["kwargs"]["arr"] == pytest.approx(
+                trial.candidate.kwargs["arr"]
+            )
+        optimizer = ng.optimizers.registry["NGOpt"](
+            parametrization=make_parametrization(), budget=4
+        )
+        assert warmstart.warm_start(optimizer, records) == 4